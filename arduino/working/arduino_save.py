@@ -1,12 +1,26 @@
 import serial
-import csv
 from PyQt5.QtWidgets import QApplication, QMainWindow, QPushButton, QFileDialog, QVBoxLayout, QWidget
 from PyQt5.QtCore import QTimer
 import sys
+import os
+
+# Make the shared journey package importable when run as a script
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from journey.serial_reader import SerialReader
+from journey.writer import JourneyWriter
+from journey.protocol import ARDUINO_HEADER, parse_line
+from journey.metrics import Metrics
 
 # Configure serial port
 SERIAL_PORT = 'COM3'
 BAUD_RATE = 115200
+BUFFER_LINES = 8192  # Lines held between the reader thread and the GUI
+COMMIT_ROWS = 256  # Rows written to the CSV per commit
+COMMIT_SECONDS = 5.0  # Longest a row waits in memory before being committed
+DURABILITY = 'flush'  # 'none', 'flush' or 'fsync'
+JOURNAL = True  # Journal rows so a crash mid-drive can be recovered (python -m journey.journal)
+ECHO_LINES = False  # Print every logged line (slows ingest at high rates)
+SAVE_METRICS = True  # Write ingest metrics next to the CSV when recording stops
 
 class MainWindow(QMainWindow):
     def __init__(self):
@@ -16,8 +30,9 @@ class MainWindow(QMainWindow):
 
         # Initialize variables
         self.ser = None
-        self.csvfile = None
-        self.csv_writer = None
+        self.reader = None
+        self.journey_writer = None
+        self.metrics = None
         self.timer = QTimer(self)
         self.timer.timeout.connect(self.read_serial)
 
@@ -59,12 +74,22 @@ class MainWindow(QMainWindow):
             # Open serial connection
             self.ser = serial.Serial(SERIAL_PORT, BAUD_RATE, timeout=1)
             print(f"Connected to {SERIAL_PORT}")
+            self.metrics = Metrics()
+
+            # Drain the port on a background thread so lines aren't lost between timer ticks
+            self.reader = SerialReader(self.ser, capacity=BUFFER_LINES, metrics=self.metrics)
+            self.reader.start()
 
             # Open CSV file
-            self.csvfile = open(self.csv_path, 'w', newline='', encoding='utf-8')
-            self.csv_writer = csv.writer(self.csvfile)
-            self.csv_writer.writerow(['timestamp', 'rpm', 'speed', 'lat', 'lon'])
-            self.csvfile.flush()
+            self.journey_writer = JourneyWriter(
+                self.csv_path,
+                header=ARDUINO_HEADER,
+                batch_rows=COMMIT_ROWS,
+                batch_seconds=COMMIT_SECONDS,
+                durability=DURABILITY,
+                journal=JOURNAL,
+                metrics=self.metrics,
+            )
 
             # Start reading serial data
             self.timer.start(100)  # Check every 100ms
@@ -77,32 +102,54 @@ class MainWindow(QMainWindow):
         except serial.SerialException as e:
             print(f"Serial error: {e}")
             self.cleanup()
+        except FileExistsError as e:
+            print(e)
+            self.cleanup()
 
     def stop_recording(self):
         self.timer.stop()
+        if self.reader:
+            self.reader.stop()
+            self.read_serial()  # Write out whatever the reader buffered before stopping
+            stats = self.reader.stats()
+            print(f"Read {stats['pushed']} lines, dropped {stats['dropped']} (buffer peak {stats['high_water']}/{stats['capacity']})")
+            if stats['error']:
+                print(f"Serial error: {stats['error']}")
         print(f"Stopped. Data saved to {self.csv_path}")
         self.cleanup()
+        if self.metrics:
+            print(self.metrics.summary_line())
+            if SAVE_METRICS:
+                metrics_path = os.path.splitext(self.csv_path)[0] + '_metrics.json'
+                self.metrics.dump(metrics_path)
+                print(f"Metrics saved to {metrics_path}")
+            self.metrics = None
 
     def read_serial(self):
-        if self.ser and self.ser.in_waiting > 0:
-            try:
-                line = self.ser.readline().decode('utf-8', errors='ignore').strip()
-                # Skip initialization messages
-                if line.startswith('timestamp') or line.startswith('NEO-6M'):
-                    return
-                # Parse data
-                data = line.split(',')
-                if len(data) == 5:  # Ensure correct number of fields
-                    self.csv_writer.writerow(data)
-                    self.csvfile.flush()
-                    print(line)
-            except ValueError:
-                print(f"Skipping invalid line: {line}")
+        if not self.reader or not self.journey_writer:
+            return
+        lines = self.reader.pop_batch()
+        if not lines:
+            self.journey_writer.commit_if_due()
+            return
+        rows = []
+        for _, raw in lines:
+            data = parse_line(raw)
+            if data:
+                rows.append(data)
+                if ECHO_LINES:
+                    print(','.join(data))
+        self.journey_writer.writerows(rows, arrival=lines[0][0])  # Oldest line in the batch
+        self.metrics.counter('lines').add(len(lines))
+        self.metrics.counter('malformed_lines').add(len(lines) - len(rows))
 
     def cleanup(self):
-        if self.csvfile:
-            self.csvfile.close()
-            self.csvfile = None
+        if self.reader:
+            self.reader.stop()
+            self.reader = None
+        if self.journey_writer:
+            self.journey_writer.close()
+            self.journey_writer = None
         if self.ser:
             self.ser.close()
             self.ser = None
@@ -0,0 +1,156 @@
+"""Pseudo-terminal stand-in for the NEO-6M Arduino rig (Linux/macOS only).
+
+Speaks the same protocol as arduino/other/first/first.ino: the
+"NEO-6M GPS Initialized" banner, the CSV header, then
+timestamp,rpm,speed,lat,lon lines. Rows are replayed from an existing
+journey CSV at a configurable rate. Example:
+
+    python fake_arduino.py --replay ../../csv/arduinoCSV/8-6-25.csv --rate 20000
+    python headless_logger.py --port <printed port> --output bench.csv
+"""
+import argparse
+import csv
+import os
+import random
+import sys
+import threading
+import time
+import tty
+
+BANNER = b"NEO-6M GPS Initialized\r\n"
+HEADER = b"timestamp,rpm,speed,lat,lon\r\n"
+MAX_BURST = 4096  # Most lines written in one go when catching up
+# Ends a line torn by an overrun. A torn line has at most 4 commas, so with
+# these it has too many fields and every parser rejects it instead of taking
+# a cut-off value (e.g. "...,174.8" -> "...,17") as good data.
+TORN_LINE_END = b",,,,,\r\n"
+
+
+def load_replay_lines(path):
+    """Read the rpm/speed/lat/lon columns of a journey CSV as line templates"""
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        index = [header.index(name) for name in ("rpm", "speed", "lat", "lon")]
+        rows = [[row[i] for i in index] for row in reader if len(row) == len(header)]
+    if not rows:
+        raise ValueError(f"{path} has no data rows")
+    return [(",".join(row) + "\r\n").encode("ascii") for row in rows]
+
+
+def corrupt(line, rng):
+    """Mangle a line so it no longer has 5 fields, like a glitch on the wire"""
+    choice = rng.randrange(3)
+    if choice == 0:
+        return line.split(b",", 1)[1]  # Lost the start of the line
+    if choice == 1:
+        return line.replace(b",", b",,", 1)  # Doubled separator
+    return bytes(rng.randrange(32, 127) for _ in range(len(line) - 2)).replace(b",", b";") + b"\r\n"
+
+
+class FakeArduino(threading.Thread):
+    """Emit Arduino lines into a pty at `rate` lines per second.
+
+    Lines that don't fit in the pty buffer are dropped and counted in
+    `overruns`, the same way a real UART overruns when the host stops reading.
+    """
+
+    def __init__(self, replay_path, rate=2.0, corrupt_rate=0.0, duration=None, seed=0):
+        super().__init__(name="FakeArduino", daemon=True)
+        self.templates = load_replay_lines(replay_path)
+        self.rate = float(rate)
+        self.corrupt_rate = corrupt_rate
+        self.duration = duration
+        self.rng = random.Random(seed)
+        self.master_fd, self.slave_fd = os.openpty()
+        tty.setraw(self.slave_fd)
+        os.set_blocking(self.master_fd, False)
+        self.port = os.ttyname(self.slave_fd)
+        self.sent = 0  # Data lines generated, including corrupted ones
+        self.corrupted = 0
+        self.overruns = 0  # Lines lost because the pty buffer was full
+        self._resync = b""  # Rest of a torn line's ending still to be written
+        self._stop_event = threading.Event()
+
+    def _write(self, data):
+        try:
+            return os.write(self.master_fd, data)
+        except BlockingIOError:
+            return 0
+
+    def _next_line(self, start):
+        template = self.templates[self.sent % len(self.templates)]
+        millis = int((time.monotonic() - start) * 1000)
+        line = str(millis).encode("ascii") + b"," + template
+        self.sent += 1
+        if self.corrupt_rate and self.rng.random() < self.corrupt_rate:
+            self.corrupted += 1
+            line = corrupt(line, self.rng)
+        return line
+
+    def run(self):
+        start = time.monotonic()
+        self._write(BANNER + HEADER)
+        interval = 1.0 / self.rate
+        while not self._stop_event.is_set():
+            elapsed = time.monotonic() - start
+            if self.duration is not None and elapsed >= self.duration:
+                break
+            due = min(int(elapsed * self.rate) + 1 - self.sent, MAX_BURST)
+            if due <= 0:
+                time.sleep(min(interval, 0.001))
+                continue
+            if self._resync:
+                # Finish the torn line before anything else, however many tries it takes
+                self._resync = self._resync[self._write(self._resync):]
+                if self._resync:
+                    time.sleep(min(interval, 0.001))
+                    continue
+            lines = [self._next_line(start) for _ in range(due)]
+            data = b"".join(lines)
+            written = self._write(data)
+            if written < len(data):
+                # Count whole lines lost (the torn one too) and spoil the torn one so the stream stays line aligned
+                self.overruns += data.count(b"\n", written)
+                if written and data[written - 1:written] != b"\n":
+                    self._resync = TORN_LINE_END[self._write(TORN_LINE_END):]
+
+    def stop(self, timeout=2.0):
+        self._stop_event.set()
+        if self.is_alive():
+            self.join(timeout)
+
+    def close(self):
+        self.stop()
+        os.close(self.master_fd)
+        os.close(self.slave_fd)
+
+    def stats(self):
+        return {"sent": self.sent, "corrupted": self.corrupted, "overruns": self.overruns}
+
+
+def main(argv=None):
+    default_replay = os.path.join(os.path.dirname(__file__), '..', '..', 'csv', 'arduinoCSV', '8-6-25.csv')
+    parser = argparse.ArgumentParser(description="Replay a journey CSV through a pty as if it were the Arduino.")
+    parser.add_argument('--replay', default=default_replay, help="journey CSV to replay")
+    parser.add_argument('--rate', type=float, default=2.0, help="lines per second (the sketch sends 2)")
+    parser.add_argument('--corrupt', type=float, default=0.0, help="fraction of lines to corrupt")
+    parser.add_argument('--duration', type=float, default=None, help="stop after this many seconds")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    arduino = FakeArduino(args.replay, args.rate, args.corrupt, args.duration, args.seed)
+    print(f"Fake Arduino on {arduino.port} at {args.rate:g} lines/s")
+    arduino.start()
+    try:
+        while arduino.is_alive():
+            arduino.join(0.5)
+    except KeyboardInterrupt:
+        pass
+    arduino.close()
+    print(arduino.stats())
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,180 @@
+"""Headless Arduino GPS logger for the in-car logging box.
+
+Same line rules as arduino_save.py (banners and lines without 5 fields are
+skipped) but with no Qt, so it starts quickly and runs without a display.
+Serial data is parsed in bulk chunks with journey.fastparse. Example:
+
+    python headless_logger.py --port /dev/ttyUSB0 --output drive.csv --rotate-minutes 30
+"""
+import argparse
+import os
+import signal
+import sys
+import time
+
+import serial
+
+# Make the shared journey package importable when run as a script
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from journey.serial_reader import SerialReader
+from journey.writer import JourneyWriter, DURABILITY_MODES
+from journey.protocol import ARDUINO_HEADER
+from journey.fastparse import ChunkParser
+from journey.metrics import Metrics
+from journey.lod import Pyramid, lod_path
+
+DEFAULT_PORT = 'COM3'
+DEFAULT_BAUD = 115200
+POLL_INTERVAL = 0.1  # Seconds between drains of the reader buffer
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Log Arduino GPS/OBD lines from a serial port to CSV without a GUI.")
+    parser.add_argument('--port', default=DEFAULT_PORT, help=f"serial port (default {DEFAULT_PORT})")
+    parser.add_argument('--baud', type=int, default=DEFAULT_BAUD, help=f"baud rate (default {DEFAULT_BAUD})")
+    parser.add_argument('-o', '--output', required=True, help="CSV path; rotated files get -001, -002... suffixes")
+    parser.add_argument('--rotate-rows', type=int, default=0, help="start a new file after this many rows (0 = never)")
+    parser.add_argument('--rotate-minutes', type=float, default=0, help="start a new file after this many minutes (0 = never)")
+    parser.add_argument('--commit-rows', type=int, default=64, help="rows buffered per CSV commit")
+    parser.add_argument('--commit-seconds', type=float, default=1.0, help="longest a row waits before being committed")
+    parser.add_argument('--durability', choices=DURABILITY_MODES, default='flush', help="how hard each commit pushes to disk")
+    parser.add_argument('--no-journal', dest='journal', action='store_false', help="don't keep a crash-recovery journal")
+    parser.add_argument('--buffer-chunks', type=int, default=8192, help="ring buffer size (serial reads) between the reader thread and the writer")
+    parser.add_argument('--metrics-file', help="write ingest metrics (JSON) here while logging and on exit")
+    parser.add_argument('--metrics-interval', type=float, default=10.0, help="seconds between metrics file updates")
+    parser.add_argument('--lod', action='store_true', help="keep a min/max/mean overview (<output>.lod.npz) of each file for fast zoomed-out plots")
+    parser.add_argument('-v', '--verbose', action='store_true', help="echo every logged line")
+    return parser.parse_args(argv)
+
+
+class HeadlessLogger:
+    """Drain a SerialReader into rotating CSV journey files"""
+
+    def __init__(self, args):
+        self.args = args
+        self.writer = None
+        self.pyramid = None  # Overview of the current file, with --lod
+        self.file_index = 0
+        self.file_rows = 0
+        self.file_started = 0
+        self.rows_logged = 0
+        self.parser = ChunkParser(len(ARDUINO_HEADER), protocol_rules=True)  # Keep the lines parse_line keeps
+        self.metrics = Metrics()
+        self.running = False
+
+    def _next_path(self):
+        if not (self.args.rotate_rows or self.args.rotate_minutes):
+            return self.args.output
+        root, ext = os.path.splitext(self.args.output)
+        self.file_index += 1
+        return f"{root}-{self.file_index:03d}{ext or '.csv'}"
+
+    def _close_writer(self):
+        self.writer.close()
+        if self.pyramid is not None:
+            self.pyramid.save(lod_path(self.writer.path))
+
+    def _open_writer(self):
+        if self.writer:
+            self._close_writer()
+        path = self._next_path()
+        self.writer = JourneyWriter(
+            path,
+            header=ARDUINO_HEADER,
+            batch_rows=self.args.commit_rows,
+            batch_seconds=self.args.commit_seconds,
+            durability=self.args.durability,
+            journal=self.args.journal,
+            metrics=self.metrics,
+        )
+        if self.args.lod:
+            self.pyramid = Pyramid(ARDUINO_HEADER)
+        self.file_rows = 0
+        self.file_started = time.monotonic()
+        print(f"Logging to {path}")
+
+    def _rotation_due(self):
+        if self.args.rotate_rows and self.file_rows >= self.args.rotate_rows:
+            return True
+        if self.args.rotate_minutes and time.monotonic() - self.file_started >= self.args.rotate_minutes * 60:
+            return True
+        return False
+
+    def write_chunks(self, chunks):
+        """Parse raw serial chunks and write the valid lines, rotating files as needed"""
+        if chunks:
+            parsed = self.parser.feed(b"".join(chunk for _, chunk in chunks))
+            rows = parsed.n_valid
+            self.metrics.counter("lines").add(len(parsed))
+            self.metrics.counter("malformed_lines").add(len(parsed) - rows)
+            values = parsed.values[parsed.valid] if self.pyramid is not None else None
+            done = 0
+            while done < rows:
+                if self._rotation_due():
+                    self._open_writer()
+                take = rows - done
+                if self.args.rotate_rows:
+                    take = min(take, self.args.rotate_rows - self.file_rows)
+                text = parsed.text(done, done + take)
+                self.writer.write_text(text, take, arrival=chunks[0][0])
+                if values is not None:
+                    self.pyramid.append(values[done:done + take])
+                if self.args.verbose:
+                    print(text.decode("utf-8"), end="")
+                self.file_rows += take
+                self.rows_logged += take
+                done += take
+        if self.writer:
+            self.writer.commit_if_due()
+
+    def run(self):
+        ser = serial.Serial(self.args.port, self.args.baud, timeout=1)
+        print(f"Connected to {self.args.port}")
+        reader = SerialReader(ser, capacity=self.args.buffer_chunks, split_lines=False, metrics=self.metrics)
+        self._open_writer()
+        reader.start()
+        self.running = True
+        last_dump = time.monotonic()
+        try:
+            while self.running and reader.is_alive():
+                time.sleep(POLL_INTERVAL)
+                self.write_chunks(reader.pop_batch())
+                if self.args.metrics_file and time.monotonic() - last_dump >= self.args.metrics_interval:
+                    self.metrics.dump(self.args.metrics_file)
+                    last_dump = time.monotonic()
+        finally:
+            reader.stop()
+            self.write_chunks(reader.pop_batch())
+            self._close_writer()
+            ser.close()
+            stats = reader.stats()
+            print(f"Logged {self.rows_logged} rows, skipped {self.parser.malformed} malformed lines, "
+                  f"dropped {stats['dropped']} read chunks (buffer peak {stats['high_water']}/{stats['capacity']})")
+            if stats['error']:
+                print(f"Serial error: {stats['error']}")
+            print(self.metrics.summary_line())
+            if self.args.metrics_file:
+                self.metrics.dump(self.args.metrics_file)
+
+    def stop(self, *_):
+        self.running = False
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    logger = HeadlessLogger(args)
+    signal.signal(signal.SIGINT, logger.stop)
+    signal.signal(signal.SIGTERM, logger.stop)
+    try:
+        logger.run()
+    except serial.SerialException as e:
+        print(f"Serial error: {e}")
+        return 1
+    except FileExistsError as e:
+        print(e)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
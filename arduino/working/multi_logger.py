@@ -0,0 +1,238 @@
+"""Log several serial devices at once with asyncio.
+
+Each device is read as soon as its port has data, and every line is stamped
+with a monotonic arrival time (seconds since the logger started). Lines are
+written to one CSV per device or to a single merged CSV. Example:
+
+    python multi_logger.py --device gps=/dev/ttyUSB0 --device obd=/dev/ttyUSB1:38400:raw --output-dir drive1
+    python multi_logger.py --device gps=COM3 --device gps2=COM5 --merged drive1.csv
+"""
+import argparse
+import asyncio
+import os
+import signal
+import sys
+import time
+
+import serial
+
+# Make the shared journey package importable when run as a script
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from journey.writer import JourneyWriter, DURABILITY_MODES
+from journey.protocol import ARDUINO_HEADER, parse_line
+
+DEFAULT_BAUD = 115200
+LINE_FORMATS = ('arduino', 'raw')  # arduino: 5 field check like arduino_save.py, raw: keep every non-empty line
+READ_TIMEOUT = 0.1  # Only used by the thread fallback where the loop can't watch the port directly
+
+
+def parse_raw(raw):
+    line = raw.decode('utf-8', errors='ignore').strip()
+    return [line] if line else None
+
+
+class Device:
+    """One serial source and the partial line left over from its last read"""
+
+    def __init__(self, name, port, baud=DEFAULT_BAUD, line_format='arduino'):
+        if line_format not in LINE_FORMATS:
+            raise ValueError(f"line format must be one of {LINE_FORMATS}, not {line_format!r}")
+        self.name = name
+        self.port = port
+        self.baud = baud
+        self.line_format = line_format
+        self.parse = parse_line if line_format == 'arduino' else parse_raw
+        self.header = ARDUINO_HEADER if line_format == 'arduino' else ['line']
+        self.ser = None
+        self.writer = None
+        self.pending = b""
+        self.bytes_read = 0
+        self.rows = 0
+        self.rejected = 0
+
+    @classmethod
+    def from_spec(cls, spec):
+        """Build a device from NAME=PORT[:BAUD[:FORMAT]]"""
+        name, sep, rest = spec.partition('=')
+        if not sep or not name or not rest:
+            raise ValueError(f"bad device spec {spec!r}, expected NAME=PORT[:BAUD[:FORMAT]]")
+        parts = rest.split(':')
+        port = parts[0]
+        baud = int(parts[1]) if len(parts) > 1 and parts[1] else DEFAULT_BAUD
+        line_format = parts[2] if len(parts) > 2 else 'arduino'
+        return cls(name, port, baud, line_format)
+
+    def open(self, blocking_reads):
+        self.ser = serial.Serial(self.port, self.baud, timeout=READ_TIMEOUT if blocking_reads else 0)
+
+    def read(self):
+        """Read whatever is waiting (blocks up to READ_TIMEOUT in thread mode)"""
+        return self.ser.read(self.ser.in_waiting or 1)
+
+    def feed(self, chunk, arrival):
+        """Split a chunk into complete lines and return parsed rows stamped with arrival"""
+        self.bytes_read += len(chunk)
+        self.pending += chunk
+        if b"\n" not in chunk:
+            return []
+        lines = self.pending.split(b"\n")
+        self.pending = lines.pop()
+        stamp = f"{arrival:.6f}"
+        rows = []
+        for raw in lines:
+            data = self.parse(raw)
+            if data:
+                rows.append([stamp] + data)
+            else:
+                self.rejected += 1
+        self.rows += len(rows)
+        return rows
+
+    def close(self):
+        if self.ser:
+            self.ser.close()
+            self.ser = None
+
+
+class MultiLogger:
+    """Read N devices concurrently and write per-device or merged journey files"""
+
+    def __init__(self, devices, output_dir=None, merged_path=None, commit_rows=64, commit_seconds=1.0, durability='flush'):
+        if (output_dir is None) == (merged_path is None):
+            raise ValueError("give exactly one of output_dir or merged_path")
+        names = [d.name for d in devices]
+        if len(set(names)) != len(names):
+            raise ValueError("device names must be unique")
+        self.devices = devices
+        self.output_dir = output_dir
+        self.merged_path = merged_path
+        self.writer_args = dict(batch_rows=commit_rows, batch_seconds=commit_seconds, durability=durability)
+        self.merged_writer = None
+        self.start = None
+        self._stop_event = None
+
+    def _open_writers(self):
+        if self.merged_path:
+            self.merged_writer = JourneyWriter(self.merged_path, header=['arrival', 'device', 'data'], **self.writer_args)
+            return
+        os.makedirs(self.output_dir, exist_ok=True)
+        for device in self.devices:
+            path = os.path.join(self.output_dir, f"{device.name}.csv")
+            device.writer = JourneyWriter(path, header=['arrival'] + device.header, **self.writer_args)
+
+    def _write(self, device, rows):
+        if not rows:
+            return
+        if self.merged_writer:
+            self.merged_writer.writerows([[row[0], device.name, ','.join(row[1:])] for row in rows])
+        else:
+            device.writer.writerows(rows)
+
+    def _on_readable(self, device):
+        """Event loop callback: the port has data"""
+        arrival = time.monotonic() - self.start
+        try:
+            chunk = device.read()
+        except serial.SerialException as e:
+            print(f"{device.name}: serial error: {e}")
+            asyncio.get_running_loop().remove_reader(device.ser.fileno())
+            return
+        if chunk:
+            self._write(device, device.feed(chunk, arrival))
+
+    async def _read_in_thread(self, device):
+        """Fallback for platforms where the loop can't watch a serial handle (Windows COM ports)"""
+        loop = asyncio.get_running_loop()
+        while not self._stop_event.is_set():
+            try:
+                chunk = await loop.run_in_executor(None, device.read)
+            except serial.SerialException as e:
+                print(f"{device.name}: serial error: {e}")
+                return
+            if chunk:
+                self._write(device, device.feed(chunk, time.monotonic() - self.start))
+
+    async def _commit_quiet_streams(self):
+        """Make sure rows from slow devices still reach disk within the commit window"""
+        interval = self.writer_args['batch_seconds']
+        while not self._stop_event.is_set():
+            await asyncio.sleep(interval)
+            for writer in self._writers():
+                writer.commit_if_due()
+
+    def _writers(self):
+        if self.merged_writer:
+            return [self.merged_writer]
+        return [d.writer for d in self.devices if d.writer]
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        self._stop_event = asyncio.Event()
+        watch_fds = os.name == 'posix'
+        self._open_writers()
+        self.start = time.monotonic()
+        print(f"Session start {time.strftime('%Y-%m-%d %H:%M:%S')} (arrival times are seconds from here)")
+        tasks = [asyncio.create_task(self._commit_quiet_streams())]
+        try:
+            for device in self.devices:
+                device.open(blocking_reads=not watch_fds)
+                print(f"{device.name}: reading {device.port} at {device.baud}")
+                if watch_fds:
+                    loop.add_reader(device.ser.fileno(), self._on_readable, device)
+                else:
+                    tasks.append(asyncio.create_task(self._read_in_thread(device)))
+            await self._stop_event.wait()
+        finally:
+            for device in self.devices:
+                if watch_fds and device.ser:
+                    loop.remove_reader(device.ser.fileno())
+            self._stop_event.set()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            for writer in self._writers():
+                writer.close()
+            for device in self.devices:
+                device.close()
+                print(f"{device.name}: {device.rows} rows, {device.rejected} rejected, {device.bytes_read} bytes")
+
+    def stop(self):
+        if self._stop_event:
+            self._stop_event.set()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Log several serial devices concurrently.")
+    parser.add_argument('--device', action='append', required=True, metavar='NAME=PORT[:BAUD[:FORMAT]]',
+                        help=f"device to read; FORMAT is one of {', '.join(LINE_FORMATS)} (default arduino)")
+    output = parser.add_mutually_exclusive_group(required=True)
+    output.add_argument('--output-dir', help="write one CSV per device into this directory")
+    output.add_argument('--merged', help="write every device into one CSV")
+    parser.add_argument('--commit-rows', type=int, default=64)
+    parser.add_argument('--commit-seconds', type=float, default=1.0)
+    parser.add_argument('--durability', choices=DURABILITY_MODES, default='flush')
+    args = parser.parse_args(argv)
+
+    try:
+        devices = [Device.from_spec(spec) for spec in args.device]
+    except ValueError as e:
+        parser.error(str(e))
+    logger = MultiLogger(devices, args.output_dir, args.merged, args.commit_rows, args.commit_seconds, args.durability)
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        if os.name == 'posix':
+            for sig in (signal.SIGINT, signal.SIGTERM):
+                loop.add_signal_handler(sig, logger.stop)
+        await logger.run()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    except serial.SerialException as e:
+        print(f"Serial error: {e}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
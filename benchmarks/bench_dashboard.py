@@ -0,0 +1,235 @@
+"""Offscreen load time, frame time and peak memory of the dashboards.
+
+Writes synthetic simulator-layout journeys of each size, then runs
+OBDViewer (sims/current/dashboard_playback.py) on each one in a fresh
+process under Qt's offscreen platform, so every size gets its own peak
+RSS. For each size it times loading to the first frame and to the end of
+the file. It then times playback frames (update_display, pushing the
+changes to the widgets and painting them) at PLAYBACK_RATE through the
+journey, and the same at random seek positions, which may have to decode a
+chunk that was dropped from memory. OBDGui (sims/current/sim1.py) is timed
+the same way over its own simulation ticks. Results can be written as JSON
+and compared against an earlier run. Example:
+
+    python benchmarks/bench_dashboard.py --rows 1000,100000,10000000 --json after.json --baseline before.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from bench_playback import synthetic_frame
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+WRITE_BLOCK_ROWS = 500_000  # Synthetic CSVs are generated this many rows at a time
+LOAD_TIMEOUT = 600  # Seconds allowed for one load
+PLAYBACK_RATE = 16  # Journey seconds per wall second for the playback frames
+FRAME_SECONDS = 0.033  # Wall time between playback frames (the viewer's RENDER_INTERVAL_MS)
+
+
+def write_journey_csv(path, rows):
+    """Simulator-layout CSV with `rows` rows, built block by block to keep memory flat"""
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        for block, start in enumerate(range(0, rows, WRITE_BLOCK_ROWS)):
+            frame = synthetic_frame(min(WRITE_BLOCK_ROWS, rows - start), seed=block)
+            frame['timestamp'] += start * 0.05
+            frame.to_csv(f, header=(start == 0), index=False, float_format='%.3f')
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)  # Bytes on macOS, KiB on Linux
+
+
+def frame_summary(seconds, prefix=''):
+    ms = np.asarray(seconds) * 1000
+    return {
+        f'{prefix}frames': len(ms),
+        f'{prefix}mean_ms': round(float(ms.mean()), 4),
+        f'{prefix}p50_ms': round(float(np.percentile(ms, 50)), 4),
+        f'{prefix}p99_ms': round(float(np.percentile(ms, 99)), 4),
+        f'{prefix}max_ms': round(float(ms.max()), 4),
+    }
+
+
+def _wait(app, done, what):
+    deadline = time.perf_counter() + LOAD_TIMEOUT
+    while not done():
+        if time.perf_counter() > deadline:
+            raise TimeoutError(f"{what} took over {LOAD_TIMEOUT}s")
+        app.processEvents()
+        time.sleep(0.001)
+
+
+def measure_viewer(app, path, frames):
+    from dashboard_playback import OBDViewer
+    viewer = OBDViewer()
+    start = time.perf_counter()
+    viewer.load_journey(path)
+    _wait(app, lambda: viewer.clock is not None or viewer.journey.error is not None, "first chunk")
+    if viewer.journey.error is not None:
+        raise viewer.journey.error
+    first_frame = time.perf_counter() - start
+    _wait(app, lambda: viewer.journey.complete, "load")
+    total = time.perf_counter() - start
+    viewer.pause()
+
+    clock = viewer.clock
+    playback = clock.start_time + np.arange(frames) * FRAME_SECONDS * PLAYBACK_RATE
+    seeks = np.random.default_rng(1).uniform(clock.start_time, clock.end_time, frames)
+    timed = {}
+    for name, targets in (('play', playback), ('seek', seeks)):
+        times = []
+        for t in targets:
+            clock.seek(t)
+            frame_start = time.perf_counter()
+            viewer.update_display()
+            viewer.display.flush()
+            app.processEvents()  # Paint
+            times.append(time.perf_counter() - frame_start)
+        timed[name] = times
+    rows = len(viewer.journey)
+    viewer.close()
+    return {'rows': rows, 'load_first_frame_s': round(first_frame, 4), 'load_total_s': round(total, 4),
+            **frame_summary(timed['play']), **frame_summary(timed['seek'], 'seek_')}
+
+
+def measure_sim(app, frames):
+    from sim1 import OBDGui
+    start = time.perf_counter()
+    gui = OBDGui()
+    gui.rpm_input.setText('8000')
+    gui.speed_input.setText('240')
+    gui.start_monitoring()
+    gui.update_timer.stop()  # Drive the ticks ourselves
+    app.processEvents()
+    startup = time.perf_counter() - start
+
+    times = []
+    for i in range(frames):
+        gui.throttle_pressed = (i // 100) % 2 == 0  # Rev up and down so the gauges keep moving
+        frame_start = time.perf_counter()
+        gui.advance(1)  # One simulation tick per frame
+        gui.display.flush()
+        app.processEvents()
+        times.append(time.perf_counter() - frame_start)
+    gui.close()
+    return {'rows': None, 'load_first_frame_s': round(startup, 4), 'load_total_s': round(startup, 4),
+            **frame_summary(times)}
+
+
+def run_child(args):
+    """Measure one dashboard in this process and print the result as JSON"""
+    os.environ['QT_QPA_PLATFORM'] = 'offscreen'
+    sys.path.insert(0, os.path.join(ROOT, 'sims', 'current'))
+    from PyQt5.QtWidgets import QApplication
+    app = QApplication(sys.argv[:1])
+    if args.child == 'viewer':
+        result = measure_viewer(app, args.data, args.frames)
+    else:
+        result = measure_sim(app, args.frames)
+    result['gui'] = args.child
+    result['peak_rss_mb'] = peak_rss_mb()
+    print(json.dumps(result))
+    return 0
+
+
+def run_in_child(gui, frames, data=None):
+    command = [sys.executable, os.path.abspath(__file__), '--child', gui, '--frames', str(frames)]
+    if data:
+        command += ['--data', data]
+    done = subprocess.run(command, capture_output=True, text=True)
+    if done.returncode:
+        raise RuntimeError(f"{gui} benchmark failed:\n{done.stderr.strip()}")
+    return json.loads(done.stdout.strip().splitlines()[-1])
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def compare(results, baseline_path):
+    """Print the change in load and frame time against an earlier JSON file"""
+    with open(baseline_path, encoding='utf-8') as f:
+        before = {(r['gui'], r['rows']): r for r in json.load(f)['results']}
+    print(f"\nvs {baseline_path}")
+    for r in results:
+        old = before.get((r['gui'], r['rows']))
+        if old is None:
+            continue
+        changes = [f"{key} {100 * (r[key] - old[key]) / old[key]:+.1f}%"
+                   for key in ('load_total_s', 'p50_ms', 'p99_ms', 'seek_p50_ms', 'peak_rss_mb')
+                   if old.get(key) and r.get(key) is not None]
+        print(f"  {r['gui']:>6} {r['rows'] or '-':>9}: " + ", ".join(changes))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark dashboard load and frame time offscreen.")
+    parser.add_argument('--rows', default='1000,10000,100000,1000000,10000000', help="comma separated journey sizes")
+    parser.add_argument('--frames', type=int, default=2000, help="frames timed per run")
+    parser.add_argument('--gui', choices=('viewer', 'sim', 'both'), default='both')
+    parser.add_argument('--data-dir', help="keep the synthetic journeys here (reused between runs)")
+    parser.add_argument('--json', help="write results to this file")
+    parser.add_argument('--baseline', help="earlier --json output to compare against")
+    parser.add_argument('--child', choices=('viewer', 'sim'), help=argparse.SUPPRESS)
+    parser.add_argument('--data', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.child:
+        return run_child(args)
+
+    results = []
+    print(f"{'gui':>6} {'rows':>9} {'first frame':>12} {'load':>9} {'frame p50':>10} {'p99':>9} {'seek p50':>9} {'peak RSS':>9}")
+
+    def report(result):
+        results.append(result)
+        rss = f"{result['peak_rss_mb']:.0f} MB" if result['peak_rss_mb'] is not None else '-'
+        seek = f"{result['seek_p50_ms']:.3f}ms" if 'seek_p50_ms' in result else '-'
+        print(f"{result['gui']:>6} {result['rows'] or '-':>9} {result['load_first_frame_s']:>11.3f}s "
+              f"{result['load_total_s']:>8.3f}s {result['p50_ms']:>8.3f}ms {result['p99_ms']:>7.3f}ms {seek:>9} {rss:>9}")
+
+    if args.gui in ('sim', 'both'):
+        report(run_in_child('sim', args.frames))
+    if args.gui in ('viewer', 'both'):
+        with tempfile.TemporaryDirectory() as tmp:
+            data_dir = args.data_dir or tmp
+            os.makedirs(data_dir, exist_ok=True)
+            for rows in (int(r) for r in args.rows.split(',')):
+                path = os.path.join(data_dir, f'journey_{rows}.csv')
+                if not os.path.exists(path):
+                    write_journey_csv(path, rows)
+                report(run_in_child('viewer', args.frames, path))
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({
+                'created': time.strftime('%Y-%m-%d %H:%M:%S'),
+                'commit': git_commit(),
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'results': results,
+            }, f, indent=2)
+    if args.baseline:
+        compare(results, args.baseline)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,66 @@
+"""Fleet simulation throughput against the number of worker processes.
+
+Simulates the same seeded fleet (sims/current/fleet.py) with 1, 2, 4...
+workers up to the core count and reports simulated rows per second and the
+scaling efficiency against one worker (1.0 = perfectly linear). Example:
+
+    python benchmarks/bench_fleet.py --cars 64 --minutes 30 --json fleet.json
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(ROOT, 'sims', 'current'))
+from fleet import plan_fleet, run_fleet
+
+
+def worker_counts(limit):
+    counts = [1]
+    while counts[-1] * 2 <= limit:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != limit:
+        counts.append(limit)
+    return counts
+
+
+def measure(cars, minutes, workers, fmt):
+    with tempfile.TemporaryDirectory() as tmp:
+        plan = plan_fleet(cars, tmp, seed=1, minutes_range=(minutes, minutes), fmt=fmt, start_time=0.0)
+        start = time.perf_counter()
+        results = run_fleet(plan, workers)
+        elapsed = time.perf_counter() - start
+    rows = sum(result['rows'] for result in results)
+    return {'workers': workers, 'cars': cars, 'rows': rows, 'seconds': round(elapsed, 3),
+            'rows_per_s': round(rows / elapsed)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark fleet simulation scaling across worker processes.")
+    parser.add_argument('--cars', type=int, default=32)
+    parser.add_argument('--minutes', type=float, default=30, help="length of every journey")
+    parser.add_argument('--format', choices=('jrn', 'csv'), default='jrn')
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--json', help="write results to this file")
+    args = parser.parse_args(argv)
+
+    results = []
+    print(f"{'workers':>7} {'rows':>10} {'time':>8} {'rows/s':>11} {'efficiency':>10}")
+    for workers in worker_counts(args.max_workers):
+        result = measure(args.cars, args.minutes, workers, args.format)
+        result['efficiency'] = round(result['rows_per_s'] / (results[0]['rows_per_s'] * workers), 3) if results else 1.0
+        results.append(result)
+        print(f"{workers:>7} {result['rows']:>10} {result['seconds']:>7.2f}s {result['rows_per_s']:>11,} "
+              f"{result['efficiency']:>10.2f}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'cpu_count': os.cpu_count(), 'results': results}, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
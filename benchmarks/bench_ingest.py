@@ -0,0 +1,84 @@
+"""Measure sustained Arduino ingest throughput using the pty stand-in.
+
+Runs the headless logger pipeline against fake_arduino.FakeArduino at each
+requested rate: SerialReader hands over raw chunks, ChunkParser (with
+protocol_rules=True, so it keeps what parse_line keeps) validates them in
+bulk, and JourneyWriter.write_text writes the valid lines as they are. It
+reports lines/s logged and the drop rate. Linux/macOS only. Example:
+
+    python benchmarks/bench_ingest.py --rates 1000,10000,40000 --duration 5
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(ROOT, 'arduino', 'working'))
+from fake_arduino import FakeArduino
+from headless_logger import HeadlessLogger, parse_args as logger_args
+
+DEFAULT_REPLAY = os.path.join(ROOT, 'csv', 'arduinoCSV', '8-6-25.csv')
+SETTLE_SECONDS = 0.5  # Time allowed for the logger to drain after the source stops
+
+
+def run_once(rate, duration, replay, corrupt_rate, logger_extra):
+    """Drive the logger at one rate and return a result dict"""
+    arduino = FakeArduino(replay, rate=rate, corrupt_rate=corrupt_rate, duration=duration)
+    with tempfile.TemporaryDirectory() as tmp:
+        output = os.path.join(tmp, 'bench.csv')
+        logger = HeadlessLogger(logger_args(['--port', arduino.port, '--output', output] + logger_extra))
+        thread = threading.Thread(target=logger.run, daemon=True)
+        thread.start()
+        time.sleep(0.2)  # Let the port open before data starts
+        start = time.perf_counter()
+        arduino.start()
+        arduino.join()
+        elapsed = time.perf_counter() - start
+        time.sleep(SETTLE_SECONDS)
+        logger.stop()
+        thread.join()
+        arduino.close()
+
+    stats = arduino.stats()
+    expected = stats['sent'] - stats['corrupted']
+    lost = max(0, expected - logger.rows_logged)
+    return {
+        'target_rate': rate,
+        'seconds': round(elapsed, 3),
+        'sent': stats['sent'],
+        'corrupted': stats['corrupted'],
+        'pty_overruns': stats['overruns'],
+        'logged': logger.rows_logged,
+        'lines_per_s': round(logger.rows_logged / elapsed, 1),
+        'drop_rate': round(lost / expected, 6) if expected else 0.0,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark Arduino ingest against a pty stand-in.")
+    parser.add_argument('--rates', default='100,1000,10000,40000', help="comma separated lines/s to test")
+    parser.add_argument('--duration', type=float, default=3.0, help="seconds per rate")
+    parser.add_argument('--replay', default=DEFAULT_REPLAY, help="journey CSV to replay")
+    parser.add_argument('--corrupt', type=float, default=0.0, help="fraction of corrupted lines")
+    parser.add_argument('--json', help="also write results to this file")
+    args, logger_extra = parser.parse_known_args(argv)  # Unknown flags go to the logger, e.g. --durability fsync
+
+    results = []
+    print(f"{'rate':>8} {'sent':>9} {'logged':>9} {'lines/s':>10} {'overruns':>9} {'drop %':>8}")
+    for rate in (float(r) for r in args.rates.split(',')):
+        result = run_once(rate, args.duration, args.replay, args.corrupt, logger_extra)
+        results.append(result)
+        print(f"{rate:>8g} {result['sent']:>9} {result['logged']:>9} {result['lines_per_s']:>10.1f} "
+              f"{result['pty_overruns']:>9} {result['drop_rate'] * 100:>7.3f}%")
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
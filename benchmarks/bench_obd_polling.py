@@ -0,0 +1,106 @@
+"""Compare OBD-II polling strategies against the ELM327 pty stand-in.
+
+Polls RPM, SPEED, THROTTLE_POS, ENGINE_LOAD and COOLANT_TEMP from
+sims/current/fake_elm327.py for a few seconds with each strategy and
+reports the requests per second, how often RPM and the other PIDs are
+refreshed, and the round trip time. The strategies are:
+
+    single     one request per PID, all five every cycle
+    batched    all five PIDs in one mode 01 request (multi-frame reply)
+    rpm-first  RPM every cycle plus one other PID in turn, like testfinal.py
+
+Linux/macOS only. Example:
+
+    python benchmarks/bench_obd_polling.py --latency 0.03 --baud 38400 --seconds 5
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import serial
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(ROOT, 'sims', 'current'))
+from fake_elm327 import DEFAULT_BAUD, DEFAULT_LATENCY, FakeELM327, Telemetry
+
+RPM = '0C'
+OTHERS = ['0D', '11', '04', '05']
+STRATEGIES = {
+    'single': lambda cycle: [[RPM]] + [[pid] for pid in OTHERS],
+    'batched': lambda cycle: [[RPM] + OTHERS],
+    'rpm-first': lambda cycle: [[RPM], [OTHERS[cycle % len(OTHERS)]]],
+}
+INIT_COMMANDS = [b'ATZ', b'ATE0', b'ATH0', b'ATS0', b'ATL0', b'ATSP0']
+
+
+def query(port, command):
+    port.write(command + b'\r')
+    reply = port.read_until(b'>')
+    if not reply.endswith(b'>'):
+        raise TimeoutError(f"no prompt after {command!r}")
+    return reply
+
+
+def measure(strategy, latency, baud, seconds):
+    elm = FakeELM327(Telemetry.simulate(minutes=5), latency=latency, baud=baud)
+    elm.start()
+    port = serial.Serial(elm.port, baud or 38400, timeout=2)
+    try:
+        for command in INIT_COMMANDS:
+            query(port, command)
+        counts = {pid: 0 for pid in [RPM] + OTHERS}
+        round_trips = []
+        cycle = 0
+        start = time.perf_counter()
+        while time.perf_counter() - start < seconds:
+            for pids in STRATEGIES[strategy](cycle):
+                sent = time.perf_counter()
+                reply = query(port, ('01' + ''.join(pids)).encode('ascii'))
+                round_trips.append(time.perf_counter() - sent)
+                if b'NO DATA' not in reply:
+                    for pid in pids:
+                        counts[pid] += 1
+            cycle += 1
+        elapsed = time.perf_counter() - start
+    finally:
+        port.close()
+        elm.close()
+    round_trips.sort()
+    return {
+        'strategy': strategy,
+        'requests_per_s': round(len(round_trips) / elapsed, 1),
+        'rpm_hz': round(counts[RPM] / elapsed, 1),
+        'other_hz': round(sum(counts[pid] for pid in OTHERS) / len(OTHERS) / elapsed, 1),
+        'mean_ms': round(sum(round_trips) / len(round_trips) * 1000, 2),
+        'p95_ms': round(round_trips[int(len(round_trips) * 0.95)] * 1000, 2),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark OBD polling strategies against a fake ELM327.")
+    parser.add_argument('--latency', type=float, default=DEFAULT_LATENCY, help="ECU reply time in seconds")
+    parser.add_argument('--baud', type=int, default=DEFAULT_BAUD, help="serial speed, 0 for unlimited")
+    parser.add_argument('--seconds', type=float, default=5, help="time spent on each strategy")
+    parser.add_argument('--strategy', action='append', choices=sorted(STRATEGIES),
+                        help="strategies to run (repeatable, default all)")
+    parser.add_argument('--json', help="write results to this file")
+    args = parser.parse_args(argv)
+
+    results = []
+    print(f"{'strategy':>10} {'req/s':>7} {'rpm Hz':>7} {'other Hz':>8} {'mean':>8} {'p95':>8}")
+    for strategy in args.strategy or STRATEGIES:
+        result = measure(strategy, args.latency, args.baud, args.seconds)
+        results.append(result)
+        print(f"{strategy:>10} {result['requests_per_s']:>7} {result['rpm_hz']:>7} {result['other_hz']:>8} "
+              f"{result['mean_ms']:>6.1f}ms {result['p95_ms']:>6.1f}ms")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'latency': args.latency, 'baud': args.baud, 'results': results}, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,109 @@
+"""Compare the per-line Python parse with journey.fastparse.parse_chunk.
+
+Two cases: the live ingest path (raw serial bytes -> rows) and offline
+conversion of a journey CSV to columns. Example:
+
+    python benchmarks/bench_parse.py --lines 1000000
+"""
+import argparse
+import csv
+import os
+import random
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+from journey.fastparse import parse_chunk
+from journey.protocol import parse_line
+from journey.binformat import read_csv_columns
+
+CHUNK_BYTES = 64 * 1024  # Roughly what the reader thread hands over per drain at high rates
+
+
+def make_serial_bytes(n_lines, corrupt_rate, seed=0):
+    rng = random.Random(seed)
+    lines = [b"NEO-6M GPS Initialized\r\n", b"timestamp,rpm,speed,lat,lon\r\n"]
+    for i in range(n_lines):
+        line = b"%d,%.2f,%.2f,%.6f,%.6f\r\n" % (i * 50, rng.uniform(700, 6000), rng.uniform(0, 120), -36.9 + i * 1e-6, 174.8)
+        if rng.random() < corrupt_rate:
+            line = line[len(line) // 2:]
+        lines.append(line)
+    return b"".join(lines)
+
+
+def per_line(data):
+    """What arduino_save.py does: split into lines, validate, convert each field"""
+    rows = []
+    for raw in data.split(b"\n"):
+        fields = parse_line(raw)
+        if fields:
+            try:
+                rows.append([float(f) for f in fields])
+            except ValueError:
+                pass
+    return len(rows)
+
+
+def bulk(data):
+    valid = 0
+    tail = b""
+    for start in range(0, len(data), CHUNK_BYTES):
+        parsed = parse_chunk(tail + data[start:start + CHUNK_BYTES])
+        tail = parsed.tail
+        valid += parsed.n_valid
+    return valid
+
+
+def slow_csv_columns(path):
+    """The csv module path that binformat used before the fast path"""
+    with open(path, newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        columns = [[] for _ in header]
+        for row in reader:
+            if len(row) == len(header):
+                for values, field in zip(columns, row):
+                    values.append(float(field))
+    return {name: np.asarray(values) for name, values in zip(header, columns)}
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark bulk vs per-line parsing.")
+    parser.add_argument('--lines', type=int, default=500000)
+    parser.add_argument('--corrupt', type=float, default=0.001)
+    args = parser.parse_args(argv)
+
+    data = make_serial_bytes(args.lines, args.corrupt)
+    t_line, n_line = timed(per_line, data)
+    t_bulk, n_bulk = timed(bulk, data)
+    print(f"live ingest, {args.lines} lines ({len(data) / 1e6:.1f} MB)")
+    print(f"  per-line: {t_line:.3f}s  {n_line / t_line:,.0f} rows/s")
+    print(f"  bulk:     {t_bulk:.3f}s  {n_bulk / t_bulk:,.0f} rows/s  ({t_line / t_bulk:.1f}x)")
+    if n_line != n_bulk:
+        print(f"  note: row counts differ ({n_line} vs {n_bulk})")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'journey.csv')
+        with open(path, 'wb') as f:
+            f.write(b"timestamp,rpm,speed,lat,lon\n" + b"".join(
+                line for line in data.replace(b"\r", b"").splitlines(True)[2:] if line.count(b",") == 4))
+        t_csv, _ = timed(slow_csv_columns, path)
+        t_fast, _ = timed(read_csv_columns, path)
+    print("offline conversion to columns")
+    print(f"  csv module: {t_csv:.3f}s")
+    print(f"  bulk:       {t_fast:.3f}s  ({t_csv / t_fast:.1f}x)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,104 @@
+"""Per-frame cost of dashboard playback: pandas iloc rows vs Journey arrays.
+
+Builds a synthetic simulator-layout journey, then times the data access
+that OBDViewer.update_display does each tick, the old way (DataFrame.iloc
+plus conversions) and the new way (index reads on Journey arrays).
+With --gui it also times OBDViewer.render_sample under Qt's offscreen
+platform. Example:
+
+    python benchmarks/bench_playback.py --rows 200000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+from journey.model import Journey
+from journey.playback import PlaybackClock
+
+
+def synthetic_frame(rows, seed=0):
+    """DataFrame in the simulator CSV layout"""
+    rng = np.random.default_rng(seed)
+    gears = np.array(["N", "1", "2", "3", "4", "5"])
+    return pd.DataFrame({
+        "timestamp": np.arange(rows) * 0.05,
+        "rpm": rng.integers(750, 8000, rows),
+        "speed": rng.integers(0, 240, rows),
+        "throttle": rng.integers(0, 100, rows),
+        "temp": rng.integers(80, 110, rows),
+        "load": rng.integers(0, 100, rows),
+        "boost": np.round(rng.uniform(0.5, 2.5, rows), 1),
+        "gear": gears[rng.integers(0, 6, rows)],
+        "lat": np.zeros(rows),
+        "lon": np.zeros(rows),
+    })
+
+
+def iloc_frames(data, indices):
+    for i in indices:
+        row = data.iloc[i]
+        int(row["rpm"]), int(row["speed"]), int(row["throttle"]), int(row["temp"])
+        int(row["load"]), float(row["boost"]), str(row["gear"]), int(row["timestamp"])
+
+
+def array_frames(journey, indices):
+    for i in indices:
+        int(journey.rpm[i]), int(journey.speed[i]), int(journey.throttle[i]), int(journey.temp[i])
+        int(journey.load[i]), float(journey.boost[i]), journey.gear_label(i), int(journey.timestamp[i])
+
+
+def per_frame_us(func, data, indices):
+    start = time.perf_counter()
+    func(data, indices)
+    return (time.perf_counter() - start) / len(indices) * 1e6
+
+
+def gui_frame_us(journey, indices):
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    sys.path.insert(0, os.path.join(ROOT, 'sims', 'current'))
+    from PyQt5.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication(sys.argv)
+    from dashboard_playback import OBDViewer
+    viewer = OBDViewer()
+    viewer.journey = journey
+    viewer.clock = PlaybackClock(journey.timestamp)  # As _start_playback does; render_sample reads its start time
+    start = time.perf_counter()
+    for i in indices:
+        viewer.render_sample(i)
+        viewer.display.flush()  # Push to the widgets now rather than at the next screen refresh
+    elapsed = time.perf_counter() - start
+    viewer.close()
+    return elapsed / len(indices) * 1e6
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark dashboard playback frame cost.")
+    parser.add_argument('--rows', type=int, default=200000)
+    parser.add_argument('--frames', type=int, default=20000)
+    parser.add_argument('--gui', action='store_true', help="also time the full widget update offscreen")
+    args = parser.parse_args(argv)
+
+    data = synthetic_frame(args.rows)
+    start = time.perf_counter()
+    journey = Journey.from_dataframe(data)
+    convert_ms = (time.perf_counter() - start) * 1000
+    indices = np.random.default_rng(1).integers(0, args.rows, args.frames).tolist()
+
+    before = per_frame_us(iloc_frames, data, indices)
+    after = per_frame_us(array_frames, journey, indices)
+    print(f"{args.rows} rows, {args.frames} frames (one-off conversion {convert_ms:.1f} ms)")
+    print(f"  iloc row access:  {before:8.2f} us/frame")
+    print(f"  Journey arrays:   {after:8.2f} us/frame  ({before / after:.0f}x)")
+    if args.gui:
+        print(f"  full render_sample: {gui_frame_us(journey, indices):.2f} us/frame")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,54 @@
+"""Seek latency on a long memory-mapped journey.
+
+Writes a synthetic timestamp column to disk, memory-maps it and times
+random seeks through journey.index.SeekIndex (build time includes reading
+the keyframes). Example:
+
+    python benchmarks/bench_seek.py --rows 10000000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+from journey.index import SeekIndex
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark keyframe seeking on a memory-mapped journey.")
+    parser.add_argument('--rows', type=int, default=10_000_000)
+    parser.add_argument('--seeks', type=int, default=10000)
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'timestamps.f8')
+        np.cumsum(rng.uniform(0.04, 0.06, args.rows)).tofile(path)  # ~20 Hz logging
+        timestamps = np.memmap(path, dtype=np.float64, mode='r')
+
+        start = time.perf_counter()
+        index = SeekIndex(timestamps)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        targets = rng.uniform(timestamps[0], timestamps[-1], args.seeks)
+        start = time.perf_counter()
+        for t in targets:
+            index.locate(t)
+        per_seek_us = (time.perf_counter() - start) / args.seeks * 1e6
+
+        sample = targets[:100]
+        expected = np.searchsorted(timestamps, sample, side='right') - 1
+        assert all(index.locate(t) == e for t, e in zip(sample, expected))
+        del timestamps, index
+
+    print(f"{args.rows:,} rows: index build {build_ms:.1f} ms, {per_seek_us:.1f} us per seek")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1 @@
+"""Shared journey logging and playback helpers used by the Arduino logger and the sims"""
@@ -0,0 +1,360 @@
+"""Binary columnar journey format (.jrn).
+
+Layout (all little-endian):
+    magic      4s   b"JRNY"
+    version    u2
+    n_columns  u2
+    n_rows     u8
+    then one 32 byte entry per column: name (16s), dtype (8s), data offset (u8)
+    then each column's values stored contiguously, aligned to 8 bytes
+
+Only the channels the source logged are stored. Timestamps are epoch
+seconds. Missing values are NaN for float columns and -1 for gear (0 is
+neutral).
+
+This module also holds the CSV readers, with schema detection for the three
+logger layouts.
+"""
+import csv
+import os
+import re
+import struct
+import sys
+from datetime import datetime
+
+import numpy as np
+
+from journey.fastparse import parse_chunk
+
+MAGIC = b"JRNY"
+VERSION = 1
+HEADER = struct.Struct("<4sHHQ")
+COLUMN_ENTRY = struct.Struct("<16s8sQ")
+ALIGN = 8
+
+# Fixed column set, in file order
+COLUMNS = (
+    ("timestamp", "<f8"),  # Seconds (Arduino millis are converted, wall-clock strings become epoch seconds)
+    ("rpm", "<f4"),
+    ("speed", "<f4"),
+    ("throttle", "<f4"),
+    ("temp", "<f4"),
+    ("load", "<f4"),
+    ("boost", "<f4"),
+    ("gear", "<i1"),
+    ("lat", "<f8"),
+    ("lon", "<f8"),
+)
+COLUMN_NAMES = tuple(name for name, _ in COLUMNS)
+GEAR_MISSING = -1
+WALL_CLOCK_FORMAT = "%Y-%m-%d %H:%M:%S"
+WALL_CLOCK_WIDTH = 19
+_WALL_CLOCK_SEPARATORS = [4, 7, 10, 13, 16, 19]
+_WALL_CLOCK_BYTES = np.frombuffer(b"-- ::,", dtype=np.uint8)
+_WALL_CLOCK_DIGITS = [i for i in range(WALL_CLOCK_WIDTH) if i not in _WALL_CLOCK_SEPARATORS]
+NAME_STAMP_FORMAT = "%Y%m%d_%H%M%S"
+_NAME_STAMP = re.compile(r"\d{8}_\d{6}")
+
+# CSV layouts written by the loggers in this repo
+SCHEMA_ARDUINO = "arduino"  # timestamp,rpm,speed,lat,lon with millis since the board started
+SCHEMA_WALL_CLOCK = "wall_clock"  # Same columns with YYYY-mm-dd HH:MM:SS local times (csvMaker.py, demo data)
+SCHEMA_SIM = "sim"  # 10 columns, seconds since the simulator started
+SCHEMA_JRN = "jrn"  # Converted .jrn file, already on an epoch time axis
+
+# Where an epoch time axis came from
+TIME_SOURCE_WALL_CLOCK = "wall_clock"
+TIME_SOURCE_FILENAME = "filename"
+TIME_SOURCE_MTIME = "mtime"
+
+
+def _align(offset):
+    return (offset + ALIGN - 1) // ALIGN * ALIGN
+
+
+def write_journey(path, columns):
+    """Write a dict of column name -> array to a .jrn file.
+
+    Only the columns in the dict are stored, so a reader can tell a channel
+    the logger never had from one with missing values.
+    """
+    n_rows = len(columns["timestamp"])
+    stored = [(name, dtype) for name, dtype in COLUMNS if name in columns]
+    arrays = []
+    for name, dtype in stored:
+        values = np.ascontiguousarray(columns[name], dtype=dtype)
+        if len(values) != n_rows:
+            raise ValueError(f"column {name!r} has {len(values)} rows, expected {n_rows}")
+        arrays.append(values)
+
+    offset = _align(HEADER.size + COLUMN_ENTRY.size * len(stored))
+    entries = []
+    for (name, dtype), values in zip(stored, arrays):
+        entries.append(COLUMN_ENTRY.pack(name.encode("ascii"), dtype.encode("ascii"), offset))
+        offset = _align(offset + values.nbytes)
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(stored), n_rows))
+        f.write(b"".join(entries))
+        for values in arrays:
+            f.seek(_align(f.tell()))
+            f.write(values.tobytes())
+        f.truncate(_align(f.tell()))
+    os.replace(tmp_path, path)  # Never leave a half-written journey behind
+
+
+class MappedJourney:
+    """Read-only view of a .jrn file; each column is a zero-copy numpy view of the mapping"""
+
+    def __init__(self, path):
+        self.path = path
+        self._map = np.memmap(path, dtype=np.uint8, mode="r")
+        if self._map.size < HEADER.size:
+            raise ValueError(f"{path} is too small to be a journey file")
+        magic, version, n_columns, n_rows = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a journey file")
+        if version != VERSION:
+            raise ValueError(f"{path} has unsupported journey version {version}")
+        self.n_rows = n_rows
+        self.columns = {}
+        for i in range(n_columns):
+            raw_name, raw_dtype, offset = COLUMN_ENTRY.unpack_from(self._map, HEADER.size + i * COLUMN_ENTRY.size)
+            name = raw_name.rstrip(b"\0").decode("ascii")
+            dtype = np.dtype(raw_dtype.rstrip(b"\0").decode("ascii"))
+            end = offset + n_rows * dtype.itemsize
+            if end > self._map.size:
+                raise ValueError(f"{path} is truncated (column {name!r})")
+            self.columns[name] = self._map[offset:end].view(dtype)
+
+    def __len__(self):
+        return self.n_rows
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def __contains__(self, name):
+        return name in self.columns
+
+    def keys(self):
+        return self.columns.keys()
+
+
+def open_journey(path):
+    """Memory-map a .jrn file without parsing or copying it"""
+    return MappedJourney(path)
+
+
+def _parse_gear(value):
+    value = value.strip()
+    if value in ("N", "0"):
+        return 0
+    try:
+        return int(value)
+    except ValueError:
+        return GEAR_MISSING
+
+
+def _parse_float(value):
+    try:
+        return float(value)
+    except ValueError:
+        return np.nan
+
+
+def _parse_time(value):
+    """Return seconds for a numeric timestamp, or epoch seconds for a wall-clock string"""
+    try:
+        return float(value), True
+    except ValueError:
+        return datetime.strptime(value.strip(), WALL_CLOCK_FORMAT).timestamp(), False
+
+
+def detect_schema(header, first_value):
+    """Which logger wrote a CSV, from its header and the first timestamp field"""
+    try:
+        float(first_value)
+    except ValueError:
+        return SCHEMA_WALL_CLOCK
+    # The Arduino sketch stamps rows with millis(); only it has the 5 column layout with numeric time
+    return SCHEMA_SIM if "throttle" in header else SCHEMA_ARDUINO
+
+
+def sniff_schema(csv_path):
+    """(header, schema) from the first lines of a CSV"""
+    with open(csv_path, "rb") as f:
+        header = [h.strip() for h in f.readline().decode("utf-8").split(",")]
+        first_row = f.readline()
+    if "timestamp" not in header:
+        raise ValueError(f"{csv_path} has no timestamp column")
+    return header, detect_schema(header, first_row.split(b",", 1)[0].decode("utf-8", "replace"))
+
+
+def _wall_clock_times(buf, starts, ends):
+    """Epoch seconds (local time) for lines starting 'YYYY-mm-dd HH:MM:SS,'; NaN elsewhere
+
+    The timestamps are overwritten with zeros in `buf`, so the lines become
+    plain numeric CSV for fastparse.
+    """
+    times = np.full(len(starts), np.nan)
+    long_enough = ends - starts > WALL_CLOCK_WIDTH
+    rows = starts[long_enough]
+    shape = buf[rows[:, None] + np.arange(WALL_CLOCK_WIDTH + 1)]
+    ok = np.all(shape[:, _WALL_CLOCK_SEPARATORS] == _WALL_CLOCK_BYTES, axis=1)
+    ok &= np.all((shape[:, _WALL_CLOCK_DIGITS] >= ord("0")) & (shape[:, _WALL_CLOCK_DIGITS] <= ord("9")), axis=1)
+    rows = rows[ok]
+    if not len(rows):
+        return times
+    text = np.ascontiguousarray(shape[ok, :WALL_CLOCK_WIDTH]).view(f"S{WALL_CLOCK_WIDTH}").ravel()
+    utc = text.astype("datetime64[s]").astype(np.int64).astype(np.float64)  # Raises on impossible dates
+    # numpy reads them as UTC; shift to local time like datetime.timestamp() does (one offset per file)
+    first = datetime.strptime(text[0].decode("ascii"), WALL_CLOCK_FORMAT).timestamp()
+    times[np.flatnonzero(long_enough)[ok]] = utc + (first - utc[0])
+    buf[rows[:, None] + np.arange(WALL_CLOCK_WIDTH)] = ord("0")
+    return times
+
+
+def decode_rows(body, header, schema):
+    """Parse whole CSV lines (no header) of a known schema into typed columns.
+
+    Timestamps are seconds: millis are divided by 1000 for the Arduino layout
+    and wall-clock strings become epoch seconds. Lines that don't parse are
+    skipped.
+    """
+    if not body.endswith(b"\n"):
+        body += b"\n"
+    if "gear" in header:
+        body = body.replace(b",N,", b",0,")  # Neutral is gear 0
+    times = None
+    if schema == SCHEMA_WALL_CLOCK:
+        buf = np.frombuffer(body, dtype=np.uint8).copy()
+        ends = np.flatnonzero(buf == ord("\n"))
+        starts = np.concatenate(([0], ends[:-1] + 1))
+        times = _wall_clock_times(buf, starts, ends)
+        body = buf.tobytes()
+    parsed = parse_chunk(body, len(header))
+    dtypes = dict(COLUMNS)
+    columns = {name: parsed.column(i).astype(dtypes[name]) for i, name in enumerate(header) if name in dtypes}
+    if "timestamp" not in columns:
+        raise ValueError("no timestamp column")
+    if times is not None:
+        columns["timestamp"] = times[parsed.valid]
+        if np.isnan(columns["timestamp"]).any():
+            raise ValueError("unparseable wall-clock timestamps")
+    elif schema == SCHEMA_ARDUINO:
+        columns["timestamp"] = columns["timestamp"] / 1000.0
+    return columns
+
+
+def _read_csv_module(csv_path):
+    """Row by row fallback for files the vectorized path can't take (e.g. wall-clock times in another format)"""
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = [h.strip() for h in next(reader)]
+        index = {name: i for i, name in enumerate(header)}
+        wanted = [name for name in COLUMN_NAMES if name in index]
+        values = {name: [] for name in wanted}
+        numeric_time = True
+        for row in reader:
+            if len(row) != len(header):
+                continue  # Skip torn or banner lines
+            try:
+                t, numeric_time = _parse_time(row[index["timestamp"]])
+            except ValueError:
+                continue
+            values["timestamp"].append(t)
+            for name in wanted[1:]:
+                raw = row[index[name]]
+                values[name].append(_parse_gear(raw) if name == "gear" else _parse_float(raw))
+
+    columns = {name: np.asarray(v, dtype=dict(COLUMNS)[name]) for name, v in values.items()}
+    if numeric_time and "throttle" not in index:
+        columns["timestamp"] = columns["timestamp"] / 1000.0
+    return columns
+
+
+def read_csv_columns(csv_path):
+    """Parse any of the existing CSV layouts into the fixed column set.
+
+    Handles the Arduino logger (integer millis), the wall-clock journeys from
+    csvMaker.py / the demo data and the 10 column simulator output, each
+    through the vectorized journey.fastparse path. Times are seconds as
+    logged (see read_journey_columns for an epoch time axis).
+    """
+    header, schema = sniff_schema(csv_path)
+    with open(csv_path, "rb") as f:
+        f.readline()
+        body = f.read()
+    try:
+        return decode_rows(body, header, schema)
+    except ValueError:
+        return _read_csv_module(csv_path)
+
+
+def time_origin(csv_path, schema, first_time, last_time):
+    """(epoch seconds of time 0, how it was found) for a CSV journey
+
+    Wall-clock files are already epoch based. The simulator and Arduino only
+    log seconds since they started, so time 0 comes from a
+    YYYYmmdd_HHMMSS stamp in the file name (the simulator's default name,
+    taken when the first row is logged) or else from the file's modification
+    time, which is when the last row was written.
+    """
+    if schema == SCHEMA_WALL_CLOCK:
+        return 0.0, TIME_SOURCE_WALL_CLOCK
+    match = _NAME_STAMP.search(os.path.basename(csv_path))
+    if match:
+        try:
+            stamp = datetime.strptime(match.group(0), NAME_STAMP_FORMAT).timestamp()
+            return stamp - first_time, TIME_SOURCE_FILENAME
+        except ValueError:
+            pass
+    return os.path.getmtime(csv_path) - last_time, TIME_SOURCE_MTIME
+
+
+def read_journey_columns(csv_path):
+    """Columns with an epoch timestamp axis, plus (schema, time origin, time source)"""
+    header, schema = sniff_schema(csv_path)
+    columns = read_csv_columns(csv_path)
+    timestamps = columns["timestamp"]
+    if len(timestamps):
+        origin, source = time_origin(csv_path, schema, float(timestamps[0]), float(timestamps[-1]))
+    else:
+        origin, source = time_origin(csv_path, schema, 0.0, 0.0)
+    columns["timestamp"] = timestamps + origin
+    return columns, schema, origin, source
+
+
+def convert_csv(csv_path, out_path=None):
+    """Convert one CSV journey to .jrn (epoch timestamps), returning the output path"""
+    if out_path is None:
+        out_path = os.path.splitext(csv_path)[0] + ".jrn"
+    columns, _, _, _ = read_journey_columns(csv_path)
+    write_journey(out_path, columns)
+    return out_path
+
+
+def main(argv=None):
+    """Convert CSV journeys given on the command line (directories are searched for *.csv)"""
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        print("Usage: python -m journey.binformat <file.csv|directory> ...")
+        return 1
+    paths = []
+    for arg in argv:
+        if os.path.isdir(arg):
+            for root, _, files in os.walk(arg):
+                paths.extend(os.path.join(root, name) for name in sorted(files) if name.endswith(".csv"))
+        else:
+            paths.append(arg)
+    for path in paths:
+        try:
+            out_path = convert_csv(path)
+            print(f"{path} -> {out_path} ({len(open_journey(out_path))} rows)")
+        except (OSError, ValueError) as e:
+            print(f"Skipping {path}: {e}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
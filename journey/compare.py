@@ -0,0 +1,111 @@
+"""Play several journeys side by side on one clock.
+
+A Comparison is a playback timeline (see journey.playback.PlaybackClock)
+whose locate() returns one row per journey instead of a single row. The
+clock runs in seconds since the start of the first (reference) journey.
+Journeys are lined up either by elapsed time or by distance along the
+route, where each journey is shown at the point it had covered the same
+distance as the reference.
+
+The journeys' arrays are used as they are: each track adds a seek index
+(a few keyframes) and, for distance alignment, one cumulative distance
+array. Loading a .jrn file memory-maps it instead of reading it.
+"""
+import os
+
+import numpy as np
+
+from journey.index import SeekIndex, playback_times
+from journey.model import Journey
+
+ALIGN_TIME = "time"
+ALIGN_DISTANCE = "distance"
+ALIGN_MODES = (ALIGN_TIME, ALIGN_DISTANCE)
+
+
+def cumulative_distance(journey):
+    """Metres covered at each row, integrating speed (km/h) over the timestamps"""
+    speed = np.nan_to_num(journey.speed.astype(np.float64)) / 3.6
+    steps = (speed[1:] + speed[:-1]) * 0.5 * np.diff(journey.timestamp)
+    distance = np.empty(len(journey), dtype=np.float64)
+    distance[:1] = 0.0
+    np.cumsum(np.maximum(steps, 0.0), out=distance[1:])  # Clock steps backwards don't undo distance
+    return distance
+
+
+class Track:
+    """One journey in a comparison"""
+
+    def __init__(self, journey, label):
+        if not len(journey):
+            raise ValueError(f"{label} has no samples")
+        self.journey = journey
+        self.label = label
+        times = playback_times(journey.timestamp)  # Out of order rows play in file order, as in PlaybackClock
+        self.index = SeekIndex(times)
+        self.start_time = float(times[0])
+        self.duration = float(times[-1]) - self.start_time
+        self._distance = None
+
+    @property
+    def distance(self):
+        if self._distance is None:
+            self._distance = cumulative_distance(self.journey)
+        return self._distance
+
+    def row_at_elapsed(self, seconds):
+        return self.index.locate(self.start_time + seconds)
+
+    def row_at_distance(self, metres):
+        """First row at which the journey had covered `metres` (its last row if it never did)"""
+        return min(len(self.journey) - 1, int(np.searchsorted(self.distance, metres, side="left")))
+
+
+class Comparison:
+    """Several journeys on one timeline; the first one is the reference"""
+
+    start_time = 0.0
+
+    def __init__(self, journeys=(), labels=None, align=ALIGN_TIME):
+        if align not in ALIGN_MODES:
+            raise ValueError(f"align must be one of {ALIGN_MODES}")
+        self.align = align
+        self.tracks = []
+        labels = list(labels or [])
+        for i, journey in enumerate(journeys):
+            self.add(journey, labels[i] if i < len(labels) else f"Journey {i + 1}")
+
+    def __len__(self):
+        return len(self.tracks)
+
+    @classmethod
+    def from_files(cls, paths, align=ALIGN_TIME):
+        return cls([Journey.from_file(path) for path in paths],
+                   [os.path.splitext(os.path.basename(path))[0] for path in paths], align)
+
+    def add(self, journey, label=None):
+        self.tracks.append(Track(journey, label or f"Journey {len(self.tracks) + 1}"))
+
+    @property
+    def end_time(self):
+        if not self.tracks:
+            return 0.0
+        if self.align == ALIGN_DISTANCE:
+            return self.tracks[0].duration  # The reference journey sets the pace
+        return max(track.duration for track in self.tracks)
+
+    def locate(self, t):
+        """Row of each journey at t seconds into the reference journey"""
+        reference = self.tracks[0]
+        row = reference.row_at_elapsed(t)
+        if self.align == ALIGN_DISTANCE:
+            metres = reference.distance[row]
+            return (row,) + tuple(track.row_at_distance(metres) for track in self.tracks[1:])
+        return (row,) + tuple(track.row_at_elapsed(t) for track in self.tracks[1:])
+
+    def time_gap(self, rows):
+        """Elapsed seconds each journey is behind the reference at these rows (negative = ahead)"""
+        reference = self.tracks[0]
+        ref_elapsed = reference.journey.timestamp[rows[0]] - reference.start_time
+        return [float(track.journey.timestamp[row] - track.start_time - ref_elapsed)
+                for track, row in zip(self.tracks, rows)]
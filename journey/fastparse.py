@@ -0,0 +1,201 @@
+"""Vectorized bulk parser for raw Arduino/CSV bytes.
+
+`parse_chunk` takes a raw byte chunk straight off the serial port or out of a
+file, which may end part way through a line, and parses every complete line
+in one pass with numpy instead of decoding and splitting each line in Python.
+Lines that aren't exactly `n_fields` numeric fields (banners, headers, glitches)
+are masked out rather than raising. With protocol_rules=True (serial ingest)
+lines are kept by journey.protocol.parse_line's rules instead: any non-banner
+line with `n_fields` fields, with NaN for fields that aren't numbers.
+"""
+import csv
+import io
+import warnings
+
+import numpy as np
+
+from journey.protocol import BANNER_PREFIXES
+
+NEWLINE = ord("\n")
+CR = ord("\r")
+COMMA = ord(",")
+
+# Bytes allowed in a numeric CSV line (digits, sign, point, exponent, separator, CR)
+_NUMERIC_BYTES = np.zeros(256, dtype=bool)
+_NUMERIC_BYTES[np.frombuffer(b"0123456789+-.eE,\r", dtype=np.uint8)] = True
+_LINE_START_BYTES = np.zeros(256, dtype=bool)
+_LINE_START_BYTES[np.frombuffer(b"0123456789+-.", dtype=np.uint8)] = True
+
+
+class ParsedChunk:
+    """Result of parse_chunk: one row per complete line in the chunk"""
+
+    __slots__ = ("values", "valid", "tail", "_buf", "_starts", "_ends", "_fields")
+
+    def __init__(self, values, valid, tail, buf, starts, ends, fields=None):
+        self.values = values  # (lines, fields) float64, NaN on masked lines
+        self.valid = valid  # (lines,) bool, False for malformed lines
+        self.tail = tail  # Bytes after the last newline, to prepend to the next chunk
+        self._buf = buf
+        self._starts = starts
+        self._ends = ends
+        self._fields = fields or {}  # Line index -> text fields, for lines kept with non-numeric fields
+
+    def __len__(self):
+        return len(self.valid)
+
+    @property
+    def n_valid(self):
+        return int(np.count_nonzero(self.valid))
+
+    def column(self, i):
+        """Values of field i for the valid lines only"""
+        return self.values[self.valid, i]
+
+    def columns(self, names):
+        """Dict of name -> valid values, in field order"""
+        rows = self.values[self.valid]
+        return {name: rows[:, i] for i, name in enumerate(names)}
+
+    def text(self, start=0, stop=None):
+        """The original bytes of valid lines [start:stop], LF terminated with CRs removed"""
+        selected = np.zeros(len(self.valid), dtype=bool)
+        indices = np.flatnonzero(self.valid)[start:stop]
+        selected[indices] = True
+        if not selected.any():
+            return b""
+        if self._fields and any(i in self._fields for i in indices.tolist()):
+            return self._text_by_line(indices)
+        # Per-byte keep mask: each line's bytes plus its newline, taken from the line mask
+        lengths = self._ends - self._starts + 1
+        keep = np.repeat(selected, lengths)
+        keep &= self._buf[:len(keep)] != CR
+        return self._buf[:len(keep)][keep].tobytes()
+
+    def _text_by_line(self, indices):
+        """text() one line at a time; non-numeric lines are written as CSV from their fields, like the GUI does"""
+        out = io.StringIO()
+        writer = csv.writer(out, lineterminator="\n")
+        raw = self._buf.tobytes()
+        for i in indices.tolist():
+            if i in self._fields:
+                writer.writerow(self._fields[i])
+            else:
+                out.write(raw[self._starts[i]:self._ends[i]].replace(b"\r", b"").decode("ascii") + "\n")
+        return out.getvalue().encode("utf-8")
+
+
+def _empty(n_fields, tail):
+    empty = np.zeros(0, dtype=np.int64)
+    return ParsedChunk(np.zeros((0, n_fields)), np.zeros(0, dtype=bool), tail, np.zeros(0, dtype=np.uint8), empty, empty)
+
+
+def _parse_slow(buf, starts, ends, candidates, n_fields, values, valid):
+    """Per-line fallback for chunks where the bulk conversion hit a bad number"""
+    raw = buf.tobytes()
+    for i in np.flatnonzero(candidates):
+        try:
+            values[i] = [float(f) for f in raw[starts[i]:ends[i]].split(b",")]
+            valid[i] = True
+        except ValueError:
+            pass
+
+
+def _parse_protocol(buf, starts, ends, lines, n_fields, values, valid):
+    """Keep the lines journey.protocol.parse_line would, with NaN for non-numeric fields
+
+    Returns line index -> the line's text fields.
+    """
+    raw = buf.tobytes()
+    fields = {}
+    for i in np.flatnonzero(lines):
+        line = raw[starts[i]:ends[i]].decode("utf-8", errors="ignore").strip()
+        if not line or line.startswith(BANNER_PREFIXES):
+            continue
+        data = line.split(",")
+        if len(data) != n_fields:
+            continue
+        for j, field in enumerate(data):
+            try:
+                values[i, j] = float(field)
+            except ValueError:
+                pass  # Stays NaN
+        valid[i] = True
+        fields[i] = data
+    return fields
+
+
+def parse_chunk(chunk, n_fields=5, protocol_rules=False):
+    """Parse every complete line of `chunk` into float64 columns.
+
+    Returns a ParsedChunk; its `tail` holds the trailing partial line (if any).
+    With protocol_rules, lines that aren't all numbers are still kept if
+    journey.protocol.parse_line would keep them.
+    """
+    last_newline = chunk.rfind(b"\n")
+    if last_newline < 0:
+        return _empty(n_fields, bytes(chunk))
+    tail = bytes(chunk[last_newline + 1:])
+    buf = np.frombuffer(chunk, dtype=np.uint8, count=last_newline + 1)
+
+    ends = np.flatnonzero(buf == NEWLINE)
+    starts = np.empty_like(ends)
+    starts[0] = 0
+    starts[1:] = ends[:-1] + 1
+    n_lines = len(ends)
+
+    # Per-line comma and bad-byte counts: locate each kind of byte once, then count per line by bisection
+    commas = np.searchsorted(np.flatnonzero(buf == COMMA), ends)
+    bad = np.searchsorted(np.flatnonzero(~_NUMERIC_BYTES[buf]), ends, side="right")  # Includes each line's own newline
+    n_commas = np.diff(commas, prepend=0)
+    n_bad = np.diff(bad, prepend=0) - 1
+    non_empty = ends > starts
+    first = buf[starts]
+    candidates = non_empty & (n_commas == n_fields - 1) & (n_bad == 0) & _LINE_START_BYTES[first]
+
+    values = np.full((n_lines, n_fields), np.nan)
+    valid = np.zeros(n_lines, dtype=bool)
+    n_candidates = int(np.count_nonzero(candidates))
+    if n_candidates:
+        # Keep the candidate lines' bytes and turn separators into spaces for one bulk conversion
+        keep = np.repeat(candidates, ends - starts + 1)
+        text = buf[keep].copy()
+        text[(text == COMMA) | (text == NEWLINE) | (text == CR)] = ord(" ")
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", DeprecationWarning)
+            try:
+                parsed = np.fromstring(text.tobytes(), dtype=np.float64, sep=" ")
+            except (ValueError, DeprecationWarning):
+                parsed = None
+        # Empty fields (",,") or junk like "1.2.3" leave the count short, so fall back per line
+        if parsed is not None and len(parsed) == n_candidates * n_fields:
+            values[candidates] = parsed.reshape(n_candidates, n_fields)
+            valid = candidates.copy()
+        else:
+            _parse_slow(buf, starts, ends, candidates, n_fields, values, valid)
+    fields = None
+    if protocol_rules:
+        rest = ~valid & (n_commas == n_fields - 1)  # parse_line needs exactly n_fields fields
+        if rest.any():
+            fields = _parse_protocol(buf, starts, ends, rest, n_fields, values, valid)
+    return ParsedChunk(values, valid, tail, buf, starts, ends, fields)
+
+
+class ChunkParser:
+    """Stateful wrapper that carries the partial last line between chunks"""
+
+    def __init__(self, n_fields=5, protocol_rules=False):
+        self.n_fields = n_fields
+        self.protocol_rules = protocol_rules
+        self.pending = b""
+        self.lines = 0
+        self.malformed = 0
+
+    def feed(self, chunk):
+        if self.pending:
+            chunk = self.pending + chunk
+        parsed = parse_chunk(chunk, self.n_fields, self.protocol_rules)
+        self.pending = parsed.tail
+        self.lines += len(parsed)
+        self.malformed += len(parsed) - parsed.n_valid
+        return parsed
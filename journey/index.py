@@ -0,0 +1,82 @@
+"""Seek index for journey playback.
+
+A sparse keyframe index keeps every `stride`-th timestamp in a small
+in-memory array. A seek bisects the keyframes, then bisects one block of
+the full timestamp column. So only a couple of pages of a memory-mapped
+journey are touched, whatever its length.
+"""
+import numpy as np
+
+KEYFRAME_STRIDE = 4096  # Rows per keyframe
+
+
+def playback_times(timestamps, previous=None):
+    """Timestamps as the non-decreasing axis a SeekIndex needs
+
+    Out of order rows (a millis counter that reset, appended logs) are played
+    in file order. Each backwards step starts a new segment that is shifted to
+    begin one typical sample interval after the time before it, so every row
+    keeps its own instant. `previous` is the (raw, played) time of the last
+    row of an earlier block of the same journey, which carries the shift over.
+    """
+    raw = np.asarray(timestamps, dtype=np.float64)
+    if not len(raw):
+        return raw
+    if previous is not None:
+        last_raw, last_time = previous
+        raw = np.concatenate(([last_raw], raw))
+        shift = last_time - last_raw
+    else:
+        shift = 0.0
+    steps = np.diff(raw)
+    back = steps < 0
+    if np.any(back):
+        forward = steps[steps > 0]
+        interval = float(np.median(forward)) if len(forward) else 0.0
+        # Each segment moves up by the drop at its start plus one interval
+        shift = shift + np.concatenate(([0.0], np.cumsum(np.where(back, interval - steps, 0.0))))
+    times = raw + shift if np.any(shift) else raw
+    return times[1:] if previous is not None else times
+
+
+class SeekIndex:
+    """Keyframe index over a non-decreasing timestamp column"""
+
+    def __init__(self, timestamps, stride=KEYFRAME_STRIDE):
+        self.stride = stride
+        self.timestamps = timestamps
+        self.n_rows = len(timestamps)
+        # Strided read: touches one value per block, not the whole column
+        self._keys = np.ascontiguousarray(timestamps[::stride], dtype=np.float64)
+        self._last = float(timestamps[-1]) if self.n_rows else np.nan
+
+    def __len__(self):
+        return self.n_rows
+
+    @property
+    def keyframes(self):
+        return self._keys
+
+    @property
+    def start_time(self):
+        return float(self._keys[0]) if len(self._keys) else np.nan
+
+    @property
+    def end_time(self):
+        return self._last
+
+    def keyframe(self, t):
+        """(row, time) of the last keyframe at or before journey time t"""
+        if not len(self._keys):
+            raise ValueError("index is empty")
+        k = max(0, int(np.searchsorted(self._keys, t, side="right")) - 1)
+        return k * self.stride, float(self._keys[k])
+
+    def locate(self, t):
+        """Row of the latest sample at or before journey time t (0 if t is before the start)"""
+        row, _ = self.keyframe(t)
+        block = self.timestamps[row:min(row + self.stride, self.n_rows)]
+        return max(0, row + int(np.searchsorted(block, t, side="right")) - 1)
+
+    def time_at(self, row):
+        return float(self.timestamps[row])
@@ -0,0 +1,185 @@
+"""Append-only write-ahead journal for live journey logging.
+
+Every batch of rows is appended to the journal as a checksummed record
+before the CSV itself is committed, so the CSV can be batched aggressively.
+If the logger dies the journal is left behind and `recover` rebuilds a clean
+CSV from it. A journal is a directory of segment files:
+
+    <journey>.csv.journal/seg-000001.wal, seg-000002.wal, ...
+
+Each segment starts with MAGIC and holds records of
+    type (1 byte) | payload length (u4) | crc32 of payload (u4) | payload
+where the payload is CSV text (the header or a batch of rows).
+"""
+import csv
+import io
+import os
+import struct
+import sys
+import zlib
+
+MAGIC = b"JWAL1\n"
+RECORD = struct.Struct("<BII")
+RECORD_HEADER = ord("H")  # CSV header row
+RECORD_ROWS = ord("R")  # Batch of data rows
+RECORD_END = ord("E")  # Writer closed cleanly
+SEGMENT_BYTES = 4 * 1024 * 1024
+SEGMENT_PREFIX = "seg-"
+SEGMENT_SUFFIX = ".wal"
+
+
+def journal_path(csv_path):
+    """Directory used to journal the given CSV"""
+    return csv_path + ".journal"
+
+
+def _encode_rows(rows):
+    buf = io.StringIO()
+    csv.writer(buf).writerows(rows)
+    return buf.getvalue().encode("utf-8")
+
+
+def _segments(journal_dir):
+    names = [n for n in os.listdir(journal_dir) if n.startswith(SEGMENT_PREFIX) and n.endswith(SEGMENT_SUFFIX)]
+    return [os.path.join(journal_dir, n) for n in sorted(names)]
+
+
+class Journal:
+    """Writer side of a journal; every append goes straight to the OS"""
+
+    def __init__(self, journal_dir, header=None, segment_bytes=SEGMENT_BYTES, fsync=False):
+        if os.path.isdir(journal_dir) and _segments(journal_dir):
+            raise FileExistsError(f"{journal_dir} holds an unrecovered journal; run: python -m journey.journal {journal_dir}")
+        os.makedirs(journal_dir, exist_ok=True)
+        self.journal_dir = journal_dir
+        self.segment_bytes = segment_bytes
+        self.fsync = fsync
+        self.segment_index = 0
+        self.records = 0
+        self._file = None
+        self._segment_size = 0
+        self._new_segment()
+        if header:
+            self._append(RECORD_HEADER, _encode_rows([header]))
+
+    @property
+    def closed(self):
+        return self._file is None
+
+    def _new_segment(self):
+        if self._file:
+            self._file.close()
+        self.segment_index += 1
+        path = os.path.join(self.journal_dir, f"{SEGMENT_PREFIX}{self.segment_index:06d}{SEGMENT_SUFFIX}")
+        self._file = open(path, "wb", buffering=0)  # Unbuffered: each record is one write() to the OS
+        self._file.write(MAGIC)
+        self._segment_size = len(MAGIC)
+
+    def _append(self, kind, payload):
+        if self._segment_size >= self.segment_bytes:
+            self._new_segment()
+        record = RECORD.pack(kind, len(payload), zlib.crc32(payload)) + payload
+        self._file.write(record)
+        if self.fsync:
+            os.fsync(self._file.fileno())
+        self._segment_size += len(record)
+        self.records += 1
+
+    def append_rows(self, rows):
+        """Journal a batch of rows"""
+        if self._file is None:
+            raise ValueError("append to closed Journal")
+        if rows:
+            self._append(RECORD_ROWS, _encode_rows(rows))
+
+    def append_text(self, data):
+        """Journal already formatted CSV lines (bytes)"""
+        if self._file is None:
+            raise ValueError("append to closed Journal")
+        if data:
+            self._append(RECORD_ROWS, data)
+
+    def close(self, remove=False):
+        """Mark the journal clean and close it, deleting it if remove is True"""
+        if self._file is None:
+            return
+        self._append(RECORD_END, b"")
+        self._file.close()
+        self._file = None
+        if remove:
+            for path in _segments(self.journal_dir):
+                os.remove(path)
+            try:
+                os.rmdir(self.journal_dir)
+            except OSError:
+                pass  # Something else lives in there; leave it
+
+
+def read_records(journal_dir):
+    """Yield (type, payload) for every intact record; stops a segment at the first torn or corrupt record"""
+    for path in _segments(journal_dir):
+        with open(path, "rb") as f:
+            data = f.read()
+        if not data.startswith(MAGIC):
+            continue
+        pos = len(MAGIC)
+        while pos + RECORD.size <= len(data):
+            kind, length, crc = RECORD.unpack_from(data, pos)
+            start = pos + RECORD.size
+            payload = data[start:start + length]
+            if len(payload) != length or zlib.crc32(payload) != crc:
+                break  # Torn tail from a crash; nothing after it can be trusted
+            yield kind, payload
+            pos = start + length
+
+
+def recover(journal_dir, out_path, remove=False):
+    """Rebuild a clean CSV from a journal, returning (rows, clean_shutdown)"""
+    rows = 0
+    clean = False
+    tmp_path = out_path + ".tmp"
+    with open(tmp_path, "wb") as out:
+        for kind, payload in read_records(journal_dir):
+            if kind == RECORD_HEADER:
+                out.write(payload)
+            elif kind == RECORD_ROWS:
+                out.write(payload)
+                rows += payload.count(b"\n")
+            elif kind == RECORD_END:
+                clean = True
+        out.flush()
+        os.fsync(out.fileno())
+    os.replace(tmp_path, out_path)
+    if remove:
+        for path in _segments(journal_dir):
+            os.remove(path)
+        os.rmdir(journal_dir)
+    return rows, clean
+
+
+def main(argv=None):
+    """python -m journey.journal <journey.csv.journal> [out.csv]"""
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or len(argv) > 2:
+        print("Usage: python -m journey.journal <journal dir> [recovered.csv]")
+        return 1
+    journal_dir = argv[0].rstrip("/\\")
+    if len(argv) == 2:
+        out_path = argv[1]
+    elif journal_dir.endswith(".journal"):
+        root, ext = os.path.splitext(journal_dir[:-len(".journal")])
+        out_path = f"{root}.recovered{ext or '.csv'}"
+    else:
+        out_path = journal_dir + ".recovered.csv"
+    if not os.path.isdir(journal_dir):
+        print(f"No journal at {journal_dir}")
+        return 1
+    rows, clean = recover(journal_dir, out_path)
+    state = "closed cleanly" if clean else "was interrupted"
+    print(f"Recovered {rows} rows to {out_path} (logger {state})")
+    print(f"Delete {journal_dir} once you've checked the recovered file")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
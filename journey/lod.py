@@ -0,0 +1,256 @@
+"""Min/max/mean level-of-detail pyramid for drawing long journeys.
+
+Level 0 summarises every BASE_BUCKET rows with the min, max, sum and count
+of each channel. Each level above halves the previous one, so level k has
+one bucket per BASE_BUCKET * 2**k rows. A view of any row range is then
+served from the finest level with at most `max_points` buckets in that range,
+without touching the raw samples.
+
+The pyramid can be built from a whole journey or fed block by block while
+logging (`append`). Rows that don't fill a bucket yet are kept as a partial
+bucket, so a live view includes the newest samples. Pyramids are saved next
+to the journey as <journey>.lod.npz, where dashboard_playback.py finds them to
+show a journey's peaks before its CSV has loaded. Times in a view are in
+the units of the timestamps it was built from: epoch seconds for a Journey,
+and whatever the logger writes when built while logging.
+
+    python -m journey.lod <journey.csv|journey.jrn|directory> ...
+"""
+import os
+import sys
+
+import numpy as np
+
+from journey.model import CHANNELS, Journey
+
+BASE_BUCKET = 64  # Rows per level 0 bucket
+BUILD_ROWS = 1 << 20  # Rows converted at a time when building from a journey (bounds the scratch memory)
+MAX_POINTS = 4000  # Default bucket budget for a view
+LOD_SUFFIX = ".lod.npz"
+
+
+def lod_path(journey_path):
+    """Where the pyramid for a journey file lives"""
+    return os.path.splitext(journey_path)[0] + LOD_SUFFIX
+
+
+def _row_stats(values):
+    """Per-row (min, max, sum, count) so raw rows and buckets combine the same way"""
+    valid = ~np.isnan(values)
+    return values, values, np.where(valid, values, 0.0), valid.astype(np.int64)
+
+
+def _reduce(stats, factor):
+    """Combine each run of `factor` consecutive entries (length must be a multiple of factor)"""
+    mins, maxs, sums, counts = stats
+    shape = (-1, factor, mins.shape[1])
+    return (np.fmin.reduce(mins.reshape(shape), axis=1), np.fmax.reduce(maxs.reshape(shape), axis=1),
+            sums.reshape(shape).sum(axis=1), counts.reshape(shape).sum(axis=1))
+
+
+def _combine(a, b):
+    """Merge two single-entry stats (either may be None)"""
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return (np.fmin(a[0], b[0]), np.fmax(a[1], b[1]), a[2] + b[2], a[3] + b[3])
+
+
+class _Level:
+    """Growable min/max/sum/count arrays for one level"""
+
+    def __init__(self, n_channels, capacity=64):
+        self.n = 0
+        self.arrays = [np.empty((capacity, n_channels)) for _ in range(3)] + [np.empty((capacity, n_channels), dtype=np.int64)]
+
+    def append(self, stats):
+        extra = len(stats[0])
+        if self.n + extra > len(self.arrays[0]):
+            capacity = max(self.n + extra, 2 * len(self.arrays[0]))
+            for i, array in enumerate(self.arrays):
+                grown = np.empty((capacity, array.shape[1]), dtype=array.dtype)
+                grown[:self.n] = array[:self.n]
+                self.arrays[i] = grown
+        for array, values in zip(self.arrays, stats):
+            array[self.n:self.n + extra] = values
+        self.n += extra
+
+    def stats(self, start=0, stop=None):
+        stop = self.n if stop is None else min(stop, self.n)
+        return tuple(array[start:stop] for array in self.arrays)
+
+
+class Pyramid:
+    """Per-channel min/max/mean pyramid over the rows of a journey"""
+
+    def __init__(self, channels, base_bucket=BASE_BUCKET):
+        self.channels = list(channels)
+        self.base_bucket = base_bucket
+        self.n_rows = 0
+        self.levels = []
+        self._tail = np.empty((0, len(self.channels)))  # Raw rows not yet in a level 0 bucket
+
+    def __len__(self):
+        return self.n_rows
+
+    @classmethod
+    def from_journey(cls, journey, base_bucket=BASE_BUCKET):
+        """Build in one vectorized pass over the channels the journey logged"""
+        channels = [name for name, present in zip(CHANNELS, journey.mask) if present]
+        pyramid = cls(channels, base_bucket)
+        for start in range(0, len(journey), BUILD_ROWS):
+            pyramid.append({name: getattr(journey, name)[start:start + BUILD_ROWS] for name in channels})
+        return pyramid
+
+    def append(self, columns):
+        """Add rows: a dict of channel -> array, or a (rows, channels) array in channel order"""
+        if isinstance(columns, dict):
+            block = np.empty((len(columns[self.channels[0]]), len(self.channels)))
+            for i, name in enumerate(self.channels):
+                values = np.asarray(columns[name])
+                if name == "gear" and values.dtype.kind in "iu":
+                    values = np.where(values < 0, np.nan, values)  # -1 is the missing gear code
+                block[:, i] = values
+        else:
+            block = np.asarray(columns, dtype=np.float64).reshape(-1, len(self.channels))
+        if not len(block):
+            return
+        self.n_rows += len(block)
+        rows = np.concatenate((self._tail, block)) if len(self._tail) else block
+        full = len(rows) - len(rows) % self.base_bucket
+        self._tail = rows[full:].copy()
+        if not full:
+            return
+        self._push(0, _reduce(_row_stats(rows[:full]), self.base_bucket))
+
+    def _push(self, k, stats):
+        """Append complete buckets to level k and carry whole pairs up to level k + 1"""
+        if k == len(self.levels):
+            self.levels.append(_Level(len(self.channels)))
+        level = self.levels[k]
+        level.append(stats)
+        combined = self.levels[k + 1].n * 2 if k + 1 < len(self.levels) else 0
+        pairs = (level.n - combined) // 2
+        if pairs:
+            self._push(k + 1, _reduce(level.stats(combined, combined + pairs * 2), 2))
+
+    def _partial(self, k):
+        """Stats of the unfinished bucket at the end of level k, or None"""
+        if k == 0:
+            return _reduce(_row_stats(self._tail), len(self._tail)) if len(self._tail) else None
+        below = self.levels[k - 1]
+        done = self.levels[k].n * 2 if k < len(self.levels) else 0
+        leftover = below.stats(done) if below.n > done else None
+        if leftover is not None:
+            leftover = _reduce(leftover, len(leftover[0]))
+        return _combine(leftover, self._partial(k - 1))
+
+    def bucket_rows(self, k):
+        return self.base_bucket << k
+
+    def level_for(self, start_row, stop_row, max_points=MAX_POINTS):
+        """Finest level with at most max_points buckets covering rows [start_row, stop_row)"""
+        for k in range(len(self.levels) + 1):
+            size = self.bucket_rows(k)
+            if stop_row // size - start_row // size + 1 <= max_points:
+                return k
+        return len(self.levels)
+
+    def view(self, name, start_row=0, stop_row=None, max_points=MAX_POINTS):
+        """Buckets covering rows [start_row, stop_row) of one channel
+
+        Returns a dict of arrays: time (first timestamp of each bucket, if the
+        pyramid has a timestamp channel), min, max and mean, plus the level
+        and rows per bucket used.
+        """
+        stop_row = self.n_rows if stop_row is None else min(stop_row, self.n_rows)
+        k = self.level_for(start_row, stop_row, max_points)
+        size = self.bucket_rows(k)
+        level = self.levels[k] if k < len(self.levels) else None
+        first = start_row // size
+        last = -(-stop_row // size)  # Ceiling: include the bucket the range ends in
+        parts = []
+        if level is not None and first < level.n:
+            parts.append(level.stats(first, last))
+        if last > (level.n if level is not None else 0):
+            partial = self._partial(k)
+            if partial is not None:
+                parts.append(partial)
+        if not parts:
+            empty = np.empty(0)
+            return {"time": empty, "min": empty, "max": empty, "mean": empty, "level": k, "bucket_rows": size}
+        mins, maxs, sums, counts = (np.concatenate(values) for values in zip(*parts))
+        i = self.channels.index(name)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = np.where(counts[:, i] > 0, sums[:, i] / counts[:, i], np.nan)
+        t = self.channels.index("timestamp") if "timestamp" in self.channels else None
+        return {
+            "time": mins[:, t] if t is not None else np.arange(first, first + len(mins)) * size,
+            "min": mins[:, i],
+            "max": maxs[:, i],
+            "mean": mean,
+            "level": k,
+            "bucket_rows": size,
+        }
+
+    def save(self, path):
+        """Write the pyramid (atomically) as an .npz file"""
+        arrays = {"channels": np.array(self.channels), "meta": np.array([self.base_bucket, self.n_rows]),
+                  "tail": self._tail}
+        for k, level in enumerate(self.levels):
+            for stat, array in zip(("min", "max", "sum", "count"), level.stats()):
+                arrays[f"{k}_{stat}"] = array
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            base_bucket, n_rows = (int(v) for v in data["meta"])
+            pyramid = cls([str(name) for name in data["channels"]], base_bucket)
+            pyramid.n_rows = n_rows
+            pyramid._tail = data["tail"]
+            k = 0
+            while f"{k}_min" in data:
+                level = _Level(len(pyramid.channels), capacity=max(1, len(data[f"{k}_min"])))
+                level.append(tuple(data[f"{k}_{stat}"] for stat in ("min", "max", "sum", "count")))
+                pyramid.levels.append(level)
+                k += 1
+        return pyramid
+
+
+def build_for_file(path):
+    """Build and save the pyramid for one journey file, returning its path"""
+    pyramid = Pyramid.from_journey(Journey.from_file(path))
+    out_path = lod_path(path)
+    pyramid.save(out_path)
+    return out_path
+
+
+def main(argv=None):
+    """Build pyramids for the journeys given on the command line (directories are searched)"""
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        print("Usage: python -m journey.lod <journey.csv|journey.jrn|directory> ...")
+        return 1
+    paths = []
+    for arg in argv:
+        if os.path.isdir(arg):
+            for root, _, files in os.walk(arg):
+                paths.extend(os.path.join(root, name) for name in sorted(files) if name.endswith((".csv", ".jrn")))
+        else:
+            paths.append(arg)
+    for path in paths:
+        try:
+            out_path = build_for_file(path)
+            print(f"{path} -> {out_path} ({len(Pyramid.load(out_path).levels)} levels)")
+        except (OSError, ValueError) as e:
+            print(f"Skipping {path}: {e}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
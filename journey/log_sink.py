@@ -0,0 +1,100 @@
+"""Write journey rows on a background thread.
+
+A LogSink owns a JourneyWriter and a bounded ring buffer. The caller hands
+it rows with put(), which never waits on the disk. The sink thread formats
+the rows (if given a format_row function) and writes them in batches with
+the writer's group commit. When the buffer is full put() returns False,
+and `full` lets the producer slow down before that happens. Problems are
+reported as (kind, detail) status events the caller polls, never raised
+into the producer:
+
+    ("error", message)   writing failed; the sink has stopped and closed the file
+    ("closed", rows)     close() finished; every row put was written
+"""
+import queue
+import threading
+
+from journey.ringbuffer import RingBuffer
+from journey.writer import JourneyWriter
+
+DEFAULT_CAPACITY = 4096  # Rows the sink can fall behind by before put() refuses more
+
+
+class LogSink(threading.Thread):
+    """Background CSV journey writer fed through a ring buffer"""
+
+    def __init__(self, path, header=None, capacity=DEFAULT_CAPACITY, format_row=None, **writer_options):
+        super().__init__(name="LogSink", daemon=True)
+        # Opened here so a bad path fails in the caller, before any rows are accepted
+        self.writer = JourneyWriter(path, header, **writer_options)
+        self.path = path
+        self.buffer = RingBuffer(capacity)
+        self.format_row = format_row
+        self.error = None
+        self._events = queue.SimpleQueue()
+        self._wake = threading.Event()
+        self._closing = threading.Event()
+
+    @property
+    def full(self):
+        return len(self.buffer) >= self.buffer.capacity
+
+    @property
+    def backlog(self):
+        return len(self.buffer)
+
+    def put(self, row):
+        """Queue one row; returns False if it was dropped (sink full or failed)"""
+        if self.error is not None or self._closing.is_set():
+            return False
+        queued = self.buffer.push(row)
+        self._wake.set()
+        return queued
+
+    def run(self):
+        writer = self.writer
+        try:
+            while True:
+                rows = self.buffer.pop_batch()
+                if rows:
+                    if self.format_row is not None:
+                        rows = [self.format_row(row) for row in rows]
+                    writer.writerows(rows)
+                    continue
+                if self._closing.is_set():
+                    break
+                writer.commit_if_due()  # Quiet stream: still commit within batch_seconds
+                self._wake.wait(writer.batch_seconds)
+                self._wake.clear()  # Anything pushed before this is picked up by the next pop
+            writer.close()
+        except Exception as e:
+            self.error = e
+            self._events.put(("error", f"{type(e).__name__}: {e}"))
+            try:
+                writer.close()
+            except Exception:
+                pass
+            return
+        self._events.put(("closed", writer.rows_written))
+
+    def close(self, timeout=None):
+        """Write everything still queued, close the file and stop the thread"""
+        self._closing.set()
+        self._wake.set()
+        if self.is_alive():
+            self.join(timeout)
+
+    def poll_events(self):
+        """Status events since the last call, oldest first"""
+        events = []
+        while True:
+            try:
+                events.append(self._events.get_nowait())
+            except queue.Empty:
+                return events
+
+    def stats(self):
+        stats = self.buffer.stats()
+        stats["rows_written"] = self.writer.rows_written
+        stats["error"] = str(self.error) if self.error else None
+        return stats
@@ -0,0 +1,144 @@
+"""Lightweight counters, gauges and histograms for the ingest paths.
+
+A Metrics registry is created per logger and passed to its reader, writer
+and GUI code. Each metric should only be updated from one thread; reads
+from other threads just see a slightly stale value. Query with `snapshot()`
+or write JSON with `dump()`.
+"""
+import bisect
+import json
+import os
+import time
+
+# Bucket upper bounds
+LATENCY_BOUNDS = (0.0001, 0.0002, 0.0005, 0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1.0, 2.0, 5.0, 10.0)
+SIZE_BOUNDS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384, 65536)
+
+
+class Counter:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def add(self, n=1):
+        self.value += n
+
+
+class Gauge:
+    """Last value set, plus the largest seen"""
+
+    __slots__ = ("value", "peak")
+
+    def __init__(self):
+        self.value = 0
+        self.peak = 0
+
+    def set(self, value):
+        self.value = value
+        if value > self.peak:
+            self.peak = value
+
+
+class Histogram:
+    """Fixed-bucket histogram; percentiles are reported as bucket upper bounds"""
+
+    __slots__ = ("bounds", "counts", "count", "total", "min", "max")
+
+    def __init__(self, bounds=LATENCY_BOUNDS):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)  # Last bucket is overflow
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def percentile(self, fraction):
+        if not self.count:
+            return None
+        target = fraction * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= target:
+                return self.bounds[i] if i < len(self.bounds) else self.max
+        return self.max
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else None,
+            "min": self.min,
+            "max": self.max,
+            "p50": self.percentile(0.5),
+            "p90": self.percentile(0.9),
+            "p99": self.percentile(0.99),
+            "buckets": {("inf" if i == len(self.bounds) else str(self.bounds[i])): n
+                        for i, n in enumerate(self.counts) if n},
+        }
+
+
+class Metrics:
+    """Named metrics for one logging session"""
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.counters = {}
+        self.gauges = {}
+        self.histograms = {}
+
+    def counter(self, name):
+        metric = self.counters.get(name)
+        if metric is None:
+            metric = self.counters[name] = Counter()
+        return metric
+
+    def gauge(self, name):
+        metric = self.gauges.get(name)
+        if metric is None:
+            metric = self.gauges[name] = Gauge()
+        return metric
+
+    def histogram(self, name, bounds=LATENCY_BOUNDS):
+        metric = self.histograms.get(name)
+        if metric is None:
+            metric = self.histograms[name] = Histogram(bounds)
+        return metric
+
+    def snapshot(self):
+        """Everything recorded so far; counters also get a per-second rate over the session"""
+        elapsed = time.monotonic() - self.started
+        return {
+            "elapsed_s": elapsed,
+            "counters": {name: {"value": c.value, "per_s": c.value / elapsed if elapsed else 0.0}
+                         for name, c in self.counters.items()},
+            "gauges": {name: {"value": g.value, "peak": g.peak} for name, g in self.gauges.items()},
+            "histograms": {name: h.summary() for name, h in self.histograms.items()},
+        }
+
+    def dump(self, path):
+        """Write a JSON snapshot (atomically, so a reader never sees half a file)"""
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, indent=2)
+        os.replace(tmp_path, path)
+
+    def summary_line(self):
+        """One line overview for printing when a session ends"""
+        snap = self.snapshot()
+        parts = [f"{snap['elapsed_s']:.1f}s"]
+        for name, c in snap["counters"].items():
+            parts.append(f"{name}={c['value']} ({c['per_s']:.1f}/s)")
+        for name, h in snap["histograms"].items():
+            if h["count"]:
+                parts.append(f"{name} p50={h['p50']} p99={h['p99']}")
+        return ", ".join(parts)
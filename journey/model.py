@@ -0,0 +1,117 @@
+"""In-memory journey as a struct of arrays.
+
+Each channel is one contiguous typed numpy array, built once when a journey
+is loaded, so playback reads a sample with a few array index operations
+instead of building a pandas row every tick.
+
+`Journey.from_file` is the one entry point for every file layout (Arduino,
+wall-clock, simulator CSV and .jrn). It detects the layout, puts all of them
+on an epoch float64 time axis and records which channels the source actually
+had in `mask`. Playback, comparison, stats and export code all read this.
+"""
+import os
+
+import numpy as np
+
+from journey.binformat import (
+    COLUMNS, GEAR_MISSING, SCHEMA_JRN, TIME_SOURCE_WALL_CLOCK, open_journey, read_journey_columns,
+)
+
+CHANNELS = tuple(name for name, _ in COLUMNS)
+DTYPES = {name: np.dtype(dtype).newbyteorder("=") for name, dtype in COLUMNS}
+
+
+def gear_label(code):
+    """Display text for a gear code: 0 is neutral, -1 unknown"""
+    if code == 0:
+        return "N"
+    if code == GEAR_MISSING:
+        return "-"
+    return str(code)
+
+
+def gear_codes(values):
+    """Convert gear values ('N', '1', 3, ...) to int8 codes"""
+    values = np.asarray(values)
+    if values.dtype.kind in "iuf":
+        codes = np.where(np.isnan(values.astype(float)), GEAR_MISSING, values)
+        return codes.astype(np.int8)
+    text = values.astype(str)
+    codes = np.full(len(text), GEAR_MISSING, dtype=np.int8)
+    codes[text == "N"] = 0
+    digits = np.char.isdigit(text)
+    codes[digits] = text[digits].astype(np.int64)
+    return codes
+
+
+class Journey:
+    """Struct-of-arrays journey with one typed array per channel"""
+
+    __slots__ = CHANNELS + ("n_rows", "mask", "schema", "time_origin", "time_source")
+
+    def __init__(self, columns, schema=None, time_origin=0.0, time_source=TIME_SOURCE_WALL_CLOCK):
+        """Build from a mapping of channel name -> array (a dict or a MappedJourney).
+
+        Arrays already of the right dtype are used as-is, so a memory-mapped
+        journey isn't copied. Channels not in `columns` are filled with
+        missing values and flagged False in `mask`.
+        """
+        self.n_rows = len(columns["timestamp"])
+        self.mask = np.array([name in columns for name in CHANNELS], dtype=bool)
+        self.schema = schema
+        self.time_origin = time_origin  # Epoch seconds of the logger's own time 0
+        self.time_source = time_source  # How the epoch axis was found (see binformat.time_origin)
+        for name in CHANNELS:
+            if name in columns:
+                values = columns[name]
+                if name == "gear" and np.asarray(values).dtype.kind not in "iu":
+                    values = gear_codes(values)
+                values = np.asarray(values, dtype=DTYPES[name])
+                if len(values) != self.n_rows:
+                    raise ValueError(f"channel {name!r} has {len(values)} rows, expected {self.n_rows}")
+            else:
+                fill = GEAR_MISSING if name == "gear" else np.nan
+                values = np.full(self.n_rows, fill, dtype=DTYPES[name])
+            setattr(self, name, values)
+
+    @classmethod
+    def from_dataframe(cls, df):
+        """Convert a pandas DataFrame once, column by column"""
+        return cls({name: df[name].to_numpy() for name in CHANNELS if name in df.columns})
+
+    @classmethod
+    def from_file(cls, path):
+        """Read a CSV journey of any layout, or memory-map a .jrn file"""
+        if os.path.splitext(path)[1] == ".jrn":
+            return cls(open_journey(path), SCHEMA_JRN)
+        columns, schema, origin, source = read_journey_columns(path)
+        return cls(columns, schema, origin, source)
+
+    def __len__(self):
+        return self.n_rows
+
+    def has(self, name):
+        """Whether the source logged this channel at all"""
+        return bool(self.mask[CHANNELS.index(name)])
+
+    @property
+    def missing(self):
+        """Channels the source didn't log"""
+        return tuple(name for name, present in zip(CHANNELS, self.mask) if not present)
+
+    def value(self, name, index):
+        """Sample of a channel as a Python number, or None if it wasn't logged or is missing"""
+        if not self.has(name):
+            return None
+        if name == "gear":
+            code = int(self.gear[index])
+            return None if code == GEAR_MISSING else code
+        value = float(getattr(self, name)[index])
+        return None if np.isnan(value) else value
+
+    def chunk_for(self, index):
+        """(journey, row) holding a row; the whole journey is one chunk (see journey.streaming)"""
+        return self, index
+
+    def gear_label(self, index):
+        return gear_label(int(self.gear[index]))
@@ -0,0 +1,102 @@
+"""Journey-time playback clock.
+
+Playback is driven by the journey's own timestamps rather than one row per
+timer tick. The GUI renders at a fixed frame rate and asks the clock which
+sample is current; rows that fall between two frames are skipped, so the
+cost follows the display rate rather than the logging rate.
+"""
+import time
+
+import numpy as np
+
+from journey.index import SeekIndex, playback_times
+
+PLAYBACK_RATES = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+
+class PlaybackClock:
+    """Maps wall-clock time to journey time at a selectable rate.
+
+    `timeline` is either a timestamp array or an object with start_time,
+    end_time and locate(t) (a SeekIndex or a journey.streaming.StreamingJourney,
+    whose end grows while it loads and which sets `complete` when done).
+    """
+
+    def __init__(self, timeline, rate=1, clock=time.monotonic):
+        if not hasattr(timeline, "locate"):
+            timestamps = np.asarray(timeline, dtype=np.float64)
+            if len(timestamps) == 0:
+                raise ValueError("journey has no samples")
+            timeline = SeekIndex(playback_times(timestamps))
+        self.timeline = timeline
+        self.rate = rate
+        self._clock = clock
+        self._anchor_wall = None  # Wall time when playback last (re)started, None while paused
+        self._anchor_journey = self.start_time
+
+    @property
+    def start_time(self):
+        return self.timeline.start_time
+
+    @property
+    def end_time(self):
+        return self.timeline.end_time
+
+    @property
+    def running(self):
+        return self._anchor_wall is not None
+
+    @property
+    def finished(self):
+        return getattr(self.timeline, "complete", True) and self.journey_time() >= self.end_time
+
+    def journey_time(self):
+        """Current position in journey seconds"""
+        if self._anchor_wall is None:
+            return self._anchor_journey
+        now = self._clock()
+        journey_time = self._anchor_journey + (now - self._anchor_wall) * self.rate
+        end_time = self.end_time
+        if journey_time > end_time:
+            # Caught up with the end (or with a journey that's still loading): hold there
+            self._anchor_journey = end_time
+            self._anchor_wall = now
+            return end_time
+        return journey_time
+
+    def elapsed(self):
+        """Seconds since the start of the journey"""
+        return self.journey_time() - self.start_time
+
+    def index(self):
+        """Index of the latest sample at or before the current journey time"""
+        return self.timeline.locate(self.journey_time())
+
+    def play(self):
+        if self._anchor_wall is None:
+            self._anchor_wall = self._clock()
+
+    def pause(self):
+        if self._anchor_wall is not None:
+            self._anchor_journey = self.journey_time()
+            self._anchor_wall = None
+
+    def set_rate(self, rate):
+        """Change speed without jumping: re-anchor at the current position"""
+        was_running = self.running
+        self.pause()
+        self.rate = rate
+        if was_running:
+            self.play()
+
+    def seek_relative(self, seconds):
+        """Jump forwards (or backwards if negative) by journey seconds"""
+        self.seek(self.journey_time() + seconds)
+
+    def seek(self, journey_time):
+        """Move to a journey time (clamped to the journey), keeping play/pause state"""
+        was_running = self.running
+        self.pause()
+        self._anchor_journey = min(self.end_time, max(self.start_time, float(journey_time)))
+        if was_running:
+            self.play()
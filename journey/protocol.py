@@ -0,0 +1,21 @@
+"""Line format sent by the Arduino sketch (arduino/other/first/first.ino)"""
+
+ARDUINO_HEADER = ["timestamp", "rpm", "speed", "lat", "lon"]
+BANNER_PREFIXES = ("timestamp", "NEO-6M")  # Header and start-up lines, not data
+
+
+def parse_line(raw):
+    """Return the fields of one Arduino data line, or None if it should be skipped.
+
+    Accepts bytes straight off the port or an already decoded str.
+    """
+    if isinstance(raw, bytes):
+        raw = raw.decode("utf-8", errors="ignore")
+    line = raw.strip()
+    # Skip initialization messages
+    if not line or line.startswith(BANNER_PREFIXES):
+        return None
+    data = line.split(",")
+    if len(data) != len(ARDUINO_HEADER):  # Ensure correct number of fields
+        return None
+    return data
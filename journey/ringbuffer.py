@@ -0,0 +1,65 @@
+class RingBuffer:
+    """Bounded single-producer/single-consumer ring buffer.
+
+    The producer only ever moves the head and the consumer only ever moves the
+    tail, so one reader thread and one consumer can share it without a lock.
+    When the buffer is full new items are dropped and counted in `dropped`.
+    """
+
+    def __init__(self, capacity=8192):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self._slots = [None] * capacity
+        self._head = 0  # Total items ever pushed (written by producer only)
+        self._tail = 0  # Total items ever popped (written by consumer only)
+        self.dropped = 0  # Items rejected because the buffer was full
+        self.high_water = 0  # Largest backlog seen so far
+
+    def __len__(self):
+        return self._head - self._tail
+
+    def push(self, item):
+        """Add an item, returning False (and counting a drop) if the buffer is full"""
+        head = self._head
+        used = head - self._tail
+        if used >= self.capacity:
+            self.dropped += 1
+            return False
+        self._slots[head % self.capacity] = item
+        self._head = head + 1  # Publish only after the slot is filled
+        if used + 1 > self.high_water:
+            self.high_water = used + 1
+        return True
+
+    def pop_batch(self, max_items=None):
+        """Remove and return up to max_items items (all available if None)"""
+        tail = self._tail
+        count = self._head - tail
+        if max_items is not None:
+            count = min(count, max_items)
+        if count <= 0:
+            return []
+        start = tail % self.capacity
+        end = start + count
+        if end <= self.capacity:
+            items = self._slots[start:end]
+            self._slots[start:end] = [None] * count
+        else:
+            wrap = end - self.capacity
+            items = self._slots[start:] + self._slots[:wrap]
+            self._slots[start:] = [None] * (self.capacity - start)
+            self._slots[:wrap] = [None] * wrap
+        self._tail = tail + count
+        return items
+
+    def stats(self):
+        """Return a snapshot of the buffer counters"""
+        return {
+            "capacity": self.capacity,
+            "pushed": self._head,
+            "popped": self._tail,
+            "backlog": self._head - self._tail,
+            "dropped": self.dropped,
+            "high_water": self.high_water,
+        }
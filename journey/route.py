@@ -0,0 +1,170 @@
+"""Route polylines for giving simulated journeys GPS positions.
+
+A Route is a polyline of (lat, lon) vertices with the cumulative distance
+along it in metres. A simulated car is placed on it by the distance it
+has covered (speed integrated over time). positions() does that for a
+whole array of distances at once with np.interp. Distances along a
+journey only grow, and np.interp starts each lookup from the previous
+segment, so the cost per sample stays flat however many vertices the
+route has. RouteFollower does the same one sample at a time for a live
+simulator, keeping a cursor on the current segment.
+
+Routes are read from any CSV with lat and lon columns (csvMaker.py's
+osrm_route_journey.csv, an Arduino log, or a file written by save()), or
+from a text file holding an encoded polyline such as OSRM's geometry.
+"""
+import csv
+
+import numpy as np
+
+EARTH_RADIUS_M = 6371000.0
+WRAP_STOP = "stop"  # Park at the end of the route
+WRAP_LOOP = "loop"  # Start again from the first vertex
+WRAP_RETURN = "return"  # Drive back along the route, then out again
+WRAP_MODES = (WRAP_STOP, WRAP_LOOP, WRAP_RETURN)
+
+
+def decode_polyline(text, precision=5):
+    """Decode a Google encoded polyline (OSRM's geometry) into (lats, lons) arrays"""
+    values = []
+    value = shift = 0
+    for char in text.strip():
+        byte = ord(char) - 63
+        value |= (byte & 0x1F) << shift
+        shift += 5
+        if byte < 0x20:
+            values.append(~(value >> 1) if value & 1 else value >> 1)
+            value = shift = 0
+    if len(values) % 2:
+        raise ValueError("polyline has an odd number of coordinates")
+    coords = np.cumsum(np.array(values, dtype=np.int64).reshape(-1, 2), axis=0) / 10 ** precision
+    return coords[:, 0], coords[:, 1]
+
+
+def segment_lengths(lats, lons):
+    """Haversine length in metres of each segment between consecutive vertices"""
+    lat = np.radians(lats)
+    lon = np.radians(lons)
+    dlat = np.diff(lat)
+    dlon = np.diff(lon)
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat[:-1]) * np.cos(lat[1:]) * np.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+class Route:
+    """Polyline with the distance along it at each vertex"""
+
+    def __init__(self, lats, lons, name=None):
+        lats = np.asarray(lats, dtype=np.float64)
+        lons = np.asarray(lons, dtype=np.float64)
+        if lats.shape != lons.shape or lats.ndim != 1:
+            raise ValueError("lats and lons must be 1-D arrays of the same length")
+        keep = np.isfinite(lats) & np.isfinite(lons) & ~((lats == 0) & (lons == 0))  # 0,0 is the sim's "no fix"
+        lats, lons = lats[keep], lons[keep]
+        if len(lats) < 2:
+            raise ValueError("a route needs at least two points")
+        lengths = segment_lengths(lats, lons)
+        moved = np.concatenate(([True], lengths > 0))  # Drop repeated points so distances strictly increase
+        self.lats = lats[moved]
+        self.lons = lons[moved]
+        self.distance = np.concatenate(([0.0], np.cumsum(lengths[lengths > 0])))
+        if len(self.lats) < 2:
+            raise ValueError("a route needs at least two distinct points")
+        self.name = name
+
+    def __len__(self):
+        return len(self.lats)
+
+    @property
+    def length(self):
+        """Metres from the first vertex to the last"""
+        return float(self.distance[-1])
+
+    def along(self, distance, wrap=WRAP_RETURN):
+        """Map distance travelled (metres, scalar or array) to distance along the route"""
+        if wrap not in WRAP_MODES:
+            raise ValueError(f"wrap must be one of {WRAP_MODES}, not {wrap!r}")
+        length = self.length
+        if wrap == WRAP_LOOP:
+            return np.mod(distance, length)
+        if wrap == WRAP_RETURN:
+            return length - np.abs(np.mod(distance, 2 * length) - length)
+        return np.clip(distance, 0.0, length)
+
+    def positions(self, distance, wrap=WRAP_RETURN):
+        """(lats, lons) for an array of distances travelled"""
+        along = self.along(np.asarray(distance, dtype=np.float64), wrap)
+        return np.interp(along, self.distance, self.lats), np.interp(along, self.distance, self.lons)
+
+    def save(self, path):
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["lat", "lon"])
+            writer.writerows(zip(self.lats.tolist(), self.lons.tolist()))
+
+    @classmethod
+    def from_file(cls, path):
+        """Read a CSV with lat/lon columns or a file holding an encoded polyline"""
+        with open(path, newline="", encoding="utf-8") as f:
+            first = f.readline()
+            if "," not in first:
+                return cls(*decode_polyline(first + f.read()), name=path)
+            header = [h.strip().lower() for h in first.split(",")]
+            if "lat" not in header or "lon" not in header:
+                raise ValueError(f"{path} has no lat/lon columns")
+            i, j = header.index("lat"), header.index("lon")
+            lats, lons = [], []
+            for row in csv.reader(f):
+                try:
+                    lats.append(float(row[i]))
+                    lons.append(float(row[j]))
+                except (IndexError, ValueError):
+                    continue  # Short or corrupt row
+        return cls(lats, lons, name=path)
+
+
+class RouteFollower:
+    """Position on a route one sample at a time, for a live simulation
+
+    Keeps the segment the last position was on, so moving a little further
+    only looks at the next vertex or two.
+    """
+
+    def __init__(self, route, wrap=WRAP_RETURN):
+        if wrap not in WRAP_MODES:
+            raise ValueError(f"wrap must be one of {WRAP_MODES}, not {wrap!r}")
+        self.route = route
+        self.wrap = wrap
+        self._segment = 0
+        self._distance = route.distance.tolist()  # Python floats: much faster to index one at a time
+        self._lats = route.lats.tolist()
+        self._lons = route.lons.tolist()
+
+    def position(self, distance):
+        """(lat, lon) after travelling `distance` metres, the same values positions() gives"""
+        d = self._distance
+        length = d[-1]
+        # Route.along for one float; Python's % rounds exactly like np.mod
+        if self.wrap == WRAP_LOOP:
+            along = distance % length
+        elif self.wrap == WRAP_RETURN:
+            along = length - abs(distance % (2 * length) - length)
+        else:
+            along = distance
+        last = len(d) - 1
+        if along >= d[last]:
+            return self._lats[last], self._lons[last]
+        if along <= 0:
+            return self._lats[0], self._lons[0]
+        i = self._segment
+        while along >= d[i + 1]:
+            i += 1
+        while along < d[i]:
+            i -= 1
+        self._segment = i
+        # Same arithmetic as np.interp so a live log matches a batch replay to the last digit
+        step = along - d[i]
+        span = d[i + 1] - d[i]
+        lat = (self._lats[i + 1] - self._lats[i]) / span * step + self._lats[i]
+        lon = (self._lons[i + 1] - self._lons[i]) / span * step + self._lons[i]
+        return lat, lon
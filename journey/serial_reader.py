@@ -0,0 +1,81 @@
+import threading
+import time
+
+from journey.ringbuffer import RingBuffer
+from journey.metrics import SIZE_BOUNDS
+
+
+class SerialReader(threading.Thread):
+    """Background thread that drains a serial port into a ring buffer.
+
+    Raw lines (bytes, without the trailing newline) are pushed as they arrive
+    so ingest never waits on the GUI event loop. Consumers call `pop_batch`,
+    which returns (arrival, data) pairs stamped with time.monotonic().
+    With split_lines=False whole read chunks are pushed instead, for consumers
+    that parse in bulk (journey.fastparse.ChunkParser).
+    """
+
+    def __init__(self, ser, capacity=8192, buffer=None, split_lines=True, metrics=None):
+        super().__init__(name="SerialReader", daemon=True)
+        self.ser = ser
+        self.buffer = buffer if buffer is not None else RingBuffer(capacity)
+        self.split_lines = split_lines
+        self.bytes_read = 0
+        self.error = None  # Set if the port fails while reading
+        self.metrics = metrics
+        self._stop_event = threading.Event()
+
+    def run(self):
+        pending = b""
+        if self.metrics:
+            bytes_counter = self.metrics.counter("serial_bytes")
+            dropped_counter = self.metrics.counter("buffer_dropped")
+            backlog_gauge = self.metrics.gauge("serial_in_waiting")
+            backlog_hist = self.metrics.histogram("serial_in_waiting_bytes", SIZE_BOUNDS)
+        while not self._stop_event.is_set():
+            try:
+                # Block (up to the port timeout) for at least one byte, then take everything waiting
+                waiting = self.ser.in_waiting
+                chunk = self.ser.read(waiting or 1)
+            except (OSError, TypeError, AttributeError) as e:
+                # Closing the port under a blocking read surfaces as one of these
+                if not self._stop_event.is_set():
+                    self.error = e
+                break
+            if not chunk:
+                continue
+            arrival = time.monotonic()
+            self.bytes_read += len(chunk)
+            if self.metrics:
+                bytes_counter.add(len(chunk))
+                backlog_gauge.set(waiting)
+                backlog_hist.observe(waiting)
+                dropped_counter.value = self.buffer.dropped
+            if not self.split_lines:
+                self.buffer.push((arrival, chunk))
+                continue
+            pending += chunk
+            if b"\n" not in chunk:
+                continue
+            lines = pending.split(b"\n")
+            pending = lines.pop()  # Keep the partial last line for the next read
+            push = self.buffer.push
+            for line in lines:
+                push((arrival, line.rstrip(b"\r")))
+
+    def pop_batch(self, max_items=None):
+        """Return the (arrival, data) pairs buffered since the last call"""
+        return self.buffer.pop_batch(max_items)
+
+    def stop(self, timeout=2.0):
+        """Ask the thread to finish and wait for it"""
+        self._stop_event.set()
+        if self.is_alive():
+            self.join(timeout)
+
+    def stats(self):
+        """Buffer counters plus bytes read and any port error"""
+        stats = self.buffer.stats()
+        stats["bytes_read"] = self.bytes_read
+        stats["error"] = str(self.error) if self.error else None
+        return stats
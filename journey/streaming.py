@@ -0,0 +1,204 @@
+"""Stream a CSV journey in chunks so playback can start before it is all read.
+
+The file is cut into chunks of whole lines. A loader thread calls `load()`,
+which decodes the chunks in order and records each chunk's byte range, first
+row and first timestamp in a small chunk table (a sparse keyframe index).
+Timestamps that go backwards (a reset millis counter) start a new segment
+after the time before them, carried from chunk to chunk, so the rows play in
+file order like PlaybackClock does for arrays.
+Only a sliding window of decoded chunks around the playhead stays in memory.
+A chunk that was dropped from the window is decoded again from its byte range
+when it's needed. The GUI thread can call `prefetch()` to queue that work on
+the loader thread ahead of time.
+"""
+import bisect
+import queue
+import threading
+
+import numpy as np
+
+from journey.binformat import decode_rows, detect_schema, time_origin
+from journey.index import playback_times
+from journey.model import Journey
+
+CHUNK_BYTES = 1 << 20  # ~20k simulator rows per chunk
+WINDOW_CHUNKS = 8  # Decoded chunks kept in memory
+
+
+class StreamingJourney:
+    """Chunked view of a CSV journey, readable while it is still loading"""
+
+    def __init__(self, path, chunk_bytes=CHUNK_BYTES, window=WINDOW_CHUNKS, required=None):
+        self.path = path
+        self.chunk_bytes = chunk_bytes
+        self.window = max(2, window)
+        self.required = list(required or [])  # Columns the first chunk must have
+        self.file_size = 0
+        self.bytes_read = 0
+        self.n_rows = 0
+        self.complete = False
+        self.cancelled = False
+        self.error = None
+        self.header = None
+        self.schema = None
+        self.time_origin = 0.0
+        self.time_source = None
+        self.start_time = np.nan
+        self.end_time = np.nan
+        # Chunk table: one entry per chunk, appended by the loader only
+        self._offsets = []  # (byte offset, byte length)
+        self._first_rows = []
+        self._first_times = []
+        self._previous = []  # (raw, played) time before each chunk, to decode it again on the same axis
+        self._last_raw = np.nan  # Raw timestamp of the last row loaded
+        self._decoded = {}  # Chunk number -> Journey
+        self._playhead = 0  # Chunk the GUI last read from
+        self._lock = threading.Lock()
+        self._requests = queue.Queue()
+
+    def __len__(self):
+        return self.n_rows
+
+    @property
+    def n_chunks(self):
+        return len(self._offsets)
+
+    @property
+    def progress(self):
+        """Fraction of the file read so far"""
+        if self.complete or not self.file_size:
+            return 1.0
+        return self.bytes_read / self.file_size
+
+    def _decode(self, data, previous=None):
+        """(Journey, raw timestamps) for a block of CSV rows"""
+        columns = decode_rows(data, self.header, self.schema)
+        raw = columns["timestamp"] + self.time_origin
+        columns["timestamp"] = playback_times(raw, previous)
+        return Journey(columns, self.schema, self.time_origin, self.time_source), raw
+
+    def _find_schema(self, f):
+        """Detect the layout from the first row and the epoch of time 0 from the last one"""
+        offset = f.tell()
+        first_row = f.readline()
+        self.schema = detect_schema(self.header, first_row.split(b",", 1)[0].decode("utf-8", "replace"))
+        f.seek(max(offset, self.file_size - 4096))
+        tail = [line for line in f.read().splitlines() if line.strip()]
+        first = decode_rows(first_row, self.header, self.schema)["timestamp"]
+        last = decode_rows(tail[-1] if tail else first_row, self.header, self.schema)["timestamp"]
+        self.time_origin, self.time_source = time_origin(self.path, self.schema, float(first[0]) if len(first) else 0.0,
+                                                         float(last[-1]) if len(last) else 0.0)
+        f.seek(offset)
+
+    def _store(self, k, chunk):
+        """Add a decoded chunk, dropping the one furthest from the playhead if the window is full"""
+        with self._lock:
+            self._decoded[k] = chunk
+            while len(self._decoded) > self.window:
+                far = max(self._decoded, key=lambda c: abs(c - self._playhead))
+                del self._decoded[far]
+
+    def load(self, on_chunk=None):
+        """Read the whole file (on the loader thread), then serve prefetch requests until stop()
+
+        on_chunk(journey, k) is called after each chunk is added. Errors are kept in
+        self.error and end the load.
+        """
+        try:
+            with open(self.path, "rb") as f:
+                f.seek(0, 2)
+                self.file_size = f.tell()
+                f.seek(0)
+                self.header = [h.strip() for h in f.readline().decode("utf-8").split(",")]
+                missing = [name for name in self.required if name not in self.header]
+                if missing:
+                    raise ValueError(f"missing columns: {', '.join(missing)}")
+                self._find_schema(f)
+                offset = f.tell()
+                tail = b""
+                while not self.cancelled:
+                    block = f.read(self.chunk_bytes)
+                    data = tail + block
+                    cut = data.rfind(b"\n") + 1 if block else len(data)
+                    data, tail = data[:cut], data[cut:]
+                    if data.strip() and self._add_chunk(offset, data) and on_chunk is not None:
+                        on_chunk(self, self.n_chunks - 1)
+                    offset += len(data)
+                    self.bytes_read = offset
+                    self._serve_requests()
+                    if not block:
+                        break
+            self.complete = not self.cancelled
+            if on_chunk is not None and self.complete:
+                on_chunk(self, None)
+            while not self.cancelled:
+                self._serve_requests(block=True)
+        except Exception as e:
+            self.error = e
+
+    def _add_chunk(self, offset, data):
+        """Decode and index the next chunk; False if it had no usable rows"""
+        previous = (self._last_raw, self.end_time) if self._offsets else None
+        chunk, raw = self._decode(data, previous)
+        if not len(chunk):
+            return False
+        k = len(self._offsets)
+        self._store(k, chunk)
+        with self._lock:
+            self._offsets.append((offset, len(data)))
+            self._first_rows.append(self.n_rows)
+            self._first_times.append(float(chunk.timestamp[0]))
+            self._previous.append(previous)
+            if k == 0:
+                self.start_time = float(chunk.timestamp[0])
+            self.end_time = float(chunk.timestamp[-1])
+            self._last_raw = float(raw[-1])
+            self.n_rows += len(chunk)
+        return True
+
+    def _serve_requests(self, block=False):
+        while True:
+            try:
+                k = self._requests.get(block=block, timeout=0.5 if block else None)
+            except queue.Empty:
+                return
+            if k is None:
+                return
+            self._chunk(k)
+            block = False
+
+    def stop(self):
+        """End load() on the loader thread"""
+        self.cancelled = True
+        self._requests.put(None)
+
+    def prefetch(self, k):
+        """Ask the loader thread to decode chunk k if it isn't in the window"""
+        if 0 <= k < self.n_chunks and k not in self._decoded:
+            self._requests.put(k)
+
+    def _chunk(self, k):
+        """Decoded chunk k, re-reading it from disk if it was dropped from the window"""
+        chunk = self._decoded.get(k)
+        if chunk is None:
+            offset, length = self._offsets[k]
+            with open(self.path, "rb") as f:
+                f.seek(offset)
+                chunk, _ = self._decode(f.read(length), self._previous[k])
+            self._store(k, chunk)
+        return chunk
+
+    def chunk_for(self, row):
+        """(chunk Journey, row within it) for a journey row; moves the window's playhead"""
+        k = bisect.bisect_right(self._first_rows, row) - 1
+        self._playhead = k
+        chunk = self._chunk(k)
+        if k + 1 < self.n_chunks and row - self._first_rows[k] > len(chunk) // 2:
+            self.prefetch(k + 1)  # Past the middle of this chunk: get the next one ready
+        return chunk, row - self._first_rows[k]
+
+    def locate(self, t):
+        """Row of the latest sample at or before journey time t among the rows loaded so far"""
+        k = max(0, bisect.bisect_right(self._first_times, t) - 1)
+        chunk = self._chunk(k)
+        return self._first_rows[k] + max(0, int(np.searchsorted(chunk.timestamp, t, side="right")) - 1)
@@ -0,0 +1,163 @@
+import csv
+import os
+import time
+
+from journey.journal import Journal, journal_path
+from journey.metrics import SIZE_BOUNDS
+
+# How hard a commit pushes rows towards the disk
+DURABILITY_NONE = "none"  # Leave rows in Python/OS buffers
+DURABILITY_FLUSH = "flush"  # Hand rows to the OS on every commit
+DURABILITY_FSYNC = "fsync"  # Force rows onto the device on every commit
+DURABILITY_MODES = (DURABILITY_NONE, DURABILITY_FLUSH, DURABILITY_FSYNC)
+
+
+class JourneyWriter:
+    """CSV journey writer that group-commits rows instead of flushing each one.
+
+    Rows are held in memory and written out together once `batch_rows` rows
+    are pending or `batch_seconds` have passed since the last commit. Call
+    `commit_if_due` from a timer so a quiet stream still gets written.
+
+    With `journal=True` every row is also appended to a write-ahead journal
+    as soon as it is queued, so batches can be large without risking data if
+    the process dies (see journey.journal). The journal is removed on close.
+    Pass a journey.metrics.Metrics to record commit batch sizes and times,
+    and how long the oldest row of each batch waited between arriving (the
+    `arrival` monotonic time given when it was queued) and being committed.
+    """
+
+    def __init__(self, path, header=None, batch_rows=64, batch_seconds=1.0, durability=DURABILITY_FLUSH, journal=False,
+                 metrics=None):
+        if durability not in DURABILITY_MODES:
+            raise ValueError(f"durability must be one of {DURABILITY_MODES}, not {durability!r}")
+        self.path = path
+        self.batch_rows = max(1, int(batch_rows))
+        self.batch_seconds = batch_seconds
+        self.durability = durability
+        self.rows_written = 0
+        self.commits = 0
+        self._pending = []  # Rows not yet handed to the csv writer
+        self._uncommitted = 0  # Rows queued since the last commit
+        self._oldest_arrival = None  # Arrival time of the oldest uncommitted row
+        self.journal = Journal(journal_path(path), header) if journal else None
+        self._file = open(path, "w", newline="", encoding="utf-8")
+        self._writer = csv.writer(self._file)
+        self._last_commit = time.monotonic()
+        self._batch_hist = metrics.histogram("write_batch_rows", SIZE_BOUNDS) if metrics else None
+        self._commit_hist = metrics.histogram("commit_s") if metrics else None
+        self._arrival_hist = metrics.histogram("arrival_to_write_s") if metrics else None
+        if header:
+            self._writer.writerow(header)
+            self.commit()
+
+    @property
+    def closed(self):
+        return self._file is None
+
+    @property
+    def pending(self):
+        return self._uncommitted
+
+    def _arrived(self, arrival):
+        if arrival is None:
+            arrival = time.monotonic()
+        if self._oldest_arrival is None or arrival < self._oldest_arrival:
+            self._oldest_arrival = arrival
+
+    def writerow(self, row, arrival=None):
+        """Queue one row, committing if the batch is full or the window has passed"""
+        if self._file is None:
+            raise ValueError("write to closed JourneyWriter")
+        if self.journal:
+            self.journal.append_rows([row])
+        self._pending.append(row)
+        self._uncommitted += 1
+        self._arrived(arrival)
+        self.commit_if_due()
+
+    def writerows(self, rows, arrival=None):
+        """Queue several rows, committing at most once; `arrival` is when the oldest one arrived"""
+        if self._file is None:
+            raise ValueError("write to closed JourneyWriter")
+        if self.journal:
+            self.journal.append_rows(rows)
+        self._pending.extend(rows)
+        self._uncommitted += len(rows)
+        if rows:
+            self._arrived(arrival)
+        self.commit_if_due()
+
+    def write_text(self, data, rows, arrival=None):
+        """Queue already formatted CSV lines (bytes, LF terminated) holding `rows` rows"""
+        if self._file is None:
+            raise ValueError("write to closed JourneyWriter")
+        if not data:
+            return
+        # End them like the csv writer ends the header and writerows() rows, so the file has one line ending
+        data = data.replace(b"\n", self._writer.dialect.lineterminator.encode("ascii"))
+        if self.journal:
+            self.journal.append_text(data)
+        if self._pending:
+            self._writer.writerows(self._pending)  # Keep row order; still uncommitted until flushed
+            self._pending = []
+        self._file.write(data.decode("utf-8"))
+        self._uncommitted += rows
+        self._arrived(arrival)
+        self.commit_if_due()
+
+    def commit_if_due(self):
+        """Commit if enough rows are pending or the time window has passed"""
+        if not self._uncommitted:
+            return False
+        if self._uncommitted >= self.batch_rows or time.monotonic() - self._last_commit >= self.batch_seconds:
+            self.commit()
+            return True
+        return False
+
+    def commit(self):
+        """Write out all pending rows and apply the durability mode"""
+        if self._file is None:
+            return
+        start = time.monotonic()
+        if self._pending:
+            self._writer.writerows(self._pending)
+            self._pending = []
+        batch = self._uncommitted
+        arrival = self._oldest_arrival
+        self.rows_written += batch
+        self._uncommitted = 0
+        self._oldest_arrival = None
+        if self.durability != DURABILITY_NONE:
+            self._file.flush()
+            if self.durability == DURABILITY_FSYNC:
+                os.fsync(self._file.fileno())
+        self.commits += 1
+        self._last_commit = time.monotonic()
+        if self._batch_hist and batch:
+            self._batch_hist.observe(batch)
+            self._commit_hist.observe(self._last_commit - start)
+            self._arrival_hist.observe(self._last_commit - arrival)
+
+    def close(self):
+        """Commit anything pending and close the file; safe to call more than once"""
+        if self._file is None:
+            return
+        try:
+            self.commit()
+            if self.journal:
+                # The CSV must be on disk before the journal that protects it goes away
+                self._file.flush()
+                os.fsync(self._file.fileno())
+                self.journal.close(remove=True)
+        finally:
+            self._file.close()
+            self._file = None
+            if self.journal and not self.journal.closed:
+                self.journal.close()  # Keep it for recovery
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -1,7 +1,7 @@
 import sys
 import warnings
-import pandas as pd
 import os
+import numpy as np
 from PyQt5.QtWidgets import (
     QApplication,
     QWidget,
@@ -11,13 +11,55 @@ from PyQt5.QtWidgets import (
     QPushButton,
     QProgressBar,
     QFileDialog,
+    QComboBox,
+    QSlider,
+    QShortcut,
 )
-from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtCore import Qt, QTimer, QThread, pyqtSignal
+from PyQt5.QtGui import QKeySequence
 from qroundprogressbar import QRoundProgressBar
 
+# Make the shared journey package importable when run as a script
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from journey.playback import PlaybackClock, PLAYBACK_RATES
+from journey.streaming import StreamingJourney
+from journey.compare import Comparison, ALIGN_TIME, ALIGN_DISTANCE
+from journey.lod import Pyramid, lod_path
+from display_model import DisplayModel, bind_gauges
+
 # Suppress sip warning
 warnings.filterwarnings("ignore", category=DeprecationWarning, message="sipPyTypeDict.*")
 
+# Columns a journey CSV needs for playback; gauges for channels the logger didn't record show "-"
+PLAYBACK_COLUMNS = ["timestamp"]
+RENDER_INTERVAL_MS = 33  # Repaint at ~30 fps whatever the journey's sample rate
+# Keyboard jumps in journey seconds
+SEEK_SHORT = 10
+SEEK_LONG = 60
+SEEK_PAGE = 300
+SHOW_PAINT_TIME = False  # Overlay the time Qt spends painting each frame
+# Whole-journey peaks shown from a saved overview (python -m journey.lod, headless_logger.py --lod)
+SUMMARY_CHANNELS = [("speed", "Top speed {:.0f} km/h"), ("rpm", "peak {:.0f} RPM"), ("temp", "max temp {:.0f} °C")]
+
+def _whole(value):
+    """Gauge value as an int, or None if the channel wasn't logged"""
+    return None if value is None else int(value)
+
+class JourneyLoader(QThread):
+    """Reads a StreamingJourney off the GUI thread, then decodes chunks the playhead asks for"""
+    chunk_loaded = pyqtSignal(int)  # Chunk number, -1 once the whole file is read
+
+    def __init__(self, journey, parent=None):
+        super().__init__(parent)
+        self.journey = journey
+
+    def run(self):
+        self.journey.load(lambda journey, k: self.chunk_loaded.emit(-1 if k is None else k))
+
+    def stop(self):
+        self.journey.stop()
+        self.wait()
+
 class OBDViewer(QWidget):
     def __init__(self):
         super().__init__()
@@ -30,12 +72,20 @@ class OBDViewer(QWidget):
         self.current_load = 0
         self.current_boost = 0
         self.current_gear = "N"
-        self.data = None
-        self.current_index = 0
+        self.journey = None
+        self.comparison = None  # Set when several journeys play together
+        self.compare_labels = []
+        self.loader = None  # Background reader for the journey being played
+        self.clock = None  # Maps wall time to journey time during playback
+        self.current_index = -1  # Sample currently on screen
         self.init_ui()
+        # Gauges only repaint when their value changes, at most once per screen refresh
+        self.display = DisplayModel(self, show_paint_time=SHOW_PAINT_TIME)
+        bind_gauges(self.display, self)
 
         self.replay_timer = QTimer(self)
         self.replay_timer.timeout.connect(self.update_display)
+        self._init_shortcuts()
         self.show()
 
     def init_ui(self):
@@ -174,17 +224,79 @@ class OBDViewer(QWidget):
         self.runtime_label = QLabel("Run Time: 00:00")
         main_layout.addWidget(self.runtime_label, alignment=Qt.AlignCenter)
 
+        # Playback speed
+        rate_layout = QHBoxLayout()
+        rate_layout.addWidget(QLabel("Playback Speed:"))
+        self.rate_combo = QComboBox()
+        for rate in PLAYBACK_RATES:
+            self.rate_combo.addItem(f"{rate}x", rate)
+        self.rate_combo.currentIndexChanged.connect(self.change_rate)
+        rate_layout.addWidget(self.rate_combo)
+        self.play_button = QPushButton("Pause")
+        self.play_button.setEnabled(False)
+        self.play_button.clicked.connect(self.toggle_play)
+        rate_layout.addWidget(self.play_button)
+        main_layout.addLayout(rate_layout)
+
+        # Scrub slider (position in milliseconds from the journey start)
+        self.seek_slider = QSlider(Qt.Horizontal)
+        self.seek_slider.setRange(0, 0)
+        self.seek_slider.setEnabled(False)
+        self.seek_slider.setFocusPolicy(Qt.NoFocus)  # Leave arrow keys to the seek shortcuts
+        self.seek_slider.valueChanged.connect(self.scrub)
+        self._moving_slider = False
+        main_layout.addWidget(self.seek_slider)
+
+        # How much of the journey has been read (playback starts after the first chunk)
+        self.load_bar = QProgressBar()
+        self.load_bar.setRange(0, 100)
+        self.load_bar.setFormat("Loaded %p%")
+        self.load_bar.setVisible(False)
+        main_layout.addWidget(self.load_bar)
+
+        # Peaks over the whole journey, read from its .lod.npz before the CSV has loaded
+        self.summary_label = QLabel("")
+        self.summary_label.setVisible(False)
+        main_layout.addWidget(self.summary_label, alignment=Qt.AlignCenter)
+
         # Upload button
         self.upload_button = QPushButton("Upload Journey CSV")
         self.upload_button.clicked.connect(self.upload_csv)
         main_layout.addWidget(self.upload_button, alignment=Qt.AlignCenter)
 
+        # Side by side playback of several runs; the first one chosen drives the gauges
+        self.compare_box = QVBoxLayout()
+        main_layout.addLayout(self.compare_box)
+        compare_layout = QHBoxLayout()
+        self.compare_button = QPushButton("Compare Journeys...")
+        self.compare_button.clicked.connect(self.upload_comparison)
+        compare_layout.addWidget(self.compare_button)
+        compare_layout.addWidget(QLabel("Align by:"))
+        self.align_combo = QComboBox()
+        self.align_combo.addItem("Elapsed time", ALIGN_TIME)
+        self.align_combo.addItem("Distance", ALIGN_DISTANCE)
+        compare_layout.addWidget(self.align_combo)
+        main_layout.addLayout(compare_layout)
+
         self.exit_button = QPushButton("Exit")
         self.exit_button.clicked.connect(self.close)
         main_layout.addWidget(self.exit_button)
 
         self.setLayout(main_layout)
 
+    def _init_shortcuts(self):
+        """Keyboard seeking: arrows +-10 s, Shift+arrows +-60 s, PgUp/PgDn +-5 min, Home/End, Space play/pause"""
+        jumps = [
+            (Qt.Key_Right, SEEK_SHORT), (Qt.Key_Left, -SEEK_SHORT),
+            (Qt.SHIFT + Qt.Key_Right, SEEK_LONG), (Qt.SHIFT + Qt.Key_Left, -SEEK_LONG),
+            (Qt.Key_PageDown, SEEK_PAGE), (Qt.Key_PageUp, -SEEK_PAGE),
+        ]
+        for key, seconds in jumps:
+            QShortcut(QKeySequence(key), self, activated=lambda seconds=seconds: self.jump(seconds))
+        QShortcut(QKeySequence(Qt.Key_Home), self, activated=lambda: self.seek_to(self.clock.start_time) if self.clock else None)
+        QShortcut(QKeySequence(Qt.Key_End), self, activated=lambda: self.seek_to(self.clock.end_time) if self.clock else None)
+        QShortcut(QKeySequence(Qt.Key_Space), self, activated=self.toggle_play)
+
     def upload_csv(self):
         filepath, _ = QFileDialog.getOpenFileName(
             self,
@@ -193,46 +305,233 @@ class OBDViewer(QWidget):
             "CSV Files (*.csv);;All Files (*)"
         )
         if filepath:
-            try:
-                self.data = pd.read_csv(filepath)
-                self.current_index = 0
-                self.status_label.setText("Playing journey...")
-                self.replay_timer.start(500)  # Replay at 500ms intervals
-            except Exception as e:
-                self.status_label.setText(f"Error loading CSV: {e}")
+            self.load_journey(filepath)
+
+    def upload_comparison(self):
+        filepaths, _ = QFileDialog.getOpenFileNames(
+            self,
+            "Open Journeys to Compare",
+            os.path.expanduser("~"),
+            "Journeys (*.csv *.jrn);;All Files (*)"
+        )
+        if filepaths:
+            self.load_comparison(filepaths, self.align_combo.currentData())
+
+    def load_comparison(self, filepaths, align=ALIGN_TIME):
+        """Play several journeys together; the first is shown on the gauges, the rest underneath"""
+        self._reset_playback("Loading journeys...")
+        try:
+            comparison = Comparison.from_files(filepaths, align)
+        except Exception as e:
+            self.status_label.setText(f"Error loading journeys: {e}")
+            return
+        self.comparison = comparison
+        self.journey = comparison.tracks[0].journey
+        for k, track in enumerate(comparison.tracks):
+            label = QLabel(track.label)
+            self.compare_box.addWidget(label, alignment=Qt.AlignCenter)
+            self.compare_labels.append(label)
+            self.display.bind(f"compare{k}", label.setText)
+        self._start_playback(comparison)
+
+    def render_comparison(self, rows):
+        gaps = self.comparison.time_gap(rows)
+        values = {}
+        for k, (track, row, gap) in enumerate(zip(self.comparison.tracks, rows, gaps)):
+            journey = track.journey
+            rpm, speed = _whole(journey.value("rpm", row)), _whole(journey.value("speed", row))
+            text = (f"{track.label}: {'-' if rpm is None else rpm} RPM | {'-' if speed is None else speed} km/h"
+                    f" | Gear {journey.gear_label(row)}")
+            if k and self.comparison.align == ALIGN_DISTANCE:
+                text += f" | {gap:+.1f} s"  # Time behind (+) or ahead of (-) the reference at this point
+            values[f"compare{k}"] = text
+        self.display.update(**values)
+
+    def _reset_playback(self, message):
+        """Stop whatever is playing and clear the previous journey(s)"""
+        self.stop_loading()
+        if self.clock:
+            self.pause(message)
+        self.clock = None
+        self.comparison = None
+        for k, label in enumerate(self.compare_labels):
+            self.display.unbind(f"compare{k}")
+            label.deleteLater()
+        self.compare_labels = []
+        self.current_index = -1
+        self.seek_slider.setEnabled(False)
+        self.play_button.setEnabled(False)
+        self.summary_label.setVisible(False)
+        self.status_label.setText(message)
+
+    def _start_playback(self, timeline):
+        self.clock = PlaybackClock(timeline, rate=self.rate_combo.currentData())
+        self._moving_slider = True
+        self.seek_slider.setRange(0, int((self.clock.end_time - self.clock.start_time) * 1000))
+        self.seek_slider.setValue(0)
+        self._moving_slider = False
+        self.seek_slider.setEnabled(True)
+        self.play_button.setEnabled(True)
+        self.play()
+
+    def load_journey(self, filepath):
+        """Start reading a journey in the background; playback begins once the first chunk is in"""
+        self._reset_playback("Loading journey...")
+        self.load_bar.setValue(0)
+        self.load_bar.setVisible(True)
+        self.show_summary(filepath)
+        self.journey = StreamingJourney(filepath, required=PLAYBACK_COLUMNS)
+        self.loader = JourneyLoader(self.journey, self)
+        self.loader.chunk_loaded.connect(self.chunk_loaded)
+        self.loader.finished.connect(self.loader_finished)
+        self.loader.start()
+
+    def show_summary(self, filepath):
+        """Show the journey's peaks if it has a level-of-detail overview saved next to it"""
+        path = lod_path(filepath)
+        if not os.path.exists(path):
+            return
+        try:
+            pyramid = Pyramid.load(path)
+        except (OSError, ValueError, KeyError):
+            return  # Unreadable overview: just play without it
+        parts = []
+        for name, text in SUMMARY_CHANNELS:
+            if name in pyramid.channels and len(pyramid):
+                peaks = pyramid.view(name, max_points=1)["max"]  # Coarsest buckets, no raw rows read
+                peaks = peaks[~np.isnan(peaks)]
+                if len(peaks):
+                    parts.append(text.format(peaks.max()))
+        if parts:
+            self.summary_label.setText(", ".join(parts))
+            self.summary_label.setVisible(True)
+
+    def stop_loading(self):
+        if self.loader:
+            self.loader.chunk_loaded.disconnect()
+            self.loader.finished.disconnect()
+            self.loader.stop()
+            self.loader = None
+
+    def chunk_loaded(self, k):
+        """Another chunk is in: start playing on the first, and stretch the slider as the journey grows"""
+        if self.sender() is not self.loader:
+            return  # Late signal from a journey that's been replaced
+        journey = self.journey
+        self.load_bar.setValue(int(journey.progress * 100))
+        if k == -1:
+            self.load_bar.setVisible(False)
+            if not len(journey):
+                self.status_label.setText("Error loading CSV: no samples")
+                return
+        if self.clock is None:
+            self._start_playback(journey)
+        self._moving_slider = True
+        self.seek_slider.setRange(0, int((self.clock.end_time - self.clock.start_time) * 1000))
+        self._moving_slider = False
+        self._sync_slider()
+
+    def loader_finished(self):
+        """The loader only returns by itself on an error"""
+        if self.sender() is not self.loader or self.journey.error is None:
+            return
+        if self.clock:
+            self.pause()
+        self.load_bar.setVisible(False)
+        self.status_label.setText(f"Error loading CSV: {self.journey.error}")
+
+    def change_rate(self):
+        if self.clock:
+            self.clock.set_rate(self.rate_combo.currentData())
+
+    def play(self):
+        if self.clock.finished:
+            self.clock.seek(self.clock.start_time)
+        self.clock.play()
+        self.replay_timer.start(RENDER_INTERVAL_MS)
+        self.play_button.setText("Pause")
+        self.status_label.setText("Playing journey...")
+
+    def pause(self, message="Paused (Space to resume, arrows to seek)"):
+        self.clock.pause()
+        self.replay_timer.stop()
+        self.play_button.setText("Play")
+        self.status_label.setText(message)
+
+    def toggle_play(self):
+        if not self.clock:
+            return
+        if self.clock.running:
+            self.pause()
+        else:
+            self.play()
+
+    def seek_to(self, journey_time):
+        """Jump to a journey time and show that sample straight away"""
+        self.clock.seek(journey_time)
+        self.render_sample(self.clock.index())
+        self._sync_slider()
+
+    def jump(self, seconds):
+        if self.clock:
+            self.seek_to(self.clock.journey_time() + seconds)
+
+    def scrub(self, value):
+        """Slider moved by the user"""
+        if self.clock and not self._moving_slider:
+            self.seek_to(self.clock.start_time + value / 1000)
+
+    def _sync_slider(self):
+        if self.seek_slider.isSliderDown():
+            return  # Don't fight the user's drag
+        self._moving_slider = True
+        self.seek_slider.setValue(int(self.clock.elapsed() * 1000))
+        self._moving_slider = False
 
     def update_display(self):
-        if self.data is None or self.current_index >= len(self.data):
+        """Render frame: show whichever sample is current in journey time, skipping any in between"""
+        if self.journey is None or self.clock is None:
             self.replay_timer.stop()
-            self.status_label.setText("Journey playback finished. Upload another CSV.")
             return
+        i = self.clock.index()
+        if i != self.current_index:
+            self.render_sample(i)
+        self._sync_slider()
+        if self.clock.finished:
+            self.pause("Journey playback finished. Upload another CSV or press Space to replay.")
+
+    def render_sample(self, i):
+        """Put sample i of the journey on the gauges (a row per journey when comparing)"""
+        if self.comparison is not None:
+            self.render_comparison(i)
+            journey, i_row = self.journey, i[0]
+        else:
+            journey, i_row = self.journey.chunk_for(i)
+        self.current_rpm = _whole(journey.value("rpm", i_row))
+        self.current_speed = _whole(journey.value("speed", i_row))
+        self.current_throttle = _whole(journey.value("throttle", i_row))
+        self.current_temp = _whole(journey.value("temp", i_row))
+        self.current_load = _whole(journey.value("load", i_row))
+        self.current_boost = journey.value("boost", i_row)
+        self.current_gear = journey.gear_label(i_row)
+        start_time = self.comparison.tracks[0].start_time if self.comparison is not None else self.clock.start_time
+
+        self.display.update(
+            rpm=self.current_rpm,
+            speed=self.current_speed,
+            throttle=self.current_throttle,
+            temp=self.current_temp,
+            load=self.current_load,
+            boost=None if self.current_boost is None else round(self.current_boost, 2),  # Finer steps don't move the donut
+            gear=self.current_gear,
+            runtime=int(journey.timestamp[i_row] - start_time),
+        )
+
+        self.current_index = i
 
-        row = self.data.iloc[self.current_index]
-        self.current_rpm = int(row["rpm"])
-        self.current_speed = int(row["speed"])
-        self.current_throttle = int(row["throttle"])
-        self.current_temp = int(row["temp"])
-        self.current_load = int(row["load"])
-        self.current_boost = float(row["boost"])
-        self.current_gear = str(row["gear"])
-
-        self.rpm_gauge.setValue(self.current_rpm)
-        self.rpm_label.setText(f"RPM: {self.current_rpm}")
-        self.speed_gauge.setValue(self.current_speed)
-        self.speed_label.setText(f"Speed: {self.current_speed} km/h")
-        self.throttle_bar.setValue(self.current_throttle)
-        self.throttle_label.setText(f"Throttle: {self.current_throttle} %")
-        self.temp_bar.setValue(self.current_temp)
-        self.temp_label.setText(f"Temp: {self.current_temp} °C")
-        self.load_gauge.setValue(self.current_load)
-        self.boost_gauge.setValue(self.current_boost)
-        self.gear_label.setText(f"Gear: {self.current_gear}")
-
-        runtime_secs = int(row["timestamp"])
-        mins, secs = divmod(runtime_secs, 60)
-        self.runtime_label.setText(f"Run Time: {mins:02d}:{secs:02d}")
-
-        self.current_index += 1
+    def closeEvent(self, event):
+        self.stop_loading()
+        super().closeEvent(event)
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
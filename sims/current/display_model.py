@@ -0,0 +1,133 @@
+"""Display model shared by the simulator and the playback dashboard.
+
+The GUIs hand every new reading to a DisplayModel instead of calling
+setValue/setText on each widget. The model keeps the last value shown for
+each channel and only calls the widgets whose value changed. It also
+coalesces updates so the widgets are touched at most once per screen
+refresh, however often new readings arrive. With show_paint_time the time
+Qt spends painting each frame is shown in an overlay label.
+"""
+import os
+import sys
+import time
+
+from PyQt5.QtCore import QEvent, QObject, QTimer
+from PyQt5.QtGui import QGuiApplication
+from PyQt5.QtWidgets import QLabel, QWidget
+
+# Make the shared journey package importable when run as a script
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from journey.metrics import Metrics
+
+DEFAULT_REFRESH_HZ = 60  # Used when the screen doesn't report its refresh rate
+
+
+class DisplayModel(QObject):
+    """Diffs readings against what's on screen and flushes changes once per frame"""
+
+    def __init__(self, window, max_fps=None, show_paint_time=False, metrics=None):
+        super().__init__(window)
+        self.window = window
+        if max_fps is None:
+            screen = QGuiApplication.primaryScreen()
+            max_fps = screen.refreshRate() if screen and screen.refreshRate() > 1 else DEFAULT_REFRESH_HZ
+        self.frame_interval = 1.0 / max_fps
+        self.metrics = metrics if metrics is not None else Metrics()
+        self._setters = {}  # Channel -> widget update functions
+        self._shown = {}  # Channel -> value currently on screen
+        self._pending = {}  # Channel -> newest value not yet flushed
+        self._last_flush = 0.0
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self.flush)
+        self._updates = self.metrics.counter("widget_updates")
+        self._skipped = self.metrics.counter("widget_updates_skipped")
+        self._paint = self.metrics.histogram("paint_s")
+        self._paint_last = 0.0
+        self.overlay = None
+        if show_paint_time:
+            self.overlay = QLabel(window)
+            self.overlay.setStyleSheet("background-color: rgba(0, 0, 0, 160); color: white; padding: 2px;")
+            self.overlay.move(4, 4)
+            self.overlay.raise_()
+            # Painting happens when the window handles its UpdateRequest; time that
+            window.installEventFilter(self)
+
+    def bind(self, channel, *setters):
+        """Call each setter with the channel's value whenever it changes"""
+        self._setters[channel] = setters
+        self._shown.pop(channel, None)
+
+    def unbind(self, channel):
+        self._setters.pop(channel, None)
+        self._shown.pop(channel, None)
+        self._pending.pop(channel, None)
+
+    def update(self, **values):
+        """New readings; widgets change at the next frame"""
+        self._pending.update(values)
+        if not self._timer.isActive():
+            wait = self._last_flush + self.frame_interval - time.perf_counter()
+            self._timer.start(max(0, int(wait * 1000)))
+
+    def flush(self):
+        """Push changed values to their widgets now"""
+        self._timer.stop()
+        pending, self._pending = self._pending, {}
+        for channel, value in pending.items():
+            if channel not in self._setters:
+                continue
+            if self._shown.get(channel, self) == value:
+                self._skipped.add()
+                continue
+            self._shown[channel] = value
+            for setter in self._setters[channel]:
+                setter(value)
+            self._updates.add()
+        if self.overlay is not None:
+            self._show_paint_time()
+        self._last_flush = time.perf_counter()
+
+    def invalidate(self):
+        """Forget what's on screen so the next flush redraws every channel"""
+        self._shown.clear()
+
+    def eventFilter(self, obj, event):
+        if obj is self.window and event.type() == QEvent.UpdateRequest:
+            start = time.perf_counter()
+            QWidget.event(obj, event)  # Paint every dirty widget in the window
+            self._paint_last = time.perf_counter() - start
+            self._paint.observe(self._paint_last)
+            return True
+        return False
+
+    def _show_paint_time(self):
+        """Refresh the overlay; done on flush rather than after a paint so it can't repaint itself forever"""
+        if not self._paint.count:
+            return
+        self.overlay.setText(f"paint {self._paint_last * 1000:.2f} ms (p99 {self._paint.percentile(0.99) * 1000:.1f} ms)"
+                             f" | updates {self._updates.value} skipped {self._skipped.value}")
+        self.overlay.adjustSize()
+        self.overlay.raise_()
+
+
+def _gauge(value):
+    return 0 if value is None else value
+
+
+def _text(value):
+    return "-" if value is None else value
+
+
+def bind_gauges(display, gui):
+    """Bind the gauge and label widgets the simulator and the dashboard both have (None shows as '-')"""
+    display.bind("rpm", lambda v: gui.rpm_gauge.setValue(_gauge(v)), lambda v: gui.rpm_label.setText(f"RPM: {_text(v)}"))
+    display.bind("speed", lambda v: gui.speed_gauge.setValue(_gauge(v)),
+                 lambda v: gui.speed_label.setText(f"Speed: {_text(v)} km/h"))
+    display.bind("throttle", lambda v: gui.throttle_bar.setValue(_gauge(v)),
+                 lambda v: gui.throttle_label.setText(f"Throttle: {_text(v)} %"))
+    display.bind("temp", lambda v: gui.temp_bar.setValue(_gauge(v)), lambda v: gui.temp_label.setText(f"Temp: {_text(v)} °C"))
+    display.bind("load", lambda v: gui.load_gauge.setValue(_gauge(v)))
+    display.bind("boost", lambda v: gui.boost_gauge.setValue(_gauge(v)))
+    display.bind("gear", lambda v: gui.gear_label.setText(f"Gear: {v}"))
+    display.bind("runtime", lambda v: gui.runtime_label.setText("Run Time: %02d:%02d" % divmod(v, 60)))
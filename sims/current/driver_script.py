@@ -0,0 +1,200 @@
+"""Driver scripts: time-stamped pedal and gear events for the simulator.
+
+A script is a small CSV of the moments the driver changed something:
+
+    # driver script
+    # max_rpm=8000
+    # max_speed=240
+    # duration=95.250
+    # start.rpm=750.0
+    time,input,value
+    0.000,clutch,1
+    0.000,gear,1
+    0.600,clutch,0
+    0.600,throttle,1
+    ...
+
+Inputs are throttle and clutch (1 = pressed, 0 = released), gear (0 =
+neutral) and restart (restart a stalled engine). Times are seconds from the
+start of the script and are applied before the tick that starts at that
+time. The "# key=value" lines hold the car's settings, the script length,
+and optionally the engine state it starts from (start.<field>, see
+SimEngine.state()). Replaying a recorded script from that state gives
+the same telemetry the session logged.
+
+OBDGui records one next to every CSV it logs (DriverRecorder), and
+fleet.py --script replays one for a whole fleet at batch speed. Moving the
+throttle slider by hand isn't part of the format.
+"""
+import csv
+import os
+
+import numpy as np
+
+from sim_engine import DT, STATE_FIELDS
+
+SCRIPT_SUFFIX = ".drive.csv"
+INPUTS = ("throttle", "clutch", "gear", "restart")
+SCRIPT_HEADER = ["time", "input", "value"]
+
+
+def script_path(log_path):
+    """Where the recorder writes the script for a logged CSV"""
+    return os.path.splitext(log_path)[0] + SCRIPT_SUFFIX
+
+
+def _tick(seconds):
+    return int(round(float(seconds) / DT))
+
+
+def _state_value(name, text):
+    if name == "stalled":
+        return text.strip().lower() in ("1", "true")
+    if name in ("gear", "ticks"):
+        return int(text)
+    return float(text)
+
+
+class DriverScript:
+    """Events as (tick, input, value), sorted by tick, plus the settings they were recorded with"""
+
+    def __init__(self, events=(), n_ticks=None, max_rpm=None, max_speed=None, start=None):
+        for _, name, _ in events:
+            if name not in INPUTS:
+                raise ValueError(f"unknown input {name!r}, expected one of {INPUTS}")
+        self.events = sorted(events, key=lambda event: event[0])
+        last = self.events[-1][0] + 1 if self.events else 0
+        self.n_ticks = max(last, n_ticks or 0)
+        self.max_rpm = max_rpm
+        self.max_speed = max_speed
+        self.start = dict(start or {})  # Engine state to start from; empty = a fresh engine
+
+    def __len__(self):
+        return len(self.events)
+
+    @property
+    def duration(self):
+        return self.n_ticks * DT
+
+    @classmethod
+    def from_inputs(cls, throttle, clutch, gear, restart=None, **settings):
+        """Compress per-tick input arrays (a recorded trace) into change events"""
+        events = []
+        arrays = {"throttle": throttle, "clutch": clutch, "gear": gear}
+        for name, values in arrays.items():
+            values = np.asarray(values, dtype=np.int64)
+            if len(values):
+                changes = np.flatnonzero(values[1:] != values[:-1]) + 1
+                ticks = np.concatenate(([0], changes))
+                events.extend((int(tick), name, int(values[tick])) for tick in ticks)
+        if restart is not None:
+            events.extend((int(tick), "restart", 1) for tick in np.flatnonzero(restart))
+        return cls(events, len(throttle), **settings)
+
+    def inputs(self, n_ticks=None, loop=False):
+        """Per-tick (throttle, clutch, gear, restart) arrays for SimEngine.run
+
+        n_ticks defaults to the script length. With loop=True a longer run
+        repeats the script from the top; otherwise the last inputs are held.
+        """
+        n = self.n_ticks if n_ticks is None else n_ticks
+        ticks = np.arange(n)
+        if loop and self.n_ticks:
+            ticks %= self.n_ticks
+        out = []
+        for name in INPUTS:
+            at = np.array([event[0] for event in self.events if event[1] == name], dtype=np.int64)
+            values = np.array([event[2] for event in self.events if event[1] == name], dtype=np.int64)
+            if name == "restart":
+                out.append(np.isin(ticks, at))
+                continue
+            default = self.start.get(name, 0) if name == "gear" else 0
+            last = np.searchsorted(at, ticks, side="right") - 1  # Latest event at or before each tick
+            column = np.where(last >= 0, values[np.maximum(last, 0)] if len(values) else default, default)
+            out.append(column.astype(bool) if name != "gear" else column)
+        return tuple(out)
+
+    def save(self, path):
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", newline="", encoding="utf-8") as f:
+            f.write("# driver script\n")
+            if self.max_rpm is not None:
+                f.write(f"# max_rpm={self.max_rpm}\n")
+            if self.max_speed is not None:
+                f.write(f"# max_speed={self.max_speed}\n")
+            f.write(f"# duration={self.duration:.3f}\n")
+            for name in STATE_FIELDS:
+                if name in self.start:
+                    f.write(f"# start.{name}={self.start[name]!r}\n")  # repr keeps floats exact
+            writer = csv.writer(f)
+            writer.writerow(SCRIPT_HEADER)
+            writer.writerows((f"{tick * DT:.3f}", name, value) for tick, name, value in self.events)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        settings = {}
+        start = {}
+        events = []
+        with open(path, newline="", encoding="utf-8") as f:
+            lines = []
+            for line in f:
+                if line.startswith("#"):
+                    key, sep, value = line[1:].strip().partition("=")
+                    if not sep:
+                        continue
+                    if key.startswith("start."):
+                        name = key[len("start."):]
+                        if name in STATE_FIELDS:
+                            start[name] = _state_value(name, value)
+                    else:
+                        settings[key] = value
+                elif line.strip():
+                    lines.append(line)
+        reader = csv.reader(lines)
+        header = next(reader, None)
+        if header is None or [h.strip() for h in header] != SCRIPT_HEADER:
+            raise ValueError(f"{path} is not a driver script (expected a {','.join(SCRIPT_HEADER)} header)")
+        for row in reader:
+            if len(row) != 3:
+                raise ValueError(f"{path}: bad event {row!r}")
+            name = row[1].strip()
+            value = int(row[2]) if name != "restart" else 1
+            events.append((_tick(row[0]), name, value))
+        return cls(
+            events,
+            _tick(settings["duration"]) if "duration" in settings else None,
+            int(settings["max_rpm"]) if "max_rpm" in settings else None,
+            int(settings["max_speed"]) if "max_speed" in settings else None,
+            start,
+        )
+
+
+class DriverRecorder:
+    """Builds a DriverScript from a live session, one call per engine tick"""
+
+    def __init__(self, engine):
+        self.max_rpm = engine.max_rpm
+        self.max_speed = engine.max_speed
+        self.start = engine.state()
+        self.first_tick = engine.ticks
+        self.events = []
+        self._last = {}
+
+    def _set(self, tick, name, value):
+        if self._last.get(name) != value:
+            self._last[name] = value
+            self.events.append((tick, name, value))
+
+    def record(self, engine, throttle_pressed, clutch_pressed):
+        """Note the inputs for the tick the engine is about to run"""
+        tick = engine.ticks - self.first_tick
+        self._set(tick, "throttle", int(bool(throttle_pressed)))
+        self._set(tick, "clutch", int(bool(clutch_pressed)))
+        self._set(tick, "gear", engine.gear)
+
+    def restart(self, engine):
+        self.events.append((engine.ticks - self.first_tick, "restart", 1))
+
+    def script(self, engine):
+        return DriverScript(self.events, engine.ticks - self.first_tick, self.max_rpm, self.max_speed, self.start)
@@ -0,0 +1,344 @@
+"""Pseudo-terminal stand-in for an ELM327 OBD-II adapter (Linux/macOS only).
+
+Answers what python-obd (sims/old/testfinal.py) sends: the AT init
+sequence (ATZ, ATE0, ATH1, ATL0, AT RV, ATSP0, ATDPN...), ATI for
+ELM_VERSION, and mode 01 requests for RPM (0C), SPEED (0D), THROTTLE_POS
+(11), ENGINE_LOAD (04) and COOLANT_TEMP (05) plus the supported-PID
+bitmap (00). Replies are formatted like a CAN 11-bit 500k car (ISO
+15765-4), with or without headers and spaces. Several PIDs in one
+request ("010C0D11") come back together, as multi-frame if they don't
+fit in one CAN frame. An empty line repeats the last command.
+
+Values come from SimEngine driving a fleet.py driver profile or a driver
+script, or from a recorded journey, and loop when it ends. A journey
+without a channel (Arduino logs have no throttle) doesn't report that PID
+as supported. The link is slowed down to look like a real one: --latency
+is the ECU's reply time for each OBD request and --baud the serial speed
+both ways (10 bits a byte). Example:
+
+    python fake_elm327.py --profile aggressive --latency 0.05 --baud 38400
+    python fake_elm327.py --replay ../../csv/arduinoCSV/8-6-25.csv --baud 0
+    OBD_PORT=<printed port> python ../old/testfinal.py
+"""
+import argparse
+import os
+import random
+import select
+import sys
+import threading
+import time
+import tty
+
+import numpy as np
+
+# Make the shared journey package importable when run as a script
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from journey.model import Journey
+from driver_script import DriverScript
+from fleet import DRIVER_PROFILES, driver_inputs
+from sim_engine import DT, SimEngine
+
+ELM_VERSION = "ELM327 v1.5"
+DEVICE_DESCRIPTION = "OBDII to RS232 Interpreter"
+PROTOCOL = "6"  # ISO 15765-4 CAN (11 bit ID, 500 kbaud), the only one this car speaks
+PROTOCOL_NAME = "ISO 15765-4 (CAN 11/500)"
+ECU_HEADER = "7E8"  # Reply ID of the engine ECU
+DEFAULT_LATENCY = 0.03  # Seconds from request to ECU reply, typical for a CAN car
+DEFAULT_BAUD = 38400  # ELM327 default serial speed
+SEND_SLICE = 0.002  # Seconds of serial time written to the pty at once when pacing by baud
+MAX_PIDS = 6  # Most PIDs the ELM327 accepts in one mode 01 request
+# AT settings that are accepted and don't change anything here
+IGNORED_AT = ("ATAT", "ATST", "ATM", "ATCAF", "ATAL", "ATNL", "ATCFC", "ATV", "ATR", "ATSH", "ATPC", "ATLP")
+
+
+def _byte(value):
+    return min(255, max(0, int(round(value))))
+
+
+def _percent(value):
+    return [_byte(value * 255 / 100)]
+
+
+def _rpm(value):
+    return list(divmod(min(65535, max(0, int(round(value * 4)))), 256))
+
+
+# Mode 01 PID -> (journey channel, encoder from the channel value to the data bytes)
+PIDS = {
+    0x04: ("load", _percent),
+    0x05: ("temp", lambda value: [_byte(value + 40)]),
+    0x0C: ("rpm", _rpm),
+    0x0D: ("speed", lambda value: [_byte(value)]),
+    0x11: ("throttle", _percent),
+}
+
+
+class Telemetry:
+    """Channel arrays on a time axis starting at 0, looped; what the fake ECU reports"""
+
+    def __init__(self, times, channels):
+        self.times = np.asarray(times, dtype=np.float64) - times[0]
+        self.channels = {name: np.asarray(values, dtype=np.float64) for name, values in channels.items()}
+        step = float(np.median(np.diff(self.times))) if len(self.times) > 1 else DT
+        self.period = float(self.times[-1]) + step
+
+    def sample(self, elapsed):
+        """Channel values at `elapsed` seconds; NaN where the source has a gap"""
+        index = int(np.searchsorted(self.times, elapsed % self.period, side="right")) - 1
+        return {name: float(values[max(index, 0)]) for name, values in self.channels.items()}
+
+    @classmethod
+    def from_journey(cls, path):
+        journey = Journey.from_file(path)
+        if len(journey) == 0:
+            raise ValueError(f"{path} has no data rows")
+        channels = {name: getattr(journey, name) for name, _ in PIDS.values() if journey.has(name)}
+        return cls(journey.timestamp, channels)
+
+    @classmethod
+    def simulate(cls, minutes=30, profile="normal", seed=0, max_rpm=8000, max_speed=240, script=None):
+        engine = SimEngine(max_rpm, max_speed)
+        n_ticks = int(round(minutes * 60 / DT))
+        if script is not None:
+            script = DriverScript.load(script)
+            engine.set_state(script.start)
+            inputs = script.inputs(n_ticks, loop=True)
+        else:
+            inputs = driver_inputs(profile, minutes * 60, np.random.default_rng(seed))
+        columns = engine.run(*inputs)
+        return cls(columns["timestamp"], {name: columns[name] for name, _ in PIDS.values()})
+
+
+class FakeELM327(threading.Thread):
+    """Answer ELM327 commands written to a pty, one command per CR"""
+
+    def __init__(self, telemetry, latency=DEFAULT_LATENCY, jitter=0.0, baud=DEFAULT_BAUD, duration=None, seed=0):
+        super().__init__(name="FakeELM327", daemon=True)
+        self.telemetry = telemetry
+        self.latency = latency
+        self.jitter = jitter
+        self.baud = baud or None  # None or 0: no serial speed limit
+        self.duration = duration
+        self.rng = random.Random(seed)
+        self.supported = [pid for pid, (channel, _) in PIDS.items() if channel in telemetry.channels]
+        self.master_fd, self.slave_fd = os.openpty()
+        tty.setraw(self.slave_fd)
+        self.port = os.ttyname(self.slave_fd)
+        self.commands = 0
+        self.obd_requests = 0
+        self.unknown = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self._last_command = ""
+        self._start = None
+        self._stop_event = threading.Event()
+        self.reset()
+
+    def reset(self):
+        """ATZ / ATD: back to power-on settings"""
+        self.echo = True
+        self.headers = False
+        self.spaces = True
+        self.linefeeds = False
+        self.protocol = "0"  # Automatic
+
+    def run(self):
+        self._start = time.monotonic()
+        pending = b""
+        while not self._stop_event.is_set():
+            if self.duration is not None and time.monotonic() - self._start >= self.duration:
+                break
+            ready, _, _ = select.select([self.master_fd], [], [], 0.1)
+            if not ready:
+                continue
+            try:
+                data = os.read(self.master_fd, 1024)
+            except OSError:
+                break
+            self.bytes_in += len(data)
+            pending += data
+            while b"\r" in pending:
+                line, _, pending = pending.partition(b"\r")
+                self._answer(line.decode("ascii", "replace"))
+
+    def _answer(self, raw):
+        raw = raw.replace("\n", "")  # Line feeds are ignored, like the real chip does
+        command = raw.replace(" ", "").upper()
+        if not command:
+            command = self._last_command  # A bare CR repeats the last command
+        self.commands += 1
+        delay = (len(raw) + 1) * 10 / self.baud if self.baud else 0.0  # The request crossing the serial link
+        if command.startswith("AT"):
+            lines = self.at_command(command)
+        else:
+            lines = self.obd_request(command)
+            if lines != ["?"]:
+                delay += self.latency + (self.rng.uniform(0, self.jitter) if self.jitter else 0.0)  # Went to the car
+        if lines == ["?"]:
+            self.unknown += 1
+        else:
+            self._last_command = command
+        eol = "\r\n" if self.linefeeds else "\r"
+        text = (raw + "\r" if self.echo else "") + "".join(line + eol for line in lines) + eol + ">"
+        if delay:
+            time.sleep(delay)
+        self._send(text.encode("ascii"))
+
+    def _send(self, data):
+        """Write to the pty no faster than the serial link would deliver it"""
+        self.bytes_out += len(data)
+        if not self.baud:
+            os.write(self.master_fd, data)
+            return
+        byte_time = 10 / self.baud  # Start bit, 8 data bits, stop bit
+        slice_bytes = max(1, int(SEND_SLICE / byte_time))
+        start = time.monotonic()
+        for offset in range(0, len(data), slice_bytes):
+            chunk = data[offset:offset + slice_bytes]
+            wait = start + (offset + len(chunk)) * byte_time - time.monotonic()  # When its last byte would arrive
+            if wait > 0:
+                time.sleep(wait)
+            os.write(self.master_fd, chunk)
+
+    def at_command(self, command):
+        """Lines of the reply to an AT command (spaces removed, upper case)"""
+        if command in ("ATZ", "ATWS"):
+            self.reset()
+            return ["", ELM_VERSION]
+        if command == "ATI":
+            return [ELM_VERSION]
+        if command == "AT@1":
+            return [DEVICE_DESCRIPTION]
+        if command == "ATD":
+            self.reset()
+            return ["OK"]
+        if command == "ATRV":
+            running = self.telemetry.sample(self._elapsed()).get("rpm", 0) > 0
+            return ["14.2V" if running else "12.4V"]
+        if command == "ATDP":
+            return [("AUTO, " if self.protocol == "0" else "") + PROTOCOL_NAME]
+        if command == "ATDPN":
+            return ["A" + PROTOCOL if self.protocol == "0" else self.protocol]
+        if command[:4] == "ATSP" and len(command) == 5:
+            self.protocol = command[4]
+            return ["OK"]
+        toggles = {"ATE": "echo", "ATH": "headers", "ATS": "spaces", "ATL": "linefeeds"}
+        if command[:3] in toggles and command[3:] in ("0", "1"):
+            setattr(self, toggles[command[:3]], command[3:] == "1")
+            return ["OK"]
+        if command.startswith(IGNORED_AT):
+            return ["OK"]
+        return ["?"]
+
+    def obd_request(self, command):
+        """Lines of the reply to an OBD request such as 010C or 010C0D11"""
+        try:
+            request = bytes.fromhex(command if len(command) % 2 == 0 else command[:-1])  # Odd: trailing response count
+        except ValueError:
+            return ["?"]
+        if not request:
+            return ["?"]
+        self.obd_requests += 1
+        if self.protocol not in ("0", PROTOCOL):
+            return ["UNABLE TO CONNECT"]
+        if request[0] != 0x01 or len(request) == 1:
+            return ["NO DATA"]  # Only mode 01 live data is emulated
+        if len(request) - 1 > MAX_PIDS:
+            return ["?"]
+        values = self.telemetry.sample(self._elapsed())
+        payload = [0x41]
+        for pid in request[1:]:
+            data = self._pid_data(pid, values)
+            if data is not None:
+                payload += [pid] + data
+        if len(payload) == 1:
+            return ["NO DATA"]
+        return self.frames(payload)
+
+    def _pid_data(self, pid, values):
+        if pid % 0x20 == 0:
+            # Supported PIDs pid+1..pid+0x20 as a 32 bit mask, highest bit first
+            mask = sum(1 << (0x20 - (p - pid)) for p in self.supported if pid < p <= pid + 0x20)
+            return list(mask.to_bytes(4, "big")) if mask or pid == 0 else None
+        if pid not in self.supported:
+            return None
+        channel, encode = PIDS[pid]
+        value = values[channel]
+        if value != value:
+            return None  # NaN: the journey has a gap here
+        return encode(value)
+
+    def frames(self, payload):
+        """ISO-TP frames of the ECU reply as ELM327 prints them"""
+        if len(payload) <= 7:
+            frames = [[len(payload)] + payload]
+        else:
+            frames = [[0x10 | len(payload) >> 8, len(payload) & 0xFF] + payload[:6]]
+            for i, offset in enumerate(range(6, len(payload), 7)):
+                chunk = payload[offset:offset + 7]
+                frames.append([0x20 | (i + 1) & 0x0F] + chunk + [0] * (7 - len(chunk)))  # Padded to 8 bytes
+        sep = " " if self.spaces else ""
+        if self.headers:
+            return [sep.join([ECU_HEADER] + [f"{b:02X}" for b in frame]) for frame in frames]
+        if len(frames) == 1:
+            return [sep.join(f"{b:02X}" for b in payload)]
+        # Without headers the ELM prints the length, then numbered frames without their PCI byte
+        lines = [f"{len(payload):03X}"]
+        for i, frame in enumerate(frames):
+            data = frame[2:] if i == 0 else frame[1:]
+            lines.append(f"{i & 0x0F:X}:{sep}" + sep.join(f"{b:02X}" for b in data))
+        return lines
+
+    def _elapsed(self):
+        return time.monotonic() - self._start if self._start is not None else 0.0
+
+    def stop(self, timeout=2.0):
+        self._stop_event.set()
+        if self.is_alive():
+            self.join(timeout)
+
+    def close(self):
+        self.stop()
+        os.close(self.master_fd)
+        os.close(self.slave_fd)
+
+    def stats(self):
+        return {"commands": self.commands, "obd_requests": self.obd_requests, "unknown": self.unknown,
+                "bytes_in": self.bytes_in, "bytes_out": self.bytes_out}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Emulate an ELM327 OBD-II adapter on a pty.")
+    parser.add_argument("--replay", help="journey file to report (CSV or .jrn); default simulate a car")
+    parser.add_argument("--script", help="driver script for the simulated car instead of --profile")
+    parser.add_argument("--profile", choices=sorted(DRIVER_PROFILES), default="normal")
+    parser.add_argument("--minutes", type=float, default=30, help="simulated journey length before it loops")
+    parser.add_argument("--rpm", type=int, default=8000, help="simulated car's max RPM")
+    parser.add_argument("--speed", type=int, default=240, help="simulated car's max speed in km/h")
+    parser.add_argument("--latency", type=float, default=DEFAULT_LATENCY, help="seconds for the ECU to answer")
+    parser.add_argument("--jitter", type=float, default=0.0, help="up to this many seconds extra per request")
+    parser.add_argument("--baud", type=int, default=DEFAULT_BAUD, help="serial speed, 0 for unlimited")
+    parser.add_argument("--duration", type=float, default=None, help="stop after this many seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    if args.replay:
+        telemetry = Telemetry.from_journey(args.replay)
+    else:
+        telemetry = Telemetry.simulate(args.minutes, args.profile, args.seed, args.rpm, args.speed, args.script)
+    elm = FakeELM327(telemetry, args.latency, args.jitter, args.baud, args.duration, args.seed)
+    print(f"Fake ELM327 on {elm.port} ({args.latency * 1000:g} ms latency, "
+          f"{f'{args.baud} baud' if args.baud else 'unlimited'})")
+    elm.start()
+    try:
+        while elm.is_alive():
+            elm.join(0.5)
+    except KeyboardInterrupt:
+        pass
+    elm.close()
+    print(elm.stats())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,290 @@
+"""Simulate a fleet of cars in parallel and write one journey file per car.
+
+Every car gets its own max RPM and max speed, a driver profile and a seed.
+Its pedal and gear inputs are generated from those (pull away, shift up,
+cruise with throttle pulses, slow down, stop, repeat), or replayed from a
+driver script (see driver_script.py), and stepped through SimEngine
+without any GUI. With --route every car drives along the same route (see
+journey/route.py), placed by the distance its odometer has covered.
+Cars are spread over a process pool. Each worker writes its journeys
+straight to disk and only sends a one-line summary back, so throughput
+grows with the number of cores. A fleet.csv manifest lists every car and
+its file. Example:
+
+    python fleet.py --cars 1000 --minutes 20-90 --output-dir fleet1
+    python fleet.py --cars 200 --profile aggressive --format csv --workers 4 --output-dir fleet2
+    python fleet.py --cars 1 --script sim_data_20240501_080000.drive.csv --format csv --output-dir replay
+    python fleet.py --cars 50 --route osrm_route_journey.csv --output-dir fleet3
+"""
+import argparse
+import csv
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# Make the shared journey package importable when run as a script
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from journey.binformat import NAME_STAMP_FORMAT, write_journey
+from journey.route import WRAP_MODES, WRAP_RETURN, Route
+from driver_script import DriverScript
+from sim_engine import DT, TOP_GEAR, SimEngine, gear_label
+
+SIM_HEADER = ["timestamp", "rpm", "speed", "throttle", "temp", "load", "boost", "gear", "lat", "lon"]
+FORMATS = ("jrn", "csv")
+DEFAULT_RPM_RANGE = (5000, 9000)
+DEFAULT_SPEED_RANGE = (160, 280)
+DEFAULT_MINUTES_RANGE = (20, 90)
+
+# Seconds unless noted. Pulses are how long the throttle is held or released while cruising.
+DRIVER_PROFILES = {
+    "calm": {"shift_seconds": 6.0, "clutch_seconds": 0.6, "cruise_duty": 0.35, "pulse_seconds": 2.0,
+             "cruise_seconds": 300.0, "stop_seconds": 30.0},
+    "normal": {"shift_seconds": 4.0, "clutch_seconds": 0.4, "cruise_duty": 0.5, "pulse_seconds": 1.5,
+               "cruise_seconds": 240.0, "stop_seconds": 20.0},
+    "aggressive": {"shift_seconds": 2.5, "clutch_seconds": 0.25, "cruise_duty": 0.7, "pulse_seconds": 1.0,
+                   "cruise_seconds": 400.0, "stop_seconds": 10.0},
+}
+
+
+def _ticks(seconds):
+    return max(1, int(round(seconds / DT)))
+
+
+def driver_inputs(profile, duration, rng):
+    """Per-tick (throttle, clutch, gear) arrays for one journey of about `duration` seconds"""
+    p = DRIVER_PROFILES[profile]
+    segments = [(_ticks(1.0), False, True, 0)]  # Start in neutral so the engine reaches idle
+    total = segments[0][0]
+    target = _ticks(duration)
+
+    def add(seconds, throttle, clutch, gear):
+        nonlocal total
+        n = _ticks(seconds)
+        segments.append((n, throttle, clutch, gear))
+        total += n
+
+    while total < target:
+        cruise_gear = int(rng.integers(3, TOP_GEAR + 1))
+        # Pull away and shift up through the gears
+        for gear in range(1, cruise_gear + 1):
+            add(p["clutch_seconds"], False, True, gear)
+            add(p["shift_seconds"] * rng.uniform(0.7, 1.3), True, False, gear)
+        # Cruise, pulsing the throttle around the profile's duty cycle
+        cruise_end = total + _ticks(rng.exponential(p["cruise_seconds"]))
+        while total < min(cruise_end, target):
+            add(rng.exponential(p["pulse_seconds"] * 2 * p["cruise_duty"]), True, False, cruise_gear)
+            add(rng.exponential(p["pulse_seconds"] * 2 * (1 - p["cruise_duty"])), False, False, cruise_gear)
+        # Slow down through the gears and stop in neutral
+        for gear in range(cruise_gear, 0, -1):
+            add(p["shift_seconds"], False, False, gear)
+            add(p["clutch_seconds"], False, True, gear - 1)
+        add(rng.exponential(p["stop_seconds"]), False, True, 0)
+
+    counts = np.array([s[0] for s in segments])
+    throttle = np.repeat([s[1] for s in segments], counts)[:target]
+    clutch = np.repeat([s[2] for s in segments], counts)[:target]
+    gear = np.repeat([s[3] for s in segments], counts)[:target]
+    return throttle, clutch, gear
+
+
+def write_sim_csv(path, columns):
+    """Write columns in the simulator's CSV layout; timestamps should be seconds since the start, like OBDGui's"""
+    rows = zip(
+        [f"{t:.3f}" for t in columns["timestamp"].tolist()],
+        columns["rpm"].astype(int).tolist(),
+        columns["speed"].astype(int).tolist(),
+        columns["throttle"].astype(int).tolist(),
+        columns["temp"].astype(int).tolist(),
+        columns["load"].astype(int).tolist(),
+        [f"{b:.1f}" for b in columns["boost"].tolist()],
+        [gear_label(g) for g in columns["gear"].tolist()],
+    )
+    if "lat" in columns:
+        positions = zip(columns["lat"].tolist(), columns["lon"].tolist())
+    else:
+        positions = ((0.0, 0.0) for _ in columns["timestamp"])  # No route: same "no fix" as OBDGui
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(SIM_HEADER)
+        writer.writerows(row + position for row, position in zip(rows, positions))
+    os.replace(tmp_path, path)
+
+
+_scripts = {}  # Driver scripts already loaded by this worker
+_routes = {}  # Routes likewise
+
+
+def _load_script(path):
+    if path not in _scripts:
+        _scripts[path] = DriverScript.load(path)
+    return _scripts[path]
+
+
+def _load_route(path):
+    if path not in _routes:
+        _routes[path] = Route.from_file(path)
+    return _routes[path]
+
+
+def simulate_car(car):
+    """Worker: simulate one car described by a dict from plan_fleet and write its journey"""
+    start = time.perf_counter()
+    engine = SimEngine(car["max_rpm"], car["max_speed"])
+    if car["script"]:
+        script = _load_script(car["script"])
+        engine.set_state(script.start)  # Carry on from where the recording started
+        inputs = script.inputs(_ticks(car["duration"]), loop=True)
+    else:
+        inputs = driver_inputs(car["profile"], car["duration"], np.random.default_rng(car["seed"]))
+    first_tick = engine.ticks
+    columns = engine.run(*inputs)
+    every = car["log_every"]
+    if every > 1:
+        columns = {name: values[every - 1::every] for name, values in columns.items()}
+    if car["route"]:
+        columns["lat"], columns["lon"] = _load_route(car["route"]).positions(columns["distance"], car["route_wrap"])
+
+    if car["format"] == "csv":
+        write_sim_csv(car["path"], columns)  # Time 0 comes from the stamp in the file name
+    else:
+        columns["timestamp"] = columns["timestamp"] + (car["start_time"] - first_tick * DT)
+        write_journey(car["path"], columns)
+    return {"car": car["car"], "path": car["path"], "rows": len(columns["timestamp"]),
+            "seconds": time.perf_counter() - start}
+
+
+def _range(text, cast):
+    """'LOW-HIGH' or a single value -> (low, high)"""
+    low, _, high = text.partition("-")
+    return cast(low), cast(high or low)
+
+
+def plan_fleet(cars, output_dir, seed=0, rpm_range=None, speed_range=None, minutes_range=None,
+               profiles=tuple(DRIVER_PROFILES), fmt="jrn", log_every=1, start_time=None, script=None,
+               route=None, route_wrap=WRAP_RETURN):
+    """One dict per car with everything a worker needs; the same seed always gives the same fleet
+
+    With a driver script every car replays it instead of following a profile.
+    Ranges left as None then come from the script's own settings and length.
+    With a route file every car's positions follow it, see Route.along for route_wrap.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"format must be one of {FORMATS}, not {fmt!r}")
+    if route_wrap not in WRAP_MODES:
+        raise ValueError(f"route_wrap must be one of {WRAP_MODES}, not {route_wrap!r}")
+    if route is not None:
+        Route.from_file(route)  # Fail here, not in every worker
+    if script is not None:
+        recorded = DriverScript.load(script)
+        if rpm_range is None and recorded.max_rpm:
+            rpm_range = (recorded.max_rpm, recorded.max_rpm)
+        if speed_range is None and recorded.max_speed:
+            speed_range = (recorded.max_speed, recorded.max_speed)
+        if minutes_range is None:
+            minutes_range = (recorded.duration / 60, recorded.duration / 60)
+    rpm_range = rpm_range or DEFAULT_RPM_RANGE
+    speed_range = speed_range or DEFAULT_SPEED_RANGE
+    minutes_range = minutes_range or DEFAULT_MINUTES_RANGE
+    start_time = time.time() if start_time is None else start_time
+    children = np.random.SeedSequence(seed).spawn(cars)  # Independent streams, whatever order the workers run in
+    plan = []
+    for i, child in enumerate(children):
+        rng = np.random.default_rng(child)
+        departure = float(int(start_time + rng.uniform(0, 8 * 3600)))  # Spread over a working day, whole seconds
+        stamp = time.strftime(NAME_STAMP_FORMAT, time.localtime(departure))
+        plan.append({
+            "car": i,
+            "seed": int(child.generate_state(1)[0]),
+            "profile": profiles[int(rng.integers(len(profiles)))] if script is None else "script",
+            "script": script,
+            "route": route,
+            "route_wrap": route_wrap,
+            "max_rpm": int(rng.integers(rpm_range[0], rpm_range[1] + 1)),
+            "max_speed": int(rng.integers(speed_range[0], speed_range[1] + 1)),
+            "duration": float(rng.uniform(*minutes_range)) * 60,
+            "start_time": departure,
+            "log_every": log_every,
+            "format": fmt,
+            "path": os.path.join(output_dir, f"car{i:05d}_{stamp}.{fmt}"),
+        })
+    return plan
+
+
+def run_fleet(plan, workers=None, progress=None):
+    """Simulate every car in the plan over a process pool; returns the worker summaries in car order"""
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        results = map(simulate_car, plan)
+        return [_report(result, progress) for result in results]
+    chunksize = max(1, len(plan) // (workers * 8))  # Few round trips to the workers, still balanced at the end
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return [_report(result, progress) for result in pool.map(simulate_car, plan, chunksize=chunksize)]
+
+
+def _report(result, progress):
+    if progress is not None:
+        progress(result)
+    return result
+
+
+def write_manifest(path, plan, results):
+    fields = ["car", "profile", "seed", "max_rpm", "max_speed", "duration", "rows", "path"]
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fields, extrasaction="ignore")
+        writer.writeheader()
+        for car, result in zip(plan, results):
+            writer.writerow({**car, "rows": result["rows"], "path": os.path.basename(car["path"])})
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate many cars in parallel and write their journeys.")
+    parser.add_argument("--cars", type=int, default=100)
+    parser.add_argument("--output-dir", required=True)
+    parser.add_argument("--seed", type=int, default=0, help="the same seed gives the same fleet")
+    parser.add_argument("--rpm", help="max RPM range, LOW-HIGH (default %d-%d)" % DEFAULT_RPM_RANGE)
+    parser.add_argument("--speed", help="max speed range in km/h, LOW-HIGH (default %d-%d)" % DEFAULT_SPEED_RANGE)
+    parser.add_argument("--minutes", help="journey length range, LOW-HIGH (default %d-%d)" % DEFAULT_MINUTES_RANGE)
+    parser.add_argument("--profile", action="append", choices=sorted(DRIVER_PROFILES),
+                        help="driver profiles to draw from (repeatable, default all)")
+    parser.add_argument("--script", help="replay this driver script on every car (looped to fill --minutes)")
+    parser.add_argument("--route", help="CSV with lat/lon columns or an encoded polyline for the cars to drive along")
+    parser.add_argument("--route-wrap", choices=WRAP_MODES, default=WRAP_RETURN,
+                        help="what a car does at the end of the route (default %(default)s)")
+    parser.add_argument("--format", choices=FORMATS, default="jrn")
+    parser.add_argument("--log-interval", type=float, default=DT, help="seconds between logged rows")
+    parser.add_argument("--start", help="departure day as YYYY-mm-dd HH:MM:SS (default now)")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default one per core)")
+    args = parser.parse_args(argv)
+
+    start_time = time.mktime(time.strptime(args.start, "%Y-%m-%d %H:%M:%S")) if args.start else None
+    os.makedirs(args.output_dir, exist_ok=True)
+    plan = plan_fleet(args.cars, args.output_dir, args.seed, args.rpm and _range(args.rpm, int),
+                      args.speed and _range(args.speed, int), args.minutes and _range(args.minutes, float),
+                      tuple(args.profile or DRIVER_PROFILES), args.format, max(1, int(round(args.log_interval / DT))),
+                      start_time, args.script and os.path.abspath(args.script),
+                      args.route and os.path.abspath(args.route), args.route_wrap)
+
+    done = []
+
+    def progress(result):
+        done.append(result)
+        if len(done) % max(1, args.cars // 20) == 0 or len(done) == args.cars:
+            print(f"{len(done)}/{args.cars} cars")
+
+    start = time.perf_counter()
+    results = run_fleet(plan, args.workers, progress)
+    elapsed = time.perf_counter() - start
+    write_manifest(os.path.join(args.output_dir, "fleet.csv"), plan, results)
+    rows = sum(result["rows"] for result in results)
+    simulated = sum(car["duration"] for car in plan)
+    print(f"{len(results)} journeys, {rows} rows in {elapsed:.2f}s "
+          f"({rows / elapsed:,.0f} rows/s, {simulated / elapsed:,.0f}x real time)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
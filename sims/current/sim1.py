@@ -10,6 +10,7 @@ from PyQt5.QtWidgets import (
     QPushButton,
     QProgressBar,
     QSlider,
+    QComboBox,
     QLineEdit,
     QStackedWidget,
     QFileDialog,
@@ -18,11 +19,33 @@ from PyQt5.QtWidgets import (
 from PyQt5.QtCore import QTimer, Qt
 from qroundprogressbar import QRoundProgressBar
 import time
-import csv
+
+# Make the shared journey package importable when run as a script
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from journey.log_sink import LogSink
+from journey.route import Route, RouteFollower
+from display_model import DisplayModel, bind_gauges
+from sim_engine import DT, TIME_SCALES, SimEngine, TickPacer, gear_label
+from driver_script import DriverRecorder, script_path
 
 # Suppress the specific DeprecationWarning from sip
 warnings.filterwarnings("ignore", category=DeprecationWarning, message="sipPyTypeDict.* is deprecated")
 
+# CSV group commit settings
+LOG_COMMIT_ROWS = 20  # Rows buffered before writing to disk
+LOG_COMMIT_SECONDS = 1.0  # Longest a row waits in memory
+LOG_DURABILITY = "flush"  # 'none', 'flush' or 'fsync'
+LOG_QUEUE_ROWS = 4096  # Rows the log writer thread may fall behind by before the simulation waits for it
+SHOW_PAINT_TIME = False  # Overlay the time Qt spends painting each frame
+FRAME_MS = int(DT * 1000)  # How often the window runs the ticks that are due and redraws
+
+
+def format_log_row(row):
+    """CSV fields for one logged sample; runs on the log sink's thread"""
+    timestamp, rpm, speed, throttle, temp, load, boost, gear, lat, lon = row
+    return [f"{timestamp:.3f}", int(rpm), int(speed), int(throttle), int(temp), int(load), f"{boost:.1f}", gear, lat, lon]
+
+
 class OBDGui(QWidget):
     def __init__(self):
         super().__init__()
@@ -40,25 +63,34 @@ class OBDGui(QWidget):
         self.current_load = 0
         self.current_boost = 0
         self.current_gear = "N"
-        self.start_time = time.time()
         self.sim_throttle = 0
         self.sim_gear = 0
         self.throttle_pressed = False
         self.clutch_pressed = False
         self.turbo_boost = 0
         self.engine_stalled = False
+        # Vehicle physics; the window only reads its state and feeds it the pedals
+        self.engine = SimEngine(self.max_rpm, self.max_speed)
+        # Fixed DT ticks, run at time_scale x real time whatever the frame timing
+        self.pacer = TickPacer(time_scale=1)
         # CSV logging variables
-        self.csv_file = None
-        self.csv_writer = None
+        self.log_sink = None  # Writes the CSV on its own thread
+        self.log_status = ""  # Last problem the log writer reported
+        self.log_held = False  # Simulation waiting for the log writer to catch up
+        self.recorder = None  # Driver inputs while logging, saved as a driver script next to the CSV
+        self.route_follower = None  # Places the car on the chosen route for the logged lat/lon
         self.is_logging = False
-        self.last_log_time = 0
-        self.log_interval = 0.5  # Log every 500ms
 
         self.stacked_widget = QStackedWidget()
         self.setup_page = QWidget()
         self.main_page = QWidget()
         self.init_setup_page()
         self.init_main_page()
+        # Gauges only repaint when their value changes, at most once per screen refresh
+        self.display = DisplayModel(self, show_paint_time=SHOW_PAINT_TIME)
+        bind_gauges(self.display, self)
+        self.display.bind("sim_throttle", self.show_sim_throttle)
+        self.display.bind("log_status", self.log_status_label.setText)
         self.stacked_widget.addWidget(self.setup_page)
         self.stacked_widget.addWidget(self.main_page)
         self.stacked_widget.setCurrentIndex(0)
@@ -113,6 +145,18 @@ class OBDGui(QWidget):
         speed_layout.addWidget(self.speed_input)
         setup_layout.addLayout(speed_layout)
 
+        # Optional route for the logged GPS positions (e.g. csvMaker.py's osrm_route_journey.csv)
+        route_layout = QHBoxLayout()
+        route_label = QLabel("Route (optional):")
+        self.route_input = QLineEdit("")
+        self.route_input.setPlaceholderText("CSV with lat/lon or encoded polyline")
+        route_browse_button = QPushButton("Browse...")
+        route_browse_button.clicked.connect(self.browse_route)
+        route_layout.addWidget(route_label)
+        route_layout.addWidget(self.route_input)
+        route_layout.addWidget(route_browse_button)
+        setup_layout.addLayout(route_layout)
+
         start_button = QPushButton("Start Monitoring")
         start_button.clicked.connect(self.start_monitoring)
         setup_layout.addWidget(start_button, alignment=Qt.AlignmentFlag.AlignCenter)
@@ -259,6 +303,15 @@ class OBDGui(QWidget):
         self.sim_controls_layout.addWidget(QLabel("Sim Throttle:"))
         self.sim_controls_layout.addWidget(self.throttle_slider)
 
+        self.time_scale_combo = QComboBox()
+        for time_scale in TIME_SCALES:
+            self.time_scale_combo.addItem("Max" if time_scale is None else f"{time_scale}x", time_scale)
+        self.time_scale_combo.setCurrentIndex(TIME_SCALES.index(1))
+        self.time_scale_combo.currentIndexChanged.connect(self.change_time_scale)
+        self.time_scale_combo.setFocusPolicy(Qt.NoFocus)  # Keep Enter/Space for the pedals
+        self.sim_controls_layout.addWidget(QLabel("Sim Speed:"))
+        self.sim_controls_layout.addWidget(self.time_scale_combo)
+
         self.gear_up_button = QPushButton("Gear Up (W)")
         self.gear_up_button.clicked.connect(self.gear_up)
         self.sim_controls_layout.addWidget(self.gear_up_button)
@@ -274,6 +327,12 @@ class OBDGui(QWidget):
         self.log_button.clicked.connect(self.toggle_logging)
         main_layout.addWidget(self.log_button, alignment=Qt.AlignmentFlag.AlignCenter)
 
+        self.log_status_label = QLabel("")
+        self.log_status_label.setStyleSheet("color: red;")
+        self.log_status_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.log_status_label.setWordWrap(True)
+        main_layout.addWidget(self.log_status_label)
+
         self.reconfigure_button = QPushButton("Reconfigure")
         self.reconfigure_button.clicked.connect(self.reconfigure)
         main_layout.addWidget(self.reconfigure_button)
@@ -284,19 +343,39 @@ class OBDGui(QWidget):
 
         self.main_page.setLayout(main_layout)
 
+    def browse_route(self):
+        filepath, _ = QFileDialog.getOpenFileName(
+            self,
+            "Open Route",
+            os.path.dirname(self.route_input.text()) or os.path.expanduser("~"),
+            "Route Files (*.csv *.txt);;All Files (*)"
+        )
+        if filepath:
+            self.route_input.setText(filepath)
+
     def update_sim_throttle(self, value):
+        """The slider was moved by hand: set the throttle to it."""
         self.sim_throttle = value
-        self.throttle_slider.setValue(int(value))
+        self.engine.throttle = value
+
+    def show_sim_throttle(self, value):
+        # Follow the engine without feeding the whole-percent slider position back into it
+        self.throttle_slider.blockSignals(True)
+        self.throttle_slider.setValue(value)
+        self.throttle_slider.blockSignals(False)
+
+    def change_time_scale(self):
+        self.pacer.set_time_scale(self.time_scale_combo.currentData())
 
     def gear_up(self):
-        if self.clutch_pressed and self.sim_gear < 5:
-            self.sim_gear += 1
-            self.current_gear = "N" if self.sim_gear == 0 else str(self.sim_gear)
+        self.engine.gear_up(self.clutch_pressed)
+        self.sim_gear = self.engine.gear
+        self.current_gear = gear_label(self.sim_gear)
 
     def gear_down(self):
-        if self.clutch_pressed and self.sim_gear > 0:
-            self.sim_gear -= 1
-            self.current_gear = "N" if self.sim_gear == 0 else str(self.sim_gear)
+        self.engine.gear_down(self.clutch_pressed)
+        self.sim_gear = self.engine.gear
+        self.current_gear = gear_label(self.sim_gear)
 
     def keyPressEvent(self, event):
         if event.key() == Qt.Key_Return and not self.throttle_pressed and not self.engine_stalled:
@@ -308,8 +387,11 @@ class OBDGui(QWidget):
         elif event.key() == Qt.Key_S:
             self.gear_down()
         elif event.key() == Qt.Key_R and self.engine_stalled:
+            if self.recorder:
+                self.recorder.restart(self.engine)
+            self.engine.restart()
             self.engine_stalled = False
-            self.current_rpm = 750
+            self.current_rpm = self.engine.rpm
             self.update_status()
         event.accept()
 
@@ -348,13 +430,19 @@ class OBDGui(QWidget):
                 if not filepath.endswith(".csv"):
                     filepath += ".csv"
                 try:
-                    # Open file and write header
-                    self.csv_file = open(filepath, "w", newline="", encoding="utf-8")
-                    self.csv_writer = csv.writer(self.csv_file)
-                    self.csv_writer.writerow(
-                        ["timestamp", "rpm", "speed", "throttle", "temp", "load", "boost", "gear", "lat", "lon"]
+                    # Open file and write header; rows are written on the sink's thread from here on
+                    self.log_sink = LogSink(
+                        filepath,
+                        header=["timestamp", "rpm", "speed", "throttle", "temp", "load", "boost", "gear", "lat", "lon"],
+                        capacity=LOG_QUEUE_ROWS,
+                        format_row=format_log_row,
+                        batch_rows=LOG_COMMIT_ROWS,
+                        batch_seconds=LOG_COMMIT_SECONDS,
+                        durability=LOG_DURABILITY,
                     )
-                    self.csv_file.flush()
+                    self.log_sink.start()
+                    self.log_status = ""
+                    self.recorder = DriverRecorder(self.engine)
                     self.is_logging = True
                     self.log_button.setText("Stop Logging")
                     self.update_status()
@@ -368,131 +456,94 @@ class OBDGui(QWidget):
                     QMessageBox.critical(self, "Error", f"Failed to create file: {e}")
         else:
             # Stop logging
-            if self.csv_file:
-                try:
-                    self.csv_file.close()
-                except Exception as e:
-                    QMessageBox.warning(self, "Warning", f"Error closing file: {e}")
-                self.csv_file = None
-                self.csv_writer = None
+            if self.log_sink:
+                self.log_sink.close()  # Writes whatever is still queued
+                self.report_log_events()
+                if self.recorder:
+                    # Save the inputs so the session can be replayed in batch (fleet.py --script)
+                    try:
+                        self.recorder.script(self.engine).save(script_path(self.log_sink.path))
+                    except OSError as e:
+                        self.log_status = f"Error saving driver script: {e}"
+                self.log_sink = None
+            self.recorder = None
+            self.log_held = False
             self.is_logging = False
             self.log_button.setText("Start Logging")
             self.update_status()
 
     def fast_update(self):
-        """Update simulation data and log to CSV if enabled."""
-        if self.engine_stalled:
-            self.current_rpm = 0
-            self.current_speed = 0
-            self.sim_throttle = 0
-            self.current_throttle = 0
-            self.current_load = 0
-            self.turbo_boost = 0
-            self.current_boost = 1
-            self.update_display()
-            # Log stalled state
-            if self.is_logging and (time.time() - self.last_log_time) >= self.log_interval:
+        """Run the simulation ticks that are due and redraw."""
+        self.advance(self.pacer.due())
+
+    def advance(self, ticks):
+        """Step the engine `ticks` times, logging each tick to CSV if enabled, then update the gauges."""
+        self.log_held = False
+        for _ in range(ticks):
+            if self.is_logging and self.log_sink.full:
+                # Hold the simulation (it falls behind real time) rather than drop rows or wait on the disk
+                self.log_held = True
+                break
+            if self.recorder:
+                self.recorder.record(self.engine, self.throttle_pressed, self.clutch_pressed)
+            if self.engine.step(self.throttle_pressed, self.clutch_pressed):
+                self.engine_stalled = True
+                self.update_status()
+            self.sync_engine()
+
+            # Every simulated tick is logged (one row per DT of simulated time, at any Sim Speed),
+            # so a saved driver script replays to the same CSV; the log sink holds the loop if it falls behind
+            if self.is_logging:
                 self.log_data()
-            return
-
-        target_throttle = 100 if self.throttle_pressed else 0
-        throttle_step = (target_throttle - self.sim_throttle) * 0.05
-        self.sim_throttle += throttle_step
-        self.sim_throttle = max(0, min(100, self.sim_throttle))
-        self.update_sim_throttle(self.sim_throttle)
-
-        idle_rpm = 750
-        target_rpm = idle_rpm + (self.sim_throttle / 100) * (self.max_rpm - idle_rpm)
-        rpm_step_factor = 0.1 if self.current_rpm < (self.max_rpm * 0.5) else 0.2
-        rpm_step = (target_rpm - self.current_rpm) * rpm_step_factor
-
-        stall_rpm = min(500, self.max_rpm * 0.1)
-        if not self.clutch_pressed and self.sim_gear > 0 and self.current_rpm < stall_rpm:
-            self.engine_stalled = True
-            self.update_status()
-            self.current_rpm = 0
-            self.current_speed = 0
-            self.sim_throttle = 0
-        else:
-            self.current_rpm += rpm_step
-            self.current_rpm = max(idle_rpm if not self.engine_stalled else 0, min(self.max_rpm, self.current_rpm))
-
-        gear_ratios = [3.8, 2.0, 1.4, 1.0, 0.8]
-        final_drive = 4.0
-        tire_circ = 2.0
-        if self.clutch_pressed or self.sim_gear == 0:
-            target_speed = 0
-        else:
-            target_speed = (self.current_rpm * tire_circ * 60) / (gear_ratios[self.sim_gear - 1] * final_drive * 1000)
-            target_speed = (target_speed / 240) * self.max_speed
-        speed_step = (target_speed - self.current_speed) * 0.05
-        self.current_speed += speed_step
-        self.current_speed = max(0, min(self.max_speed, self.current_speed))
-
-        target_boost = min(1.5, max(-0.5, (self.sim_throttle / 100) * (self.current_rpm / self.max_rpm) * 1.5))
-        boost_step = (target_boost - self.turbo_boost) * 0.03
-        self.turbo_boost += boost_step
-        self.turbo_boost = max(-0.5, min(1.5, self.turbo_boost))
-        self.current_boost = 1 + self.turbo_boost
-
-        self.current_throttle = self.sim_throttle
-        load_base = (self.sim_throttle / 100) * 80
-        load_adjust = (self.turbo_boost / 1.5) * 20
-        self.current_load = load_base + load_adjust
-        self.current_load = max(0, min(100, self.current_load))
-
-        target_temp = 90 + (self.current_rpm / self.max_rpm) * 20
-        temp_step = (target_temp - self.current_temp) * 0.01
-        self.current_temp += temp_step
-        self.current_temp = max(80, min(110, self.current_temp))
-
+        if self.log_sink and self.log_sink.error is not None:
+            self.toggle_logging()  # The writer thread has stopped; its error shows under the log button
         self.update_display()
 
-        # Log data to CSV if enabled and interval reached
-        if self.is_logging and (time.time() - self.last_log_time) >= self.log_interval:
-            self.log_data()
+    def sync_engine(self):
+        """Copy the engine state into the values the gauges and the log show."""
+        engine = self.engine
+        self.current_rpm = engine.rpm
+        self.current_speed = engine.speed
+        self.sim_throttle = engine.throttle
+        self.current_throttle = engine.throttle
+        self.current_temp = engine.temp
+        self.current_load = engine.load
+        self.turbo_boost = engine.turbo_boost
+        self.current_boost = engine.boost
+        self.sim_gear = engine.gear
+        self.current_gear = gear_label(engine.gear)
+        self.engine_stalled = engine.stalled
 
     def log_data(self):
-        """Write current data to CSV file."""
-        if self.csv_writer:
-            try:
-                timestamp = time.time() - self.start_time
-                # Mock GPS coordinates (replace with NEO-6M data later)
-                lat, lon = 0.0, 0.0
-                self.csv_writer.writerow(
-                    [
-                        f"{timestamp:.3f}",
-                        int(self.current_rpm),
-                        int(self.current_speed),
-                        int(self.current_throttle),
-                        int(self.current_temp),
-                        int(self.current_load),
-                        f"{self.current_boost:.1f}",
-                        self.current_gear,
-                        lat,
-                        lon,
-                    ]
-                )
-                self.csv_file.flush()
-            except Exception as e:
-                QMessageBox.warning(self, "Warning", f"Error writing to CSV: {e}")
-                self.toggle_logging()  # Stop logging on error
+        """Queue the current data for the CSV log; the log sink formats and writes it off the GUI thread."""
+        if self.log_sink:
+            if self.route_follower:
+                # Where the distance driven so far puts the car on the route
+                lat, lon = self.route_follower.position(self.engine.distance)
+            else:
+                lat, lon = 0.0, 0.0  # No route: no fix
+            self.log_sink.put((self.engine.time, self.current_rpm, self.current_speed, self.current_throttle,
+                               self.current_temp, self.current_load, self.current_boost, self.current_gear, lat, lon))
+
+    def report_log_events(self):
+        """Show the log writer's status events without interrupting the simulation."""
+        for kind, detail in self.log_sink.poll_events():
+            if kind == "error":
+                self.log_status = f"Logging stopped, error writing to CSV: {detail}"
 
     def update_display(self):
-        self.rpm_gauge.setValue(int(self.current_rpm))
-        self.rpm_label.setText(f"RPM: {int(self.current_rpm)}")
-        self.speed_gauge.setValue(int(self.current_speed))
-        self.speed_label.setText(f"Speed: {int(self.current_speed)} km/h")
-        self.throttle_bar.setValue(int(self.current_throttle))
-        self.throttle_label.setText(f"Throttle: {int(self.current_throttle)} %")
-        self.temp_bar.setValue(int(self.current_temp))
-        self.temp_label.setText(f"Temp: {int(self.current_temp)} °C")
-        self.load_gauge.setValue(int(self.current_load))
-        self.boost_gauge.setValue(self.current_boost)
-        self.gear_label.setText(f"Gear: {self.current_gear}")
-        runtime_secs = int(time.time() - self.start_time)
-        mins, secs = divmod(runtime_secs, 60)
-        self.runtime_label.setText(f"Run Time: {mins:02d}:{secs:02d}")
+        self.display.update(
+            rpm=int(self.current_rpm),
+            speed=int(self.current_speed),
+            throttle=int(self.current_throttle),
+            temp=int(self.current_temp),
+            load=int(self.current_load),
+            boost=round(self.current_boost, 2),  # Finer steps than this don't move the donut
+            gear=self.current_gear,
+            runtime=int(self.engine.time),
+            sim_throttle=int(self.engine.throttle),
+            log_status="Log writer is behind; simulation held until it catches up" if self.log_held else self.log_status,
+        )
 
     def start_monitoring(self):
         try:
@@ -506,8 +557,22 @@ class OBDGui(QWidget):
                 self.error_label.setText(f"Max Speed out of range ({self.min_speed}–{self.max_speed_limit} km/h). Please retry.")
                 return
 
+            route_file = self.route_input.text().strip()
+            if route_file:
+                try:
+                    route = Route.from_file(route_file)
+                except (OSError, ValueError) as e:
+                    self.error_label.setText(f"Could not load route: {e}")
+                    return
+                if self.route_follower is None or self.route_follower.route.name != route_file:
+                    self.route_follower = RouteFollower(route)
+            else:
+                self.route_follower = None
+
             self.max_rpm = rpm
             self.max_speed = speed
+            self.engine.max_rpm = rpm
+            self.engine.max_speed = speed
             self.error_label.setText("")
         except ValueError as e:
             self.error_label.setText("Invalid input: Please enter positive integers")
@@ -516,13 +581,15 @@ class OBDGui(QWidget):
         self.rpm_gauge.setMaximum(self.max_rpm)
         self.speed_gauge.setMaximum(self.max_speed)
 
-        self.update_timer.start(50)
+        self.update_timer.start(FRAME_MS)
+        self.pacer.start()
         self.stacked_widget.setCurrentIndex(1)
         self.setWindowTitle("OBD-II Simulator")
         self.setGeometry(100, 100, 800, 700)
 
     def reconfigure(self):
         self.update_timer.stop()
+        self.pacer.stop()
         # Stop logging when reconfiguring
         if self.is_logging:
             self.toggle_logging()
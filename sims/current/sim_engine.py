@@ -0,0 +1,274 @@
+"""Vehicle model behind the OBD-II simulator, without any Qt.
+
+SimEngine holds the state of one simulated car and advances it one fixed
+DT tick at a time with step(): throttle smoothing, RPM, the stall check,
+road speed through the gearbox, turbo lag, engine load and coolant
+temperature, plus an odometer for placing the car on a route. OBDGui
+(sim1.py) calls step() from its 50 ms timer. run() steps the same model
+over whole arrays of pedal and gear inputs and returns the telemetry as
+numpy columns, so hours of driving can be generated in a fraction of a
+second without opening a window.
+
+The model only knows ticks, so the same inputs always give the same
+telemetry. TickPacer maps wall time to ticks for a live view at any
+time_scale; batch runs call run() and go as fast as the CPU allows.
+"""
+import time
+
+import numpy as np
+
+DT = 0.05  # Seconds per tick; the smoothing factors below are per tick
+IDLE_RPM = 750
+GEAR_RATIOS = [3.8, 2.0, 1.4, 1.0, 0.8]
+FINAL_DRIVE = 4.0
+TIRE_CIRC = 2.0  # Metres
+TOP_GEAR = len(GEAR_RATIOS)
+THROTTLE_RATE = 0.05  # Fraction of the way to the pedal position covered each tick
+SPEED_RATE = 0.05
+BOOST_RATE = 0.03
+TEMP_RATE = 0.01
+
+TIME_SCALES = (0.25, 0.5, 1, 2, 4, 8, 16, None)  # Simulated seconds per wall second; None = as fast as possible
+MAX_CATCH_UP_TICKS = 200  # Most ticks a live view runs in one go before it lets the simulation fall behind
+
+# What state() captures: enough to carry on from the same point with set_state()
+STATE_FIELDS = ("rpm", "speed", "throttle", "temp", "turbo_boost", "load", "gear", "stalled", "ticks", "distance")
+
+# Telemetry columns returned by run(), in the simulator's CSV order, then the odometer
+COLUMNS = ["timestamp", "rpm", "speed", "throttle", "temp", "load", "boost", "gear", "distance"]
+
+
+def gear_label(gear):
+    return "N" if gear == 0 else str(gear)
+
+
+class SimEngine:
+    """One simulated car; step() advances it one tick"""
+
+    def __init__(self, max_rpm=8000, max_speed=240):
+        self.max_rpm = max_rpm
+        self.max_speed = max_speed
+        self.rpm = 0
+        self.speed = 0
+        self.throttle = 0
+        self.temp = 90
+        self.turbo_boost = 0
+        self.load = 0
+        self.gear = 0
+        self.stalled = False
+        self.ticks = 0
+        self.distance = 0.0  # Metres travelled, speed integrated over the ticks
+
+    @property
+    def time(self):
+        """Simulated seconds since the engine was created"""
+        return self.ticks * DT
+
+    @property
+    def boost(self):
+        return 1 + self.turbo_boost
+
+    def state(self):
+        return {name: getattr(self, name) for name in STATE_FIELDS}
+
+    def set_state(self, state):
+        for name in STATE_FIELDS:
+            if name in state:
+                setattr(self, name, state[name])
+
+    def gear_up(self, clutch_pressed):
+        """Shift up one gear; only works with the clutch in"""
+        if clutch_pressed and self.gear < TOP_GEAR:
+            self.gear += 1
+
+    def gear_down(self, clutch_pressed):
+        if clutch_pressed and self.gear > 0:
+            self.gear -= 1
+
+    def restart(self):
+        """Start a stalled engine again"""
+        self.stalled = False
+        self.rpm = IDLE_RPM
+
+    def step(self, throttle_pressed, clutch_pressed):
+        """Advance one tick; returns True if the engine stalled on this tick"""
+        was_stalled = self.stalled
+        self._advance([throttle_pressed], [clutch_pressed])
+        self.distance += self.speed / 3.6 * DT
+        return self.stalled and not was_stalled
+
+    def run(self, throttle, clutch, gear=None, restart=None):
+        """Step over arrays of inputs, one entry per tick, and return the telemetry
+
+        throttle and clutch are per-tick pedal states (truthy = pressed). gear is
+        the gear selected on each tick (0 = neutral); without it the current gear
+        is held. Where restart is truthy a stalled engine is restarted before
+        that tick. Returns a dict of COLUMNS arrays, one row per tick, with the
+        timestamp in simulated seconds and the odometer in metres after the tick.
+        """
+        throttle = np.asarray(throttle, dtype=bool).tolist()  # Python scalars are much faster to loop over
+        clutch = np.asarray(clutch, dtype=bool).tolist()
+        n = len(throttle)
+        if len(clutch) != n:
+            raise ValueError("throttle and clutch must have the same length")
+        gears = None if gear is None else np.clip(np.asarray(gear, dtype=np.int64), 0, TOP_GEAR).tolist()
+        restarts = None if restart is None else np.asarray(restart, dtype=bool).tolist()
+        if (gears is not None and len(gears) != n) or (restarts is not None and len(restarts) != n):
+            raise ValueError("gear and restart must have one entry per tick")
+        first_tick = self.ticks
+        rpm, speed, thr, temp, load, turbo, gear_out = self._advance(throttle, clutch, gears, restarts, record=True)
+        # Odometer after each tick: a running sum from the current reading, added in the same order as step() does
+        speed = np.array(speed, dtype=np.float64)
+        distance = np.cumsum(np.concatenate(([self.distance], speed / 3.6 * DT)))[1:]
+        if n:
+            self.distance = float(distance[-1])
+        return {
+            "timestamp": (first_tick + 1 + np.arange(n)) * DT,
+            "rpm": np.array(rpm),
+            "speed": speed,
+            "throttle": np.array(thr),
+            "temp": np.array(temp),
+            "load": np.array(load),
+            "boost": 1 + np.array(turbo),
+            "gear": np.array(gear_out, dtype=np.int8),
+            "distance": distance,
+        }
+
+    def _advance(self, throttle, clutch, gears=None, restarts=None, record=False):
+        """The model itself: one pass over per-tick input lists, on local variables and inline clamps for speed"""
+        max_rpm = self.max_rpm
+        max_speed = self.max_speed
+        stall_rpm = min(500, max_rpm * 0.1)
+        half_rpm = max_rpm * 0.5
+        rpm_span = max_rpm - IDLE_RPM
+        idle_rpm = IDLE_RPM
+        throttle_rate, speed_rate, boost_rate, temp_rate = THROTTLE_RATE, SPEED_RATE, BOOST_RATE, TEMP_RATE
+        gear_divisors = [0.0] + [ratio * FINAL_DRIVE * 1000 for ratio in GEAR_RATIOS]  # Indexed by gear
+        wheel_metres = TIRE_CIRC * 60
+        rpm = self.rpm
+        speed = self.speed
+        thr = self.throttle
+        temp = self.temp
+        turbo = self.turbo_boost
+        load = self.load
+        gear = self.gear
+        stalled = self.stalled
+        n = len(throttle)
+        out = [[0.0] * n for _ in range(7)] if record else None
+        out_rpm, out_speed, out_thr, out_temp, out_load, out_turbo, out_gear = out or [None] * 7
+        for i in range(n):
+            if gears is not None:
+                gear = gears[i]
+            if restarts is not None and restarts[i] and stalled:
+                stalled = False
+                rpm = idle_rpm
+            if stalled:
+                rpm = 0
+                speed = 0
+                thr = 0
+                turbo = 0
+                load = 0
+            else:
+                clutch_pressed = clutch[i]
+                thr += ((100 if throttle[i] else 0) - thr) * throttle_rate
+                thr = 0 if thr < 0 else (100 if thr > 100 else thr)
+
+                target_rpm = idle_rpm + (thr / 100) * rpm_span
+                rpm_step = (target_rpm - rpm) * (0.1 if rpm < half_rpm else 0.2)
+                if not clutch_pressed and gear > 0 and rpm < stall_rpm:
+                    stalled = True
+                    rpm = 0
+                    speed = 0
+                    thr = 0
+                else:
+                    rpm += rpm_step
+                    rpm = idle_rpm if rpm < idle_rpm else (max_rpm if rpm > max_rpm else rpm)
+
+                if clutch_pressed or gear == 0:
+                    target_speed = 0
+                else:
+                    target_speed = (rpm * wheel_metres) / gear_divisors[gear]
+                    target_speed = (target_speed / 240) * max_speed
+                speed += (target_speed - speed) * speed_rate
+                speed = 0 if speed < 0 else (max_speed if speed > max_speed else speed)
+
+                target_boost = (thr / 100) * (rpm / max_rpm) * 1.5
+                target_boost = -0.5 if target_boost < -0.5 else (1.5 if target_boost > 1.5 else target_boost)
+                turbo += (target_boost - turbo) * boost_rate
+                turbo = -0.5 if turbo < -0.5 else (1.5 if turbo > 1.5 else turbo)
+
+                load = (thr / 100) * 80 + (turbo / 1.5) * 20
+                load = 0 if load < 0 else (100 if load > 100 else load)
+
+                target_temp = 90 + (rpm / max_rpm) * 20
+                temp += (target_temp - temp) * temp_rate
+                temp = 80 if temp < 80 else (110 if temp > 110 else temp)
+            if record:
+                out_rpm[i] = rpm
+                out_speed[i] = speed
+                out_thr[i] = thr
+                out_temp[i] = temp
+                out_load[i] = load
+                out_turbo[i] = turbo
+                out_gear[i] = gear
+        self.rpm = rpm
+        self.speed = speed
+        self.throttle = thr
+        self.temp = temp
+        self.turbo_boost = turbo
+        self.load = load
+        self.gear = gear
+        self.stalled = stalled
+        self.ticks += n
+        return out
+
+
+class TickPacer:
+    """How many DT ticks are due so simulated time runs at time_scale x wall time
+
+    Call due() once per frame and step the engine that many times. A time_scale
+    of None gives every frame max_ticks ticks. If the caller can't keep up, at
+    most max_ticks are handed out and the backlog is dropped, so a slow frame
+    makes the simulation lag instead of spiralling.
+    """
+
+    def __init__(self, time_scale=1, max_ticks=MAX_CATCH_UP_TICKS, clock=time.monotonic):
+        self.time_scale = time_scale
+        self.max_ticks = max_ticks
+        self._clock = clock
+        self._anchor = None  # Wall time that tick 0 of the current run maps to, None while stopped
+        self._given = 0  # Ticks handed out since the anchor
+
+    @property
+    def running(self):
+        return self._anchor is not None
+
+    def start(self):
+        if self._anchor is None:
+            self._anchor = self._clock()
+            self._given = 0
+
+    def stop(self):
+        self._anchor = None
+
+    def set_time_scale(self, time_scale):
+        """Change speed from now on without catching up on the old rate"""
+        was_running = self.running
+        self.stop()
+        self.time_scale = time_scale
+        if was_running:
+            self.start()
+
+    def due(self):
+        if self._anchor is None:
+            return 0
+        if self.time_scale is None:
+            return self.max_ticks
+        now = self._clock()
+        owed = int((now - self._anchor) * self.time_scale / DT) - self._given
+        if owed > self.max_ticks:
+            self._anchor = now  # Fell behind: drop the backlog
+            self._given = 0
+            return self.max_ticks
+        self._given += owed
+        return owed
@@ -6,6 +6,11 @@ from PyQt5.QtCore import QTimer, Qt, QThread, QObject, pyqtSignal  # Timer, alig
 from qroundprogressbar import QRoundProgressBar  # Custom gauges
 import time  # For runtime tracking
 import serial.tools.list_ports  # For detecting COM ports
+import os
+
+# Make the shared journey package importable when run as a script
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from journey.metrics import Metrics  # Ingest instrumentation
 
 # Suppress DeprecationWarning from sip to avoid cluttering output
 warnings.filterwarnings("ignore", category=DeprecationWarning, message="sipPyTypeDict.* is deprecated")
@@ -27,6 +32,8 @@ THROTTLE_MAX = 100  # Maximum throttle position
 TEMP_MAX = 150  # Maximum coolant temperature
 LOAD_MAX = 100  # Maximum engine load
 BOOST_MAX = 3  # Maximum boost pressure
+METRICS_FILE = None  # Path to save OBD query metrics (JSON) on exit, or None to just print a summary
+OBD_PORT = os.environ.get("OBD_PORT")  # Port to try before COM4, e.g. the pty sims/current/fake_elm327.py prints
 
 class OBDConnectionWorker(QObject):
     """Worker to handle OBD-II connection in a separate thread"""
@@ -40,7 +47,7 @@ class OBDConnectionWorker(QObject):
 
         connection = None
         for attempt in range(3):
-            for port in ['COM4'] + ports:
+            for port in ([OBD_PORT] if OBD_PORT else []) + ['COM4'] + ports:
                 try:
                     connection = obd.OBD(portstr=port, timeout=5)
                     connection.query(obd.commands.ELM_VERSION)
@@ -72,6 +79,7 @@ class OBDGui(QWidget):
         self.current_temp = 0  # Current coolant temperature
         self.current_load = 0  # Current engine load
         self.current_boost = 0  # Current boost pressure
+        self.metrics = Metrics()  # Query latency and response counters
 
         # Set up widget for switching between setup and main pages
         self.stacked_widget = QStackedWidget()
@@ -394,10 +402,20 @@ class OBDGui(QWidget):
         mins, secs = divmod(runtime_secs, 60)
         self.runtime_label.setText(f"Run Time: {mins:02d}:{secs:02d}")
 
+    def _query(self, command):
+        """Query the adapter, recording latency and null responses"""
+        start = time.monotonic()
+        response = self.connection.query(command)
+        self.metrics.histogram("obd_query_s").observe(time.monotonic() - start)
+        self.metrics.counter("obd_queries").add()
+        if not response or response.is_null():
+            self.metrics.counter("obd_null_responses").add()
+        return response
+
     def fast_rpm_update(self):
         """Update RPM data at a faster interval"""
         if self.connection and self.connection.is_connected():
-            response = self.connection.query(obd.commands.RPM)
+            response = self._query(obd.commands.RPM)
             if response and not response.is_null():
                 self.current_rpm = int(response.value.magnitude)
                 self.update_display()
@@ -406,10 +424,10 @@ class OBDGui(QWidget):
         """Update non-RPM data at a slower interval"""
         if self.connection and self.connection.is_connected():
             responses = {
-                "speed": self.connection.query(obd.commands.SPEED),
-                "throttle": self.connection.query(obd.commands.THROTTLE_POS),
-                "load": self.connection.query(obd.commands.ENGINE_LOAD),
-                "temp": self.connection.query(obd.commands.COOLANT_TEMP)
+                "speed": self._query(obd.commands.SPEED),
+                "throttle": self._query(obd.commands.THROTTLE_POS),
+                "load": self._query(obd.commands.ENGINE_LOAD),
+                "temp": self._query(obd.commands.COOLANT_TEMP)
             }
             if responses["speed"] and not responses["speed"].is_null():
                 self.current_speed = int(responses["speed"].value.magnitude)
@@ -427,6 +445,9 @@ class OBDGui(QWidget):
         if self.connection and self.connection.is_connected():
             print("Closing OBD connection...")
             self.connection.close()
+        print("OBD metrics:", self.metrics.summary_line())
+        if METRICS_FILE:
+            self.metrics.dump(METRICS_FILE)
         event.accept()
 
 if __name__ == "__main__":